@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the fast copy engine against shutil.copy2 on large
+files. The result depends heavily on the file system the files
+live on (reflinks only exist on e.g. btrfs/XFS), so point
+--directory at the file system your dotfiles are installed to
+
+Usage: python benchmarks/bench_copy.py [--size-mb N] [--files N] [--repeat N] [--directory PATH]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pydotfiles.utils import fast_copy_file, hash_file
+
+
+def create_files(directory, number_of_files, size):
+    origins = []
+    for file_number in range(number_of_files):
+        origin = os.path.join(directory, f"origin-{file_number}")
+        with open(origin, 'wb') as origin_file:
+            for _ in range(size // (1024 * 1024)):
+                origin_file.write(os.urandom(1024 * 1024))
+        origins.append(origin)
+    return origins
+
+
+def benchmark(label, copy, origins, repeat):
+    best_time = None
+    copy_methods = set()
+    for repetition in range(repeat):
+        destinations = [f"{origin}.{label}-{repetition}" for origin in origins]
+
+        start_time = time.perf_counter()
+        for origin, destination in zip(origins, destinations):
+            copy_methods.add(copy(origin, destination))
+        elapsed_time = time.perf_counter() - start_time
+
+        for origin, destination in zip(origins, destinations):
+            assert os.stat(origin).st_mtime_ns == os.stat(destination).st_mtime_ns
+            assert hash_file(origin) == hash_file(destination)
+            os.remove(destination)
+
+        best_time = elapsed_time if best_time is None else min(best_time, elapsed_time)
+
+    copy_methods.discard(None)
+    method_label = f" ({', '.join(sorted(copy_methods))})" if len(copy_methods) > 0 else ""
+    print(f"  {label + method_label:<40} {best_time * 1000:>10.2f} ms")
+    return best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the pydotfiles copy engine")
+    parser.add_argument("--size-mb", type=int, default=256, help="The size of each generated file, in MiB")
+    parser.add_argument("--files", type=int, default=4, help="The number of generated files")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of timing repetitions (the best is reported)")
+    parser.add_argument("--directory", default=None, help="The directory (and so file system) to benchmark in (default: a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        origins = create_files(directory, args.files, args.size_mb * 1024 * 1024)
+
+        print(f"{args.files} file(s) x {args.size_mb} MiB [directory={directory}]")
+        # shutil.copy2 returns the destination rather than a copy method, so it's left unlabelled
+        shutil_time = benchmark("shutil.copy2", lambda origin, destination: shutil.copy2(origin, destination) and None, origins, args.repeat)
+        fast_copy_time = benchmark("fast_copy_file", fast_copy_file, origins, args.repeat)
+        print(f"  {'speedup':<40} {shutil_time / fast_copy_time:>10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the file hashing engine across file sizes, block
+sizes, algorithms, and serial vs batched (threaded) hashing
+
+Usage: python benchmarks/bench_hashing.py [--sizes-kb N ...] [--block-sizes-kb N ...] [--algorithms NAME ...] [--files N] [--repeat N]
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+import pydotfiles.utils.general
+from pydotfiles.utils import hash_file, hash_files
+
+
+def create_files(directory, number_of_files, size):
+    file_paths = []
+    for file_number in range(number_of_files):
+        file_path = os.path.join(directory, f"file-{size}-{file_number}")
+        with open(file_path, 'wb') as generated_file:
+            generated_file.write(os.urandom(size))
+        file_paths.append(file_path)
+    return file_paths
+
+
+def benchmark(label, hash_function, repeat):
+    best_time = min(timeit.repeat(hash_function, number=1, repeat=repeat))
+    print(f"  {label:<48} {best_time * 1000:>10.2f} ms")
+    return best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the pydotfiles file hashing engine")
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[4, 256, 4096, 65536], help="The file sizes to benchmark, in KiB")
+    parser.add_argument("--block-sizes-kb", type=int, nargs="+", default=[64, 1024], help="The read block sizes to benchmark, in KiB")
+    parser.add_argument("--algorithms", nargs="+", default=["sha256", "blake2b"], help="The hashlib algorithms to benchmark")
+    parser.add_argument("--files", type=int, default=8, help="The number of generated files of each size")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timing repetitions (the best is reported)")
+    args = parser.parse_args()
+
+    mmap_hash_threshold = pydotfiles.utils.general.MMAP_HASH_THRESHOLD
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size_kb in args.sizes_kb:
+            file_paths = create_files(directory, args.files, size_kb * 1024)
+            print(f"{args.files} file(s) x {size_kb} KiB")
+
+            for algorithm in args.algorithms:
+                # Forces plain reads, to compare each block size against the memory-mapped path
+                pydotfiles.utils.general.MMAP_HASH_THRESHOLD = float("inf")
+                for block_size_kb in args.block_sizes_kb:
+                    benchmark(f"{algorithm} read ({block_size_kb} KiB blocks)", lambda: [hash_file(file_path, block_size_kb * 1024, algorithm) for file_path in file_paths], args.repeat)
+
+                pydotfiles.utils.general.MMAP_HASH_THRESHOLD = 0
+                benchmark(f"{algorithm} mmap", lambda: [hash_file(file_path, algorithm=algorithm) for file_path in file_paths], args.repeat)
+
+                pydotfiles.utils.general.MMAP_HASH_THRESHOLD = mmap_hash_threshold
+                benchmark(f"{algorithm} default, serial", lambda: [hash_file(file_path, algorithm=algorithm) for file_path in file_paths], args.repeat)
+                benchmark(f"{algorithm} default, batched", lambda: hash_files(file_paths, algorithm), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the configuration-file loading backends on large
+generated settings and default_settings files
+
+Usage: python benchmarks/bench_loaders.py [--actions N] [--settings N] [--repeat N]
+"""
+
+import argparse
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from pydotfiles.utils.loaders import JSON_BACKENDS, YAML_BACKENDS, resolve_json_backend, resolve_yaml_backend
+
+
+def generate_settings_data(number_of_actions):
+    return {
+        "version": "alpha",
+        "schema": "core",
+        "os": {
+            "name": "macos",
+            "packages": [f"package-{index}" for index in range(number_of_actions)],
+            "applications": [f"application-{index}" for index in range(number_of_actions)],
+            "default_settings_file": "default_settings.yaml",
+        },
+        "actions": [
+            {"action": "symlink", "hidden": True, "files": {f"file-{index}": f"~/file-{index}" for index in range(number_of_actions)}},
+        ],
+    }
+
+
+def generate_default_settings_data(number_of_settings):
+    return {
+        "version": "alpha",
+        "schema": "default_settings",
+        "default_settings": [
+            {
+                "name": f"Setting number {index}",
+                "description": f"A generated setting used for benchmarking (index={index})",
+                "start": "yosemite",
+                "command": f"defaults write com.apple.some-domain some-key-{index} -bool true",
+                "check_command": f"defaults read com.apple.some-domain some-key-{index}",
+                "expected_check_state": "1",
+                "sudo": index % 2 == 0,
+            }
+            for index in range(number_of_settings)
+        ],
+    }
+
+
+def write_yaml(path, data):
+    import yaml
+    path.write_text(yaml.safe_dump(data, default_flow_style=False))
+
+
+def benchmark(label, loads, raw_data, repeat):
+    best_time = min(timeit.repeat(lambda: loads(raw_data), number=1, repeat=repeat))
+    print(f"  {label:<40} {best_time * 1000:>10.2f} ms")
+
+
+def get_available_backends(backend_names, resolver):
+    available_backends = []
+    for backend_name in backend_names:
+        try:
+            available_backends.append(resolver([backend_name]))
+        except ImportError:
+            print(f"  {backend_name:<40} {'not installed':>13}")
+    return available_backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the pydotfiles configuration loading backends")
+    parser.add_argument("--actions", type=int, default=5000, help="The number of actions/packages in the generated settings file")
+    parser.add_argument("--settings", type=int, default=2000, help="The number of entries in the generated default_settings file")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timing repetitions (the best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        directory = Path(temporary_directory)
+
+        settings_data = generate_settings_data(args.actions)
+        default_settings_data = generate_default_settings_data(args.settings)
+
+        (directory / "settings.json").write_text(json.dumps(settings_data))
+        (directory / "default_settings.json").write_text(json.dumps(default_settings_data))
+        write_yaml(directory / "settings.yaml", settings_data)
+        write_yaml(directory / "default_settings.yaml", default_settings_data)
+
+        for file_name in ["settings.json", "default_settings.json"]:
+            raw_data = (directory / file_name).read_bytes()
+            print(f"{file_name} ({len(raw_data) / 1024:.0f} KiB)")
+            for backend_name, loads in get_available_backends(JSON_BACKENDS, resolve_json_backend):
+                benchmark(backend_name, loads, raw_data, args.repeat)
+
+        for file_name in ["settings.yaml", "default_settings.yaml"]:
+            raw_data = (directory / file_name).read_bytes()
+            print(f"{file_name} ({len(raw_data) / 1024:.0f} KiB)")
+            for backend_name, loads in get_available_backends(YAML_BACKENDS, resolve_yaml_backend):
+                benchmark(backend_name, loads, raw_data, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
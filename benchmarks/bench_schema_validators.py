@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks the code-generated schema validators against the
+jsonschema interpreter on large generated (valid) documents
+
+Usage: python benchmarks/bench_schema_validators.py [--entries N] [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from pydotfiles.models.validator import ConfigMapper
+
+
+def generate_core_data(number_of_entries):
+    return {
+        "version": "alpha",
+        "schema": "core",
+        "os": {
+            "name": "macos",
+            "shell": "zsh",
+            "packages": [f"package-{index}" for index in range(number_of_entries)],
+            "applications": [f"application-{index}" for index in range(number_of_entries)],
+            "default_dock": [f"application-{index}" for index in range(number_of_entries)],
+            "default_settings_file": "default_settings.json",
+        },
+        "actions": [
+            {"action": "symlink", "hidden": True, "files": {f"file-{index}": f"~/file-{index}"}}
+            for index in range(number_of_entries)
+        ],
+    }
+
+
+def generate_default_settings_data(number_of_entries):
+    return {
+        "version": "alpha",
+        "schema": "default_settings",
+        "default_settings": [
+            {
+                "name": f"Setting number {index}",
+                "description": f"A generated setting used for benchmarking (index={index})",
+                "start": "yosemite",
+                "end": "mojave",
+                "command": f"defaults write com.apple.some-domain some-key-{index} -bool true",
+                "check_command": f"defaults read com.apple.some-domain some-key-{index}",
+                "expected_check_state": "1",
+                "sudo": index % 2 == 0,
+            }
+            for index in range(number_of_entries)
+        ],
+    }
+
+
+def generate_developer_environments_data(number_of_entries):
+    return {
+        "version": "alpha",
+        "schema": "developer_environments",
+        "environments": [
+            {
+                "language": f"language-{index}",
+                "versions": ["1.0.0", "2.0.0", "3.0.0"],
+                "environment_manager": {
+                    "name": f"manager-{index}",
+                    "plugins": [{"name": "virtualenv", "virtual_environments": [{"version": "3.0.0", "name": f"environment-{index}"}]}],
+                },
+            }
+            for index in range(number_of_entries)
+        ],
+    }
+
+
+def benchmark(label, validate, data, repeat):
+    best_time = min(timeit.repeat(lambda: validate(data), number=1, repeat=repeat))
+    print(f"  {label:<40} {best_time * 1000:>10.2f} ms")
+    return best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the pydotfiles schema validators")
+    parser.add_argument("--entries", type=int, default=2000, help="The number of entries (actions/settings/environments) in each generated document")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timing repetitions (the best is reported)")
+    args = parser.parse_args()
+
+    documents = {
+        "core": generate_core_data(args.entries),
+        "default_settings": generate_default_settings_data(args.entries),
+        "developer_environments": generate_developer_environments_data(args.entries),
+    }
+
+    for schema_type, data in documents.items():
+        schema_validator = ConfigMapper.get_validator("alpha", schema_type)
+        generated_validator = ConfigMapper.get_generated_validator("alpha", schema_type)
+        assert schema_validator.is_valid(data) and generated_validator(data)
+
+        print(f"{schema_type} ({args.entries} entries)")
+        interpreted_time = benchmark("jsonschema", schema_validator.is_valid, data, args.repeat)
+        generated_time = benchmark("generated", generated_validator, data, args.repeat)
+        print(f"  {'speedup':<40} {interpreted_time / generated_time:>10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
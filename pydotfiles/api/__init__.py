@@ -2,13 +2,14 @@
 import argparse
 import pydotfiles
 import os
+import sys
 
 # Project imports
-from pydotfiles.models import PYDOTFILES_CACHE_DIRECTORY, DEFAULT_PYDOTFILES_CONFIG_LOCAL_DIRECTORY, DEFAULT_CONFIG_REMOTE_REPO
-from pydotfiles.models import Dotfiles, CacheDirectory, Validator
-from pydotfiles.models import get_pydotfiles_config_data_with_override, load_pydotfiles_config_data, write_pydotfiles_config_data
-from pydotfiles.models import PydotfilesError, ValidationError
-from pydotfiles.utils import PrettyPrint
+# NOTE: Everything under pydotfiles.models is imported inside of each
+# sub-command, so that a given command only pays the import cost of
+# what it actually uses (e.g. `--version` never imports the models,
+# and `validate` never imports GitPython)
+from pydotfiles.utils import PrettyPrint, DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS
 
 
 class ArgumentDispatcher:
@@ -26,8 +27,10 @@ class ArgumentDispatcher:
     def dispatch(self):
         valid_commands = [
             'download',
+            'plan',
             'install',
             'uninstall',
+            'rollback',
             'update',
             'clean',
             'set',
@@ -39,8 +42,10 @@ class ArgumentDispatcher:
 
         Commands:
           - download: Downloads your dotfiles onto your computer
+          - plan: Shows what installing all/part of your dotfiles would do, without changing anything
           - install: Installs all/part of your dotfiles
           - uninstall: Uninstalls all/part of your dotfiles
+          - rollback: Undoes the file operations of the last (or a given) install
           - update: Updates all/part of your dotfiles
           - clean: Removes the pydotfiles cache/default
           - set: Sets configuration values for managing your dotfiles
@@ -58,6 +63,10 @@ class ArgumentDispatcher:
         getattr(self, args.command)(command_arguments)
 
     def download(self, command_arguments):
+        from pydotfiles.models import DEFAULT_PYDOTFILES_CONFIG_LOCAL_DIRECTORY, DEFAULT_CONFIG_REMOTE_REPO
+        from pydotfiles.models import Dotfiles, CacheDirectory, PydotfilesError
+        from pydotfiles.models import get_pydotfiles_config_data_with_override
+
         help_description = f"""
         Downloads the dotfiles config repo if it hasn't been cloned to local.
 
@@ -90,29 +99,85 @@ class ArgumentDispatcher:
         except PydotfilesError as e:
             PrettyPrint.fail(e.help_message)
 
+    def plan(self, command_arguments):
+        from pydotfiles.models import Dotfiles, CacheDirectory, PydotfilesError, load_pydotfiles_config_data
+
+        help_description = """
+        Shows the operations that installing your dotfile's modules would run, leaving out
+        everything that's already installed (default: plans all modules)
+        NOTE: Your dotfiles need to have first been downloaded via `pydotfiles download` beforehand
+        """
+        parser = self.__get_base_parser(help_description, "plan")
+        parser.add_argument("-m", "--modules", help="A list of specific modules to plan", nargs="+")
+        parser.add_argument("-j", "--jobs", help="The number of worker processes used to parse the modules' settings files (default: parses serially)", type=int)
+        parser.add_argument("-f", "--format", help="The output format: `text` lists each pending operation, `json` prints the plan as a JSON document", choices=["text", "json"], default="text")
+        parser.add_argument("--hash-algorithm", help=f"The algorithm used to compare copied files against their origins (default: {DEFAULT_HASH_ALGORITHM})", choices=HASH_ALGORITHMS, default=DEFAULT_HASH_ALGORITHM)
+        args = parser.parse_args(command_arguments)
+
+        config_repo_local, config_repo_remote = load_pydotfiles_config_data(CacheDirectory())
+
+        # JSON output owns stdout, so the normal logging is squelched
+        if args.format == "json":
+            self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, True, False, args.modules, args.jobs, hash_algorithm=args.hash_algorithm)
+        else:
+            self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, args.quiet, args.verbose, args.modules, args.jobs, hash_algorithm=args.hash_algorithm)
+
+        if not self.dotfiles.is_cloned:
+            PrettyPrint.fail(f"Plan: No dotfiles detected, please download it first with `pydotfiles download`")
+
+        try:
+            install_plan = self.dotfiles.plan(args.modules)
+        except PydotfilesError as e:
+            PrettyPrint.fail(e.help_message)
+
+        if args.format == "json":
+            import json
+            print(json.dumps(install_plan.to_records(), indent=4))
+        elif install_plan.is_empty:
+            PrettyPrint.success("Plan: Everything is already installed, nothing to do")
+        else:
+            for summary_line in install_plan.get_summary_lines():
+                print(summary_line)
+
     def install(self, command_arguments):
+        from pydotfiles.models import Dotfiles, CacheDirectory, load_pydotfiles_config_data
+        from pydotfiles.models.exceptions import ValidationError
+
         help_description = """
         Installs your dotfile's modules (default: installs all modules)
         NOTE: Your dotfiles need to have first been downloaded via `pydotfiles download` beforehand
         """
         parser = self.__get_base_parser(help_description, "install")
         parser.add_argument("-m", "--modules", help="A list of specific modules to install", nargs="+")
+        parser.add_argument("-j", "--jobs", help="The number of worker processes used to parse the modules' settings files (default: parses serially)", type=int)
+        parser.add_argument("--validate", help="Validates each settings file before installing anything, as part of the same parse that loads it", action="store_true")
+        parser.add_argument("--hash-algorithm", help=f"The algorithm used to compare copied files against their origins (default: {DEFAULT_HASH_ALGORITHM})", choices=HASH_ALGORITHMS, default=DEFAULT_HASH_ALGORITHM)
         args = parser.parse_args(command_arguments)
 
         # TODO P4: Add in cleaner signature
         config_repo_local, config_repo_remote = load_pydotfiles_config_data(CacheDirectory())
 
-        self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, args.quiet, args.verbose, args.modules)
+        validator = None
+        if args.validate:
+            from pydotfiles.models.validator import Validator
+            validator = Validator(args.quiet, args.verbose)
+
+        self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, args.quiet, args.verbose, args.modules, args.jobs, validator, args.hash_algorithm)
 
         if not self.dotfiles.is_cloned:
             PrettyPrint.fail(f"Install: No dotfiles detected, please download it first with `pydotfiles download`")
 
-        if args.modules is None:
-            self.dotfiles.install_all()
-        else:
-            self.dotfiles.install_multiple_modules(args.modules)
+        try:
+            if args.modules is None:
+                self.dotfiles.install_all()
+            else:
+                self.dotfiles.install_multiple_modules(args.modules)
+        except ValidationError as e:
+            PrettyPrint.fail(e.help_message)
 
     def uninstall(self, command_arguments):
+        from pydotfiles.models import Dotfiles, CacheDirectory, load_pydotfiles_config_data
+
         help_description = """
         Uninstalls your dotfile's modules (default: uninstalls all modules, but leaves packages, applications, and dev-environments alone)
         """
@@ -121,13 +186,14 @@ class ArgumentDispatcher:
         parser.add_argument("-p", "--uninstall-packages", help="Will uninstall all packages installed with these module(s)", action="store_true")
         parser.add_argument("-a", "--uninstall-applications", help="Will uninstall all applications installed with these module(s)", action="store_true")
         parser.add_argument("-e", "--uninstall-environments", help="Will uninstall all dev environments with these module(s)", action="store_true")
+        parser.add_argument("-j", "--jobs", help="The number of worker processes used to parse the modules' settings files (default: parses serially)", type=int)
         args = parser.parse_args(command_arguments)
 
         config_repo_local, config_repo_remote = load_pydotfiles_config_data(CacheDirectory())
 
         PrettyPrint.info(f"Uninstall: Uninstalling dotfiles")
 
-        self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, args.quiet, args.verbose, args.modules)
+        self.dotfiles = Dotfiles(config_repo_local, config_repo_remote, args.quiet, args.verbose, args.modules, args.jobs)
 
         if not self.dotfiles.is_cloned:
             PrettyPrint.fail(f"Uninstall: Could not uninstall- no dotfiles detected")
@@ -137,7 +203,43 @@ class ArgumentDispatcher:
         else:
             self.dotfiles.uninstall_multiple_modules(args.modules, args.uninstall_packages, args.uninstall_applications, args.uninstall_environments)
 
+    def rollback(self, command_arguments):
+        from pydotfiles.models import CacheDirectory, load_journal_runs, get_run_to_roll_back, roll_back_run
+        from pydotfiles.models.utils import ask_sudo_password, set_logging
+        from pydotfiles.utils import privileged_session
+
+        help_description = """
+        Undoes exactly the file operations a previous install ran (symlinks, copies, scripts
+        with undo scripts, backups and overwritten files), in reverse order
+        (default: rolls back the most recent install that hasn't already been rolled back)
+        """
+        parser = self.__get_base_parser(help_description, "rollback")
+        parser.add_argument("-r", "--run", help="The id of a specific install run to roll back (see `--list`)")
+        parser.add_argument("-l", "--list", help="Lists the journaled install runs instead of rolling one back", action="store_true")
+        args = parser.parse_args(command_arguments)
+
+        set_logging(args.quiet, args.verbose)
+        journal_file = CacheDirectory().journal_file
+
+        if args.list:
+            for run in load_journal_runs(journal_file):
+                rolled_back_label = ", rolled back" if run.is_rolled_back else ""
+                print(f"{run.run_id}: {run.status or 'interrupted'}{rolled_back_label} [number_of_operations={len(run.performed_operations)}]")
+            return
+
+        run = get_run_to_roll_back(journal_file, args.run)
+        if run is None:
+            PrettyPrint.fail(f"Rollback: No install to roll back was found in the journal" + ("" if args.run is None else f" [run={args.run}]"))
+
+        sudo_password = ask_sudo_password() if run.is_sudo_used else None
+        with privileged_session(sudo_password):
+            number_of_undone_operations = roll_back_run(journal_file, run, sudo_password)
+
+        PrettyPrint.success(f"Rollback: Successfully rolled back install [run={run.run_id}, number_of_operations={number_of_undone_operations}]")
+
     def update(self, command_arguments):
+        from pydotfiles.models import Dotfiles, CacheDirectory, load_pydotfiles_config_data
+
         help_description = """
         Updates the local dotfiles from the remote repo
         """
@@ -154,6 +256,9 @@ class ArgumentDispatcher:
         self.dotfiles.update()
 
     def clean(self, command_arguments):
+        from pydotfiles.models import PYDOTFILES_CACHE_DIRECTORY, DEFAULT_PYDOTFILES_CONFIG_LOCAL_DIRECTORY
+        from pydotfiles.models import Dotfiles, CacheDirectory, load_pydotfiles_config_data
+
         help_description = f"""
         Deletes either the pydotfiles cache or the downloaded local dotfiles config repo
 
@@ -173,6 +278,8 @@ class ArgumentDispatcher:
         self.dotfiles.clean(args.clean_target)
 
     def set(self, command_arguments):
+        from pydotfiles.models import CacheDirectory, load_pydotfiles_config_data, write_pydotfiles_config_data
+
         help_description = f"""
         Enables direct setting of pydotfile config values
         """
@@ -195,20 +302,48 @@ class ArgumentDispatcher:
         PrettyPrint.success(f"Set: Successfully persisted configuration data [local-directory={config_repo_local}, remote-repo={config_repo_remote}]")
 
     def validate(self, command_arguments):
+        from pydotfiles.models.validator import Validator, DEFAULT_IGNORE_PATTERNS
+        from pydotfiles.models.exceptions import ValidationError
+        from pydotfiles.models.primitives import CacheDirectory
+
         help_description = """
         Validates a given directory and whether it's pydotfiles-compliant.
         (default: Checks the current working directory)
         """
         parser = self.__get_base_parser(help_description, "validate")
         parser.add_argument("-d", "--directory", help="Validates the passed in directory", default=os.getcwd())
+        parser.add_argument("--no-cache", help="Re-validates every file, ignoring the results cached from previous successful validations", action="store_true")
+        parser.add_argument("-j", "--jobs", help="The number of worker processes used to validate files (default: validates serially)", type=int)
+        parser.add_argument("-f", "--format", help="The output format: `text` logs a summary, `ndjson` streams every error as a JSON record to stdout while validating", choices=["text", "ndjson"], default="text")
+        parser.add_argument("-l", "--layout-aware", help="Only validates what pydotfiles would load (each module's settings file, and the default settings files they reference) instead of every JSON/YAML file", action="store_true")
+        parser.add_argument("--ignore", help="A file/directory name or relative path pattern to skip, can be passed multiple times (.git and node_modules are always skipped)", action="append", dest="ignore_patterns", default=[])
+        parser.add_argument("--no-references", help="Skips checking that the files referenced by each configuration file (action origins, scripts, default settings files) exist", action="store_true")
+        scope_parser_group = parser.add_mutually_exclusive_group()
+        scope_parser_group.add_argument("-w", "--watch", help="Keeps running after the initial validation, revalidating changed files (and the files that reference them) on every save", action="store_true")
+        scope_parser_group.add_argument("-c", "--changed-since", help="Only validates the files changed since the given git revision (including uncommitted changes), plus the files that reference them", metavar="REVISION")
 
         args = parser.parse_args(command_arguments)
+        ignore_patterns = DEFAULT_IGNORE_PATTERNS + args.ignore_patterns
+
+        # NDJSON output owns stdout, so the normal logging is squelched
+        if args.format == "ndjson":
+            validator = Validator(True, False, None if args.no_cache else CacheDirectory(), sys.stdout, args.layout_aware, ignore_patterns, not args.no_references)
+        else:
+            validator = Validator(args.quiet, args.verbose, None if args.no_cache else CacheDirectory(), None, args.layout_aware, ignore_patterns, not args.no_references)
 
-        validator = Validator(args.quiet, args.verbose)
         try:
-            validator.validate_directory(args.directory)
+            if args.watch:
+                from pydotfiles.models.watcher import ValidationWatcher
+                ValidationWatcher(validator, args.directory).watch()
+            elif args.changed_since is not None:
+                from pydotfiles.models.revisions import get_changed_files
+                validator.validate_directory(args.directory, args.jobs, get_changed_files(args.directory, args.changed_since))
+            else:
+                validator.validate_directory(args.directory, args.jobs)
         except ValidationError as e:
             PrettyPrint.fail(e.help_message)
+        except KeyboardInterrupt:
+            pass
 
     @staticmethod
     def __get_base_parser(description, sub_command):
@@ -56,6 +56,13 @@ class LanguageEnvironmentManager:
 
         install_language_environment_manager(self.language_manager)
 
+    def is_language_version_installed(self, version):
+        return is_language_installed(self.language_manager, version)
+
+    @property
+    def are_plugins_installed(self):
+        return all(language_plugin.is_installed and language_plugin.are_virtual_environments_installed for language_plugin in self.language_plugin_managers)
+
     def install_plugins(self):
         for language_plugin in self.language_plugin_managers:
             language_plugin.install()
@@ -91,6 +98,16 @@ class DevelopmentEnvironment:
         self.versions = versions
         self.language_environment_manager = language_environment_manager
 
+    @property
+    def is_installed(self):
+        if not self.language_environment_manager.is_installed:
+            return False
+
+        if not all(self.language_environment_manager.is_language_version_installed(version) for version in self.versions):
+            return False
+
+        return self.language_environment_manager.are_plugins_installed
+
     def install(self):
         logger.info(f"Development Environment: Installing [lang={self.language}, versions={self.versions}, env_manager={self.language_environment_manager}")
         self.language_environment_manager.install()
@@ -160,6 +177,22 @@ def install_language(env_manager, language_version, sudo_password=""):
         raise NotImplementedError("Language Environment Manager: Sorry, the requested language manager is not currently supported (feel free to open an issue at https://github.com/JasonYao/pydotfiles/issues/new)")
 
 
+def is_language_installed(env_manager, language_version):
+    if env_manager == LanguageManager.PYENV:
+        check_response = run_command("pyenv versions")
+        return language_version in check_response
+    elif env_manager == LanguageManager.JENV:
+        check_response = run_command("brew cask list")
+
+        if language_version == "latest" or language_version == LATEST_CURRENT_JAVA_VERSION_IN_HOMEBREW:
+            return "java " in check_response
+        elif language_version == "8":
+            return "java8" in check_response
+        return False
+    else:
+        raise NotImplementedError("Language Environment Manager: Sorry, the requested language manager is not currently supported (feel free to open an issue at https://github.com/JasonYao/pydotfiles/issues/new)")
+
+
 def uninstall_language_environment_manager(env_manager):
     host_system = OS.get_host_system()
     package_manager = OS.get_package_manager(host_system)
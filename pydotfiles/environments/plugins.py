@@ -46,6 +46,17 @@ class LanguageEnvironmentPluginManager:
         else:
             raise NotImplementedError(f"Language Environment Plugin Manager: Sorry, the requested language plugin manager is not currently supported (feel free to open an issue at https://github.com/JasonYao/pydotfiles/issues/new) [env_plugin_manager={self.language_plugin_manager}]")
 
+    @property
+    def are_virtual_environments_installed(self):
+        if len(self.virtual_environments) == 0:
+            return True
+
+        if self.language_plugin_manager == LanguagePluginManager.PYENV_VIRTUALENV:
+            current_installed_versions = run_command("pyenv versions")
+            return all(virtual_environment.name in current_installed_versions for virtual_environment in self.virtual_environments)
+        else:
+            raise NotImplementedError(f"Language Environment Plugin Manager: Sorry, the requested language plugin manager is not currently supported (feel free to open an issue at https://github.com/JasonYao/pydotfiles/issues/new) [env_plugin_manager={self.language_plugin_manager}]")
+
     def install(self):
         if self.is_installed:
             logger.info(f"Language Environment Plugin Manager: Already installed language environment plugin manager [env_plugin_manager={self.language_plugin_manager}]")
@@ -9,9 +9,9 @@ from pydotfiles.environments import LanguageManager, LanguageEnvironmentManager
 from pydotfiles.environments import DevelopmentEnvironment
 
 
-def get_os_default_settings(default_setting_file_path):
+def get_os_default_settings(default_setting_file_path, config_loader=None):
     # Loads in the default settings file
-    default_settings_data = load_data_from_file(default_setting_file_path)
+    default_settings_data = load_data_from_file(default_setting_file_path) if config_loader is None else config_loader(default_setting_file_path)
 
     # Parses the default settings data
     return parse_default_settings(default_settings_data)
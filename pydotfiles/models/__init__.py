@@ -1,5 +1,6 @@
 # General imports
 import configparser
+import functools
 import shutil
 import os
 import subprocess
@@ -8,23 +9,24 @@ import re
 from subprocess import Popen, PIPE, TimeoutExpired
 from distutils.version import StrictVersion
 import logging
-
-# Vendor imports
-from git import Repo
-from git.remote import RemoteProgress
-from progressbar import ProgressBar
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 # Project imports
-from .enums import FileActionType, OverrideAction
+from .enums import FileActionType, OverrideAction, OperationType
 from .constants import *
 from .primitives import FileAction, CacheDirectory
 from .exceptions import PydotfilesError, PydotfilesErrorReason, ValidationError
-from .validator import Validator
+from .manifest import load_cached_modules, save_cached_modules
+from .discovery import discover_modules
+from .executor import FileActionExecutor
+from .plan import PlannedOperation, ModulePlan, InstallPlan, is_file_action_pending
+from .journal import journal_session, load_journal_runs, get_run_to_roll_back, roll_back_run
 
 from .utils import install_homebrew, uninstall_homebrew, load_data_from_file
-from .utils import get_user_override, ask_sudo_password
+from .utils import ask_sudo_password
 from .dock import DockManager
-from pydotfiles.utils import remove_prefix
+from pydotfiles.utils import remove_prefix, privileged_session, hash_database_session, stat_cache_session, DEFAULT_HASH_ALGORITHM
 from pydotfiles.defaults import get_current_mac_version
 from .utils import set_logging
 from pydotfiles.loading import get_os_default_settings
@@ -35,13 +37,31 @@ from pydotfiles.loading import parse_developer_environments
 logger = logging.getLogger(__name__)
 
 
+def __getattr__(name):
+    """
+    Lazily resolves the re-exports that pull in heavy vendor
+    libraries (GitPython, progressbar, jsonschema), so that
+    importing this package stays cheap for commands that never
+    need them. See PEP 562 for more information
+    """
+    if name == "Validator":
+        from .validator import Validator
+        return Validator
+
+    if name == "GitRemoteProgress":
+        from .remote import GitRemoteProgress
+        return GitRemoteProgress
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class Dotfiles:
     """
     Class representing the dotfiles that
     we are reading in
     """
 
-    def __init__(self, config_repo_local, config_repo_remote, is_quiet, is_verbose, active_modules=None):
+    def __init__(self, config_repo_local, config_repo_remote, is_quiet, is_verbose, active_modules=None, max_workers=None, validator=None, hash_algorithm=DEFAULT_HASH_ALGORITHM):
         self.config_repo_local = config_repo_local
         self.host_os = OS.from_string(sys.platform)
         self.cache_directory = CacheDirectory(package_manager=OS.get_package_manager(self.host_os))
@@ -53,10 +73,12 @@ class Dotfiles:
         else:
             self.config_repo_remote = config_repo_remote
 
-        module_information = load_active_modules(config_repo_local, active_modules, self.host_os, self.cache_directory) if self.is_cloned else None
-
-        self.modules = None if module_information is None else module_information[0]
-        self.is_sudo_used = None if module_information is None else module_information[1]
+        # Modules are only loaded on first access, so commands like `update` and `clean` never parse them
+        self.active_modules = active_modules
+        self.max_workers = max_workers
+        self.validator = validator
+        self.hash_algorithm = hash_algorithm
+        self._module_information = None
         self.sudo_password = None
 
     def __str__(self):
@@ -66,6 +88,20 @@ class Dotfiles:
     def is_cloned(self):
         return os.path.isdir(f"{self.config_repo_local}/.git")
 
+    @property
+    def module_information(self):
+        if self._module_information is None and self.is_cloned:
+            self._module_information = load_active_modules(self.config_repo_local, self.active_modules, self.host_os, self.cache_directory, max_workers=self.max_workers, validator=self.validator)
+        return self._module_information
+
+    @property
+    def modules(self):
+        return None if self.module_information is None else self.module_information[0]
+
+    @property
+    def is_sudo_used(self):
+        return None if self.module_information is None else self.module_information[1]
+
     def download(self):
         """
         Dotfile configs haven't been cloned yet, so cloning
@@ -75,8 +111,10 @@ class Dotfiles:
             raise PydotfilesError(PydotfilesErrorReason.NO_REMOTE_REPO, "Download: No dotfiles configuration git remote link passed in (try running `pydotfiles download -r <git remote link>`)")
 
         logger.info(f"Download: Cloning git repository [remote={self.config_repo_remote}, local={self.config_repo_local}]")
+        from .remote import clone_repo
+
         try:
-            Repo.clone_from(self.config_repo_remote, self.config_repo_local, progress=GitRemoteProgress())
+            clone_repo(self.config_repo_remote, self.config_repo_local)
             logger.info(f"Download: Successfully cloned git repository [remote={self.config_repo_remote}, local={self.config_repo_local}]")
         except Exception:
             logger.exception(f"Download: Failed to clone git repository [Remote={self.config_repo_remote}, Local={self.config_repo_local}]")
@@ -112,24 +150,53 @@ class Dotfiles:
         self.sudo_password = ask_sudo_password() if self.is_sudo_used else None
         self.__propagate_sudo_password__()
 
-        for module_name, module in self.modules.items():
-            module.install()
+        # Authenticates a single privileged helper up front, rather than running sudo for every file
+        with privileged_session(self.sudo_password), hash_database_session(self.cache_directory.hash_database_file, self.hash_algorithm), stat_cache_session(), self.__journal_session__():
+            self.get_install_plan().execute()
 
     def install_multiple_modules(self, module_names):
         # Propagates the sudo password for the program
         self.sudo_password = ask_sudo_password() if self.is_sudo_used else None
         self.__propagate_sudo_password__()
 
-        for module_name in module_names:
-            self.install_single_module(module_name)
+        with privileged_session(self.sudo_password), hash_database_session(self.cache_directory.hash_database_file, self.hash_algorithm), stat_cache_session(), self.__journal_session__():
+            self.get_install_plan(module_names).execute()
 
     def install_single_module(self, module_name):
-        module = self.modules.get(module_name)
+        self.install_multiple_modules([module_name])
 
-        if module is None:
-            raise PydotfilesError(PydotfilesErrorReason.UNKNOWN_MODULE_NAME, f"Module Installation: Failed to find the module `{module_name}` when trying to install")
+    def plan(self, module_names=None):
+        """
+        Computes what installing the given modules (default: all
+        modules) would do, without changing anything
+        """
+        if module_names is None:
+            module_names = list(self.modules.keys())
+
+        # Only asks for the sudo password if a default setting can only be checked with sudo
+        is_sudo_check_used = any(module.is_sudo_check_used for module in map(self.modules.get, module_names) if module is not None)
+        self.sudo_password = ask_sudo_password() if is_sudo_check_used else None
+        self.__propagate_sudo_password__()
+
+        # Copied files that haven't changed since the last run are compared by their recorded hashes
+        with hash_database_session(self.cache_directory.hash_database_file, self.hash_algorithm), stat_cache_session():
+            return self.get_install_plan(module_names)
+
+    def get_install_plan(self, module_names=None):
+        if module_names is None:
+            module_names = list(self.modules.keys())
+
+        module_plans = []
+        for module_name in module_names:
+            module = self.modules.get(module_name)
 
-        module.install()
+            if module is None:
+                raise PydotfilesError(PydotfilesErrorReason.UNKNOWN_MODULE_NAME, f"Module Installation: Failed to find the module `{module_name}` when trying to install")
+
+            is_after_other_operations = any(module_plan.has_other_operations for module_plan in module_plans)
+            module_plans.append(module.get_install_plan(is_after_other_operations))
+
+        return InstallPlan(module_plans)
 
     """
     Uninstallation methods
@@ -140,16 +207,18 @@ class Dotfiles:
         self.sudo_password = ask_sudo_password() if self.is_sudo_used else None
         self.__propagate_sudo_password__()
 
-        for module_name, module in self.modules.items():
-            module.uninstall(uninstall_packages, uninstall_applications, uninstall_environments)
+        with privileged_session(self.sudo_password), stat_cache_session():
+            for module_name, module in self.modules.items():
+                module.uninstall(uninstall_packages, uninstall_applications, uninstall_environments)
 
     def uninstall_multiple_modules(self, module_names, uninstall_packages, uninstall_applications, uninstall_environments):
         # Propagates the sudo password for the program
         self.sudo_password = ask_sudo_password() if self.is_sudo_used else None
         self.__propagate_sudo_password__()
 
-        for module_name in module_names:
-            self.uninstall_single_module(module_name, uninstall_packages, uninstall_applications, uninstall_environments)
+        with privileged_session(self.sudo_password), stat_cache_session():
+            for module_name in module_names:
+                self.uninstall_single_module(module_name, uninstall_packages, uninstall_applications, uninstall_environments)
 
     def uninstall_single_module(self, module_name, uninstall_packages, uninstall_applications, uninstall_environments):
         module = self.modules.get(module_name)
@@ -162,8 +231,10 @@ class Dotfiles:
             raise PydotfilesError(PydotfilesErrorReason.NO_REMOTE_REPO, f"Update: No dotfiles configuration git remote link passed in")
 
         logger.info(f"Update: Pulling git repository [Remote={self.config_repo_remote}, Local={self.config_repo_local}]")
+        from .remote import pull_repo
+
         try:
-            Repo(self.config_repo_local).remote('origin').pull(progress=GitRemoteProgress())
+            pull_repo(self.config_repo_local)
             logger.info(f"Update: Successfully updated dotfiles git repository [Remote={self.config_repo_remote}, Local={self.config_repo_local}, Remote=Origin]")
         except Exception:
             logger.exception(f"Update: Failed to update git repository [Remote={self.config_repo_remote}, Local={self.config_repo_local}]")
@@ -174,6 +245,10 @@ class Dotfiles:
             module.sudo_password = self.sudo_password
             module.__propagate_sudo_password__()
 
+    def __journal_session__(self):
+        # Journals every file operation, so that `pydotfiles rollback` can undo this install
+        return journal_session(self.cache_directory.journal_file, self.cache_directory.journal_stash_directory)
+
 
 class Module:
     """
@@ -181,53 +256,90 @@ class Module:
     values
     """
 
-    def __init__(self, name, directory, settings_file, start_file, post_file, undo_start_file, undo_post_file, symlinks, other_files, host_os, cache_directory):
+    def __init__(self, name, directory, settings_file, start_file, post_file, undo_start_file, undo_post_file, symlinks, other_files, directories, host_os, cache_directory, config_loader=None):
         self.name = name
         self.directory = directory
         self.symlinks = symlinks
         self.other_files = other_files
+        self.directories = directories
         self.host_os = host_os
         self.cache_directory = cache_directory
 
         self.start_action = None if start_file is None else FileAction(FileActionType.SCRIPT, start_file, undo_start_file, None, None)
         self.post_action = None if post_file is None else FileAction(FileActionType.SCRIPT, post_file, undo_post_file, None, None)
 
-        # Loads in the settings file
+        # Loads in the settings file (a config loader can hand back already-validated data instead)
         self.settings_file = settings_file
-        settings_data = load_data_from_file(self.settings_file)
-        self.operating_system = parse_operating_system_config(settings_data.get('os'), self.cache_directory, self.directory)
+        settings_data = load_data_from_file(self.settings_file) if config_loader is None else config_loader(self.settings_file)
+        self.operating_system = parse_operating_system_config(settings_data.get('os'), self.cache_directory, self.directory, config_loader)
         self.environments = parse_developer_environments(settings_data.get('environments'))
-        self.actions, self.is_sudo_used = parse_action_configs(settings_data.get('actions'), self.directory, self.symlinks, self.other_files)
+        self.actions, self.is_sudo_used = parse_action_configs(settings_data.get('actions'), self.directory, self.symlinks, self.other_files, self.directories)
         self.sudo_password = None
 
     def __str__(self):
         return f"Module [Name={self.name}, Start={self.start_action}, Settings={self.settings_file}, Post={self.post_action}]"
 
+    def __getstate__(self):
+        # The cache directory and sudo password are run-specific, so they're never persisted in the manifest cache
+        state = self.__dict__.copy()
+        state['cache_directory'] = None
+        state['sudo_password'] = None
+        return state
+
+    def attach_cache_directory(self, cache_directory):
+        self.cache_directory = cache_directory
+
+        if self.operating_system is not None:
+            self.operating_system.cache_directory = cache_directory
+
     def install(self):
+        self.get_install_plan().execute()
+
+    @property
+    def is_sudo_check_used(self):
+        # File actions are checked as the user, so only default settings can need sudo to be checked
+        return self.operating_system is not None and self.operating_system.name == self.host_os and self.operating_system.is_sudo_check_used
+
+    def get_install_plan(self, is_after_other_operations=False):
+        """
+        Checks every step of the install up front,
+        returning only the ones that are still pending
+        """
         if self.operating_system is not None and self.operating_system.name != self.host_os:
-            logger.info(f"Install: Skipping operating system installation due to OS mismatch [HostOS={self.host_os}, ModuleOS={self.operating_system.name}]")
-            return
+            logger.info(f"Plan: Skipping operating system installation due to OS mismatch [HostOS={self.host_os}, ModuleOS={self.operating_system.name}]")
+            return ModulePlan(self.name, [])
 
-        logger.info(f"Install: Installing module [name={self.name}]")
+        operations = []
 
         if self.start_action is not None:
-            self.start_action.do()
+            operations.append(PlannedOperation(OperationType.START_ACTION, str(self.start_action), self.start_action.do))
 
         if self.operating_system is not None:
-            self.operating_system.install_packages()
-            self.operating_system.install_applications()
-            self.operating_system.install_settings()
-            self.operating_system.install_default_dock()
+            operations.extend(self.operating_system.get_install_operations())
 
         for environment in self.environments:
-            environment.install()
+            if environment.is_installed:
+                logger.debug(f"Plan: Development environment already installed [lang={environment.language}, versions={environment.versions}]")
+                continue
+
+            operations.append(PlannedOperation(OperationType.ENVIRONMENT, f"{environment.language} {', '.join(environment.versions)}", environment.install))
+
+        # A start script, package or earlier module could still change a completed action's destination
+        is_rechecked = is_after_other_operations or any(operation.operation_type != OperationType.FILE_ACTION for operation in operations)
 
-        self.do_actions()
+        for action in self.actions:
+            if is_file_action_pending(action):
+                operations.append(PlannedOperation(OperationType.FILE_ACTION, str(action), target=action))
+            elif is_rechecked:
+                logger.debug(f"Plan: Action already completed, checking it again once the steps before it have run [Action={action}]")
+                operations.append(PlannedOperation(OperationType.FILE_ACTION, str(action), target=action, is_rechecked=True))
+            else:
+                logger.debug(f"Plan: Action already completed [Action={action}]")
 
         if self.post_action is not None:
-            self.post_action.do()
+            operations.append(PlannedOperation(OperationType.POST_ACTION, str(self.post_action), self.post_action.do))
 
-        logger.info(f"Install: Successfully installed module [name={self.name}]")
+        return ModulePlan(self.name, operations)
 
     def uninstall(self, uninstall_packages, uninstall_applications, uninstall_environments):
         if self.operating_system is not None and self.operating_system.name != self.host_os:
@@ -257,65 +369,11 @@ class Module:
 
         logger.info(f"Uninstall: Successfully uninstalled module [name={self.name}]")
 
-    def do_actions(self):
-        override_action = None
-        for action in self.actions:
-            try:
-                override_action = self.__do_action_with_override__(override_action, action)
-            except FileExistsError:
-                logger.debug(f"Action: Failed to complete action [Action={action}]")
-                override_action = get_user_override(action)
-                override_action = self.__do_action_with_override__(override_action, action)
-
-    def undo_actions(self):
-        for file_action in self.actions:
-            try:
-                logger.info(f"Action: Starting undo action [Action={file_action}]")
-                file_action.undo()
-                logger.info(f"Action: Successfully undid action [Action={file_action}]")
-            except Exception:
-                logger.exception(f"Action: Failed to undo action [Action={file_action}]")
-                raise
+    def do_actions(self, max_workers=None):
+        FileActionExecutor(max_workers).do_actions(self.actions)
 
-    @staticmethod
-    def __do_action_with_override__(override_action, action):
-        # Normal procedure
-        if override_action is None:
-            logger.info(f"Action: Starting action [Action={action}]")
-            action.do()
-            logger.info(f"Action: Successfully completed action [Action={action}]")
-            return None
-
-        # Skips the actions
-        if override_action == OverrideAction.SKIP_FILE:
-            logger.info(f"Action: Skipping action [Action={action}]")
-            return None
-
-        if override_action == OverrideAction.SKIP_ALL_FILES:
-            logger.info(f"Action: Skipping all actions [Action={action}]")
-            return OverrideAction.SKIP_ALL_FILES
-
-        # Overwrites the actions
-        if override_action == OverrideAction.OVERWRITE_FILE:
-            logger.info(f"Action: Overwriting action destination [Action={action}]")
-            action.overwrite()
-            return None
-
-        if override_action == OverrideAction.OVERWRITE_ALL_FILES:
-            logger.info(f"Action: Overwriting all action's destinations [Action={action}]")
-            action.overwrite()
-            return OverrideAction.OVERWRITE_ALL_FILES
-
-        # Backs up first before performing the action
-        if override_action == OverrideAction.BACKUP_FILE:
-            logger.info(f"Action: Backing up first for action [Action={action}]")
-            action.backup()
-            return None
-
-        if override_action == OverrideAction.BACKUP_ALL_FILES:
-            logger.info(f"Action: Backing up first for all actions [Action={action}]")
-            action.backup()
-            return None
+    def undo_actions(self, max_workers=None):
+        FileActionExecutor(max_workers).undo_actions(self.actions)
 
     def __propagate_sudo_password__(self):
         for action in self.actions:
@@ -337,7 +395,7 @@ class OperatingSystem:
     operating system
     """
 
-    def __init__(self, name, shell, packages, applications, cache_directory, default_dock, settings, dock_manager):
+    def __init__(self, name, shell, packages, applications, cache_directory, default_dock, settings, dock_manager, default_settings_file=None):
         self.name = OS.from_string(name)
         self.shell = shell
         self.package_manager = OS.get_package_manager(self.name)
@@ -347,8 +405,15 @@ class OperatingSystem:
         self.default_dock = default_dock
         self.settings = settings
         self.dock_manager = dock_manager
+        self.default_settings_file = default_settings_file
         self.sudo_password = None
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['cache_directory'] = None
+        state['sudo_password'] = None
+        return state
+
     def install_package_manager(self):
         if self.name == OS.MACOS:
             install_homebrew()
@@ -399,11 +464,55 @@ class OperatingSystem:
         current_mac_version = get_current_mac_version()
         for setting in self.settings:
             if setting.should_run(current_mac_version, self.sudo_password):
-                logger.info(f"Setting: Default setting not set, setting now [default_setting={setting.name}, description={setting.description}]")
-                setting.run(self.sudo_password)
+                self.install_setting(setting)
             else:
                 logger.info(f"Setting: Default setting already set [default_setting={setting.name}, description={setting.description}]")
 
+    def install_setting(self, setting):
+        logger.info(f"Setting: Default setting not set, setting now [default_setting={setting.name}, description={setting.description}]")
+        setting.run(self.sudo_password)
+
+    @property
+    def is_sudo_check_used(self):
+        return any(setting.enabled and setting.run_as_sudo and setting.check_command is not None for setting in self.settings or [])
+
+    @property
+    def is_default_dock_set(self):
+        if self.name != OS.MACOS or self.default_dock is None:
+            return True
+
+        return len(self.default_dock ^ self.dock_manager.get_current_dock_applications()) == 0
+
+    def get_install_operations(self):
+        """
+        Returns the packages, applications, default settings and
+        dock that still need to be installed, checking each
+        one against the caches (or its check command) once
+        """
+        operations = []
+
+        for package_with_args in self.packages or []:
+            if self.cache_directory.is_package_installed(package_with_args.split()[0]):
+                continue
+            operations.append(PlannedOperation(OperationType.PACKAGE, package_with_args, functools.partial(self.install_package, package_with_args)))
+
+        for application in self.applications or []:
+            if self.cache_directory.is_application_installed(application):
+                continue
+            operations.append(PlannedOperation(OperationType.APPLICATION, application, functools.partial(self.install_application, application)))
+
+        if self.settings:
+            current_mac_version = get_current_mac_version()
+            for setting in self.settings:
+                if not setting.should_run(current_mac_version, self.sudo_password):
+                    continue
+                operations.append(PlannedOperation(OperationType.SETTING, setting.name if setting.description is None else f"{setting.name} ({setting.description})", functools.partial(self.install_setting, setting)))
+
+        if not self.is_default_dock_set:
+            operations.append(PlannedOperation(OperationType.DEFAULT_DOCK, ", ".join(sorted(self.default_dock)), self.install_default_dock))
+
+        return operations
+
     def uninstall_package_manager(self):
         if self.name == OS.MACOS:
             uninstall_homebrew()
@@ -573,38 +682,6 @@ class OperatingSystem:
             self.uninstall_package(application)
 
 
-"""
-Helper classes
-"""
-
-
-class GitRemoteProgress(RemoteProgress):
-    """
-    An object passed as a callback that will display
-    a progressbar while downloading files from the git
-    remote
-    """
-
-    def __init__(self):
-        super().__init__()
-        self.progress_bar = None
-        self.is_done = False
-
-    def update(self, op_code, cur_count, max_count=None, message=''):
-        if self.is_done:
-            return
-
-        if self.progress_bar is None:
-            self.progress_bar = ProgressBar(max_value=max_count)
-            self.progress_bar.start()
-
-        if cur_count == max_count:
-            self.progress_bar.finish()
-            self.is_done = True
-        else:
-            self.progress_bar.update(cur_count)
-
-
 """
 Parsing: Global pydotfiles configs
 """
@@ -667,7 +744,7 @@ Parsing: Module-level configs
 """
 
 
-def parse_operating_system_config(os_config, cache_directory, directory):
+def parse_operating_system_config(os_config, cache_directory, directory, config_loader=None):
     """
     Deserializes a single OS dictionary
     to an OS object
@@ -686,9 +763,10 @@ def parse_operating_system_config(os_config, cache_directory, directory):
         default_settings_file_name = os_config.get('default_settings_file')
 
         default_settings = None
+        default_settings_file_path = None
         if default_settings_file_name is not None:
             default_settings_file_path = os.path.join(directory, default_settings_file_name)
-            default_settings = get_os_default_settings(default_settings_file_path)
+            default_settings = get_os_default_settings(default_settings_file_path, config_loader)
 
         return OperatingSystem(
             name=name,
@@ -699,10 +777,11 @@ def parse_operating_system_config(os_config, cache_directory, directory):
             default_dock=default_dock_applications,
             settings=default_settings,
             dock_manager=DockManager(),
+            default_settings_file=default_settings_file_path,
         )
 
 
-def parse_action_configs(action_configs, directory, symlinks, other_files):
+def parse_action_configs(action_configs, directory, symlinks, other_files, directories):
     is_sudo_used = False
 
     if action_configs is None:
@@ -717,11 +796,12 @@ def parse_action_configs(action_configs, directory, symlinks, other_files):
         use_sudo = action_group.get('sudo', False)
         make_hidden = action_group.get('hidden', False)
         use_absolute_path = action_group.get('absolute', False)
+        delete_extras = action_group.get('delete', False)
 
         if use_sudo:
             is_sudo_used = True
 
-        action_map.update(deserialize_file_action(action, file_map, use_sudo, make_hidden, use_absolute_path, directory, symlinks, other_files))
+        action_map.update(deserialize_file_action(action, file_map, use_sudo, make_hidden, use_absolute_path, directory, symlinks, other_files, directories, delete_extras))
 
     return list(action_map.values()), is_sudo_used
 
@@ -731,20 +811,20 @@ Parsing: FileActions
 """
 
 
-def deserialize_file_action(action, file_map, use_sudo, make_hidden, use_absolute_path, directory, symlinks, other_files):
+def deserialize_file_action(action, file_map, use_sudo, make_hidden, use_absolute_path, directory, symlinks, other_files, directories, delete_extras=False):
     action_map = {}
 
-    action_map.update(deserialize_file_action_expansion(action, file_map, use_sudo, make_hidden, symlinks, other_files))
+    action_map.update(deserialize_file_action_expansion(action, file_map, use_sudo, make_hidden, symlinks, other_files, directories, delete_extras))
 
     for origin, destination in file_map.items():
         absolute_origin = resolve_file_action_absolute_origin(action, origin, directory, use_absolute_path)
         absolute_destination = resolve_file_action_absolute_destination(destination, make_hidden)
-        action_map[(action, absolute_destination)] = FileAction(action, absolute_origin, absolute_destination, use_sudo)
+        action_map[(action, absolute_destination)] = FileAction(action, absolute_origin, absolute_destination, use_sudo, delete_extras=delete_extras)
 
     return action_map
 
 
-def deserialize_file_action_expansion(action, file_map, use_sudo, make_hidden, symlinks, other_files):
+def deserialize_file_action_expansion(action, file_map, use_sudo, make_hidden, symlinks, other_files, directories, delete_extras=False):
     action_map = {}
 
     # Deals with the case of "all"
@@ -760,6 +840,12 @@ def deserialize_file_action_expansion(action, file_map, use_sudo, make_hidden, s
                 destination_file = f"{all_case_destination_base}/{'.' if make_hidden else ''}{os.path.basename(origin)}"
                 absolute_destination = os.path.expanduser(destination_file)
                 action_map[(action, absolute_destination)] = FileAction(action, origin, absolute_destination, use_sudo)
+        elif action == FileActionType.SYNC:
+            # Each of the module's (non-hidden) directories gets mirrored as a whole
+            for origin in sorted(origin for origin in directories if not os.path.basename(origin).startswith('.')):
+                destination_directory = f"{all_case_destination_base}/{'.' if make_hidden else ''}{os.path.basename(origin)}"
+                absolute_destination = os.path.expanduser(destination_directory)
+                action_map[(action, absolute_destination)] = FileAction(action, origin, absolute_destination, use_sudo, delete_extras=delete_extras)
         else:
             raise NotImplementedError(f"File Action: The file action `{action}` currently doesn't support expansion, please open an issue on github if you would like to have it")
         file_map.pop('*')
@@ -775,7 +861,7 @@ def resolve_file_action_absolute_origin(action, origin, directory, use_absolute_
     # Gives back a relative origin based off of the action type
     if action == FileActionType.SYMLINK:
         return f"{os.path.join(directory, origin)}.symlink"
-    elif action == FileActionType.COPY:
+    elif action == FileActionType.COPY or action == FileActionType.SYNC:
         return f"{os.path.join(directory, origin)}"
     else:
         raise NotImplementedError(f"File Action: The action `{action}` is currently not supported")
@@ -798,73 +884,90 @@ Object creation: Modules
 """
 
 
-def load_active_modules(config_repo_local, active_modules, host_os, cache_directory):
-    modules = {}
-    is_sudo_used = False
+def load_active_modules(config_repo_local, active_modules, host_os, cache_directory, use_manifest_cache=True, max_workers=None, validator=None):
+    """
+    Loads in the active modules, re-using the persisted manifest
+    cache when none of the module inputs have changed since it
+    was written. If a validator is passed in, every settings file
+    is validated as part of the same (single) parse that loads it
+    """
+    is_validated = validator is not None
 
-    module_names = get_module_names(config_repo_local) if active_modules is None else active_modules
-    for module_name in module_names:
-        settings_file = None
+    if use_manifest_cache:
+        cached_module_information = load_cached_modules(cache_directory, config_repo_local, active_modules, host_os, is_validated)
+        if cached_module_information is not None:
+            return cached_module_information
 
-        start_file = None
-        post_file = None
+    config_loader = None
+    if is_validated:
+        validator.index_directory(config_repo_local)
+        config_loader = validator.load_validated_file
 
-        undo_start_file = None
-        undo_post_file = None
+    modules, is_sudo_used = parse_active_modules(config_repo_local, active_modules, host_os, cache_directory, max_workers, config_loader)
 
-        module_directory = os.path.join(config_repo_local, module_name)
-        module_symlinks = []
-        module_generic_files = []
+    if use_manifest_cache:
+        try:
+            save_cached_modules(cache_directory, config_repo_local, active_modules, host_os, modules, is_sudo_used, is_validated)
+        except Exception:
+            # The manifest is purely an optimization, so failing to persist it should never block a run
+            logger.warning(f"Manifest: Unable to persist the manifest cache [file={cache_directory.manifest_cache_file}]", exc_info=True)
 
-        for module_file in os.listdir(module_directory):
-            full_module_file_path = os.path.join(module_directory, module_file)
-            if module_file == 'start':
-                start_file = full_module_file_path
-                continue
+    return modules, is_sudo_used
 
-            if module_file == 'undo-start':
-                undo_start_file = full_module_file_path
-                continue
 
-            if module_file == 'settings.yaml' or module_file == 'settings.json':
-                settings_file = full_module_file_path
-                continue
+def parse_active_modules(config_repo_local, active_modules, host_os, cache_directory, max_workers=None, config_loader=None):
+    """
+    Parses every active module, optionally fanning the parsing of
+    independent modules out over a process pool (YAML parsing is
+    CPU-bound, so threads wouldn't help). Either way, the modules
+    are merged back in the same order as the module names
+    """
+    module_index = discover_modules(config_repo_local, active_modules)
 
-            if module_file == 'post':
-                post_file = full_module_file_path
-                continue
+    if max_workers is None or max_workers <= 1 or len(module_index) <= 1:
+        parsed_modules = [parse_module(module_files, host_os, cache_directory, config_loader) for module_files in module_index.values()]
+    else:
+        logger.debug(f"Module Loading: Parsing modules in parallel [number_of_modules={len(module_index)}, max_workers={max_workers}]")
 
-            if module_file == 'undo-post':
-                undo_post_file = full_module_file_path
-                continue
+        # The cache directory is run-specific state, so it's re-attached in this process instead of being sent to the workers
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parsed_modules = list(executor.map(
+                parse_module,
+                module_index.values(),
+                repeat(host_os),
+                repeat(None),
+                repeat(config_loader)
+            ))
 
-            if module_file.endswith(".symlink"):
-                module_symlinks.append(full_module_file_path)
-            else:
-                module_generic_files.append(full_module_file_path)
-
-        modules[module_name] = Module(
-            name=module_name,
-            directory=module_directory,
-            start_file=start_file,
-            post_file=post_file,
-            undo_start_file=undo_start_file,
-            undo_post_file=undo_post_file,
-            settings_file=settings_file,
-            symlinks=module_symlinks,
-            other_files=module_generic_files,
-            host_os=host_os,
-            cache_directory=cache_directory
-        )
+        for parsed_module in parsed_modules:
+            parsed_module.attach_cache_directory(cache_directory)
 
-        if modules[module_name].is_sudo_used:
-            is_sudo_used = True
+    modules = {module.name: module for module in parsed_modules}
+    is_sudo_used = any(module.is_sudo_used for module in parsed_modules)
 
     return modules, is_sudo_used
 
 
+def parse_module(module_files, host_os, cache_directory, config_loader=None):
+    return Module(
+        name=module_files.name,
+        directory=module_files.directory,
+        start_file=module_files.start_file,
+        post_file=module_files.post_file,
+        undo_start_file=module_files.undo_start_file,
+        undo_post_file=module_files.undo_post_file,
+        settings_file=module_files.settings_file,
+        symlinks=module_files.symlinks,
+        other_files=module_files.other_files,
+        directories=module_files.directories,
+        host_os=host_os,
+        cache_directory=cache_directory,
+        config_loader=config_loader
+    )
+
+
 def get_module_names(config_repo_local):
-    return [module_name for module_name in os.listdir(config_repo_local) if os.path.isdir(os.path.join(config_repo_local, module_name)) and module_name != ".git"]
+    return list(discover_modules(config_repo_local))
 
 
 """
@@ -0,0 +1,170 @@
+# General imports
+import hashlib
+import json
+import logging
+import threading
+
+
+"""
+Generates plain Python validation functions from (already inlined)
+JSON schemas, in the style of fastjsonschema. The generated function
+only answers whether a document is valid, which is all the common
+case needs; the jsonschema interpreter is still used to explain
+exactly why an invalid document failed
+"""
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the generated code changes, so stale generated validators are never reused
+CODEGEN_VERSION = 1
+
+# Keywords that never affect whether a document is valid
+ANNOTATION_KEYWORDS = {'$schema', '$id', '$comment', 'definitions', 'default', 'title', 'description', 'examples'}
+
+TYPE_CHECKS = {
+    'object': "isinstance({variable}, dict)",
+    'array': "isinstance({variable}, list)",
+    'string': "isinstance({variable}, str)",
+    'boolean': "isinstance({variable}, bool)",
+    'null': "{variable} is None",
+    'number': "(isinstance({variable}, (int, float)) and not isinstance({variable}, bool))",
+    'integer': "((isinstance({variable}, int) and not isinstance({variable}, bool)) or (isinstance({variable}, float) and {variable}.is_integer()))",
+}
+
+# Process-wide registry of generated validators, keyed by schema hash
+generated_validators = {}
+generated_validators_lock = threading.Lock()
+
+
+def get_generated_validator(schema):
+    """
+    Returns the generated validation function for the given schema,
+    generating it on first use. Returns None if the schema uses a
+    keyword the generator doesn't support
+    """
+    schema_hash = get_schema_hash(schema)
+    if schema_hash in generated_validators:
+        return generated_validators[schema_hash]
+
+    with generated_validators_lock:
+        if schema_hash not in generated_validators:
+            try:
+                generated_validators[schema_hash] = compile_validator(generate_validator_source(schema))
+                logger.debug(f"Codegen: Generated schema validator [schema_hash={schema_hash}]")
+            except NotImplementedError as e:
+                logger.debug(f"Codegen: Schema can't be code-generated, falling back to jsonschema [schema_hash={schema_hash}, reason={e}]")
+                generated_validators[schema_hash] = None
+
+    return generated_validators[schema_hash]
+
+
+def get_schema_hash(schema):
+    canonical_schema = json.dumps(schema, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"{CODEGEN_VERSION}:{canonical_schema}".encode()).hexdigest()
+
+
+def generate_validator_source(schema, function_name="validate"):
+    """
+    Generates the source of a function that returns
+    whether a document is valid against the schema
+    """
+    code_generator = CodeGenerator()
+    code_generator.emit(f"def {function_name}(data):", 0)
+    code_generator.generate(schema, "data", 1)
+    code_generator.emit("return True", 1)
+    return "\n".join(code_generator.lines) + "\n"
+
+
+def compile_validator(validator_source, function_name="validate"):
+    validator_namespace = {}
+    exec(compile(validator_source, f"<generated validator {function_name}>", "exec"), validator_namespace)
+    return validator_namespace[function_name]
+
+
+class CodeGenerator:
+    """
+    Walks a schema, emitting the checks for each keyword
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.number_of_variables = 0
+
+    def emit(self, line, indent):
+        self.lines.append(f"{'    ' * indent}{line}")
+
+    def close_block(self, block_start, indent):
+        # A block whose checks all turned out to be no-ops still needs a body
+        if len(self.lines) == block_start:
+            self.emit("pass", indent)
+
+    def new_variable(self):
+        self.number_of_variables += 1
+        return f"value_{self.number_of_variables}"
+
+    def generate(self, schema, variable, indent):
+        if schema is True or schema == {}:
+            return
+
+        if schema is False:
+            self.emit("return False", indent)
+            return
+
+        unsupported_keywords = set(schema) - ANNOTATION_KEYWORDS - {'type', 'enum', 'properties', 'required', 'items', 'allOf'}
+        if len(unsupported_keywords) > 0:
+            raise NotImplementedError(f"Unsupported schema keywords {sorted(unsupported_keywords)}")
+
+        if 'type' in schema:
+            self.generate_type(schema['type'], variable, indent)
+
+        if 'enum' in schema:
+            self.generate_enum(schema['enum'], variable, indent)
+
+        if 'required' in schema or 'properties' in schema:
+            self.emit(f"if isinstance({variable}, dict):", indent)
+            block_start = len(self.lines)
+
+            for required_property in schema.get('required', []):
+                self.emit(f"if {required_property!r} not in {variable}:", indent + 1)
+                self.emit("return False", indent + 2)
+
+            for property_name, property_schema in schema.get('properties', {}).items():
+                property_variable = self.new_variable()
+                self.emit(f"if {property_name!r} in {variable}:", indent + 1)
+                self.emit(f"{property_variable} = {variable}[{property_name!r}]", indent + 2)
+                self.generate(property_schema, property_variable, indent + 2)
+
+            self.close_block(block_start, indent + 1)
+
+        if 'items' in schema:
+            if not isinstance(schema['items'], (dict, bool)):
+                raise NotImplementedError("Unsupported tuple-style `items`")
+
+            item_variable = self.new_variable()
+            self.emit(f"if isinstance({variable}, list):", indent)
+            self.emit(f"for {item_variable} in {variable}:", indent + 1)
+            block_start = len(self.lines)
+            self.generate(schema['items'], item_variable, indent + 2)
+            self.close_block(block_start, indent + 2)
+
+        for sub_schema in schema.get('allOf', []):
+            self.generate(sub_schema, variable, indent)
+
+    def generate_type(self, schema_type, variable, indent):
+        schema_types = [schema_type] if isinstance(schema_type, str) else schema_type
+
+        unsupported_types = [single_type for single_type in schema_types if single_type not in TYPE_CHECKS]
+        if len(unsupported_types) > 0:
+            raise NotImplementedError(f"Unsupported schema types {unsupported_types}")
+
+        type_check = " or ".join(TYPE_CHECKS[single_type].format(variable=variable) for single_type in schema_types)
+        self.emit(f"if not ({type_check}):", indent)
+        self.emit("return False", indent + 1)
+
+    def generate_enum(self, enum_values, variable, indent):
+        # Other values (e.g. booleans vs integers) have equality subtleties that jsonschema handles specially
+        if not all(isinstance(enum_value, str) for enum_value in enum_values):
+            raise NotImplementedError("Unsupported non-string `enum` values")
+
+        self.emit(f"if not isinstance({variable}, str) or {variable} not in {tuple(enum_values)!r}:", indent)
+        self.emit("return False", indent + 1)
@@ -0,0 +1,91 @@
+# General imports
+import logging
+import os
+
+
+"""
+Module discovery, building an index of every module in a
+dotfiles repo and its classified files in a single pass
+"""
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE_NAMES = {'settings.yaml', 'settings.json'}
+
+
+class ModuleFiles:
+    """
+    Class representing the classified files
+    found in a single module's directory
+    """
+
+    def __init__(self, name, directory):
+        self.name = name
+        self.directory = directory
+
+        self.settings_file = None
+
+        self.start_file = None
+        self.post_file = None
+
+        self.undo_start_file = None
+        self.undo_post_file = None
+
+        self.symlinks = []
+        self.other_files = []
+        self.directories = []
+
+    def __str__(self):
+        return f"ModuleFiles [Name={self.name}, Directory={self.directory}, Settings={self.settings_file}, Symlinks={len(self.symlinks)}, Other={len(self.other_files)}]"
+
+    def add(self, directory_entry):
+        """
+        Classifies a single os.DirEntry from the module's directory
+        """
+        file_name = directory_entry.name
+        file_path = directory_entry.path
+
+        if file_name == 'start':
+            self.start_file = file_path
+        elif file_name == 'undo-start':
+            self.undo_start_file = file_path
+        elif file_name in SETTINGS_FILE_NAMES:
+            self.settings_file = file_path
+        elif file_name == 'post':
+            self.post_file = file_path
+        elif file_name == 'undo-post':
+            self.undo_post_file = file_path
+        elif file_name.endswith(".symlink"):
+            self.symlinks.append(file_path)
+        elif directory_entry.is_dir():
+            # Subdirectories can't be the origin of a single file action, only of an expanded sync
+            self.directories.append(file_path)
+        else:
+            self.other_files.append(file_path)
+
+
+def discover_modules(config_repo_local, active_modules=None):
+    """
+    Builds an index of module name -> ModuleFiles, relying on the
+    type information from os.scandir so that no extra stat calls
+    are needed. If no active modules are passed in, every top-level
+    directory (besides .git) is treated as a module
+    """
+    if active_modules is None:
+        with os.scandir(config_repo_local) as repo_entries:
+            module_names = [repo_entry.name for repo_entry in repo_entries if repo_entry.name != ".git" and repo_entry.is_dir()]
+    else:
+        module_names = list(active_modules)
+
+    module_index = {}
+    for module_name in module_names:
+        module_files = ModuleFiles(module_name, os.path.join(config_repo_local, module_name))
+
+        with os.scandir(module_files.directory) as module_entries:
+            for module_entry in module_entries:
+                module_files.add(module_entry)
+
+        module_index[module_name] = module_files
+
+    logger.debug(f"Module Discovery: Indexed modules [directory={config_repo_local}, number_of_modules={len(module_index)}]")
+    return module_index
@@ -21,6 +21,9 @@ class FileActionType(Enum):
     SCRIPT = auto()
     UNDO_SCRIPT = auto()
 
+    SYNC = auto()
+    UNSYNC = auto()
+
     @staticmethod
     def from_string(label):
         if label is None:
@@ -32,7 +35,8 @@ class FileActionType(Enum):
         file_action_reverse_mapping = BijectiveDictionary({
             FileActionType.COPY: FileActionType.DELETE,
             FileActionType.SYMLINK: FileActionType.UNSYMLINK,
-            FileActionType.SCRIPT: FileActionType.UNDO_SCRIPT
+            FileActionType.SCRIPT: FileActionType.UNDO_SCRIPT,
+            FileActionType.SYNC: FileActionType.UNSYNC
         })
         return file_action_reverse_mapping.get(file_action_type)
 
@@ -68,6 +72,23 @@ class OverrideAction(Enum):
         }
 
 
+class OperationType(Enum):
+    """
+    Represents what kind of step a planned
+    operation is, in the order that a
+    module's install runs them
+    """
+
+    START_ACTION = auto()
+    PACKAGE = auto()
+    APPLICATION = auto()
+    SETTING = auto()
+    DEFAULT_DOCK = auto()
+    ENVIRONMENT = auto()
+    FILE_ACTION = auto()
+    POST_ACTION = auto()
+
+
 """
 Exception enums
 """
@@ -113,10 +134,14 @@ class ValidationErrorReason(Enum):
     INVALID_SCHEMA_VERSION = auto()
     INVALID_SCHEMA_TYPE = auto()
 
+    # Semantic issues
+    MISSING_REFERENCE = auto()
+
     @staticmethod
     def get_help_message(reason):
         help_message_map = {
             ValidationErrorReason.INVALID_EMPTY_FILE: "An empty invalid configuration file was detected",
-            ValidationErrorReason.INVALID_SCHEMA: "A given configuration file contains an invalid schema"
+            ValidationErrorReason.INVALID_SCHEMA: "A given configuration file contains an invalid schema",
+            ValidationErrorReason.MISSING_REFERENCE: "A given configuration file references files that don't exist"
         }
         return help_message_map.get(reason)
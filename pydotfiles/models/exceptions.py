@@ -15,7 +15,7 @@ class PydotfilesError(Exception):
 
 class ValidationError(Exception):
 
-    def __init__(self, reason, help_message_override=None, context_map=None):
+    def __init__(self, reason, help_message_override=None, context_map=None, schema_errors=None):
         super().__init__()
         self.reason = reason
         self.help_message_override = help_message_override
@@ -25,9 +25,20 @@ class ValidationError(Exception):
             }
         self.context_map = context_map
 
+        # Every individual schema error found in the file, as {path, reason, schema_pointer} dictionaries
+        self.schema_errors = [] if schema_errors is None else schema_errors
+
+    def __reduce__(self):
+        # Enables passing validation errors back from worker processes
+        return ValidationError, (self.reason, self.help_message_override, self.context_map, self.schema_errors)
+
+    @property
+    def undecorated_help_message(self):
+        return ValidationErrorReason.get_help_message(self.reason) if self.help_message_override is None else self.help_message_override
+
     @property
     def help_message(self):
-        undecorated_original_help_message = ValidationErrorReason.get_help_message(self.reason) if self.help_message_override is None else self.help_message_override
+        undecorated_original_help_message = self.undecorated_help_message
 
         if len(self.context_map) == 0:
             serialized_context_decoration = ""
@@ -0,0 +1,249 @@
+# General imports
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+# Project imports
+from .enums import FileActionType, OverrideAction
+from .journal import make_directories_journaled
+from .utils import get_user_override
+
+
+"""
+Runs a module's file actions concurrently. Actions are grouped by
+their destination directory (merging groups whose destinations
+contain one another), and each group runs serially on a
+bounded thread pool, so anything touching the same path stays in
+order while unrelated directories don't wait on each other's
+(potentially slow, e.g. NFS) syscalls
+"""
+
+logger = logging.getLogger(__name__)
+
+# File actions are I/O bound, so this mirrors ThreadPoolExecutor's own default rather than the number of CPUs
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Scripts can depend on anything that ran before them (and vice versa), so they never run concurrently
+SERIAL_ACTION_TYPES = {FileActionType.SCRIPT, FileActionType.UNDO_SCRIPT}
+
+
+class FileActionExecutor:
+    """
+    Class representing a bounded pool of workers that
+    (un)does file actions, collecting the actions whose
+    destinations already exist so the user is only
+    asked about them once everything else is done
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = DEFAULT_MAX_WORKERS if max_workers is None else max(1, max_workers)
+
+    def do_actions(self, actions):
+        conflicting_actions = []
+        for action_batch, is_serial in get_action_batches(actions):
+            if is_serial:
+                conflicting_actions.extend(do_action_group(action_batch))
+                continue
+
+            create_destination_directories(action_batch)
+            for conflicting_action_group in self.run_in_parallel(do_action_group, group_by_destination_directory(action_batch)):
+                conflicting_actions.extend(conflicting_action_group)
+
+        resolve_conflicts(conflicting_actions)
+
+    def undo_actions(self, actions):
+        for action_batch, is_serial in get_action_batches(actions):
+            if is_serial:
+                undo_action_group(action_batch)
+            else:
+                self.run_in_parallel(undo_action_group, group_by_destination_directory(action_batch))
+
+    def run_in_parallel(self, run_group, action_groups):
+        """
+        Runs every group on the thread pool, returning each
+        group's result once they've all finished. The first
+        failure stops any group that hasn't started yet, and
+        is re-raised once the running ones are done
+        """
+        if len(action_groups) <= 1 or self.max_workers <= 1:
+            return [run_group(action_group) for action_group in action_groups]
+
+        logger.debug(f"Action: Running actions in parallel [number_of_groups={len(action_groups)}, max_workers={self.max_workers}]")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(action_groups))) as executor:
+            futures = [executor.submit(run_group, action_group) for action_group in action_groups]
+            done_futures, pending_futures = wait(futures, return_when=FIRST_EXCEPTION)
+
+            for pending_future in pending_futures:
+                pending_future.cancel()
+
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+        return [future.result() for future in futures]
+
+
+"""
+Helper functions
+"""
+
+
+def get_action_batches(actions):
+    """
+    Splits the actions into consecutive (batch, is_serial) pairs,
+    where scripts act as barriers between the concurrent batches
+    """
+    action_batches = []
+    current_batch = []
+    for action in actions:
+        if action.action not in SERIAL_ACTION_TYPES:
+            current_batch.append(action)
+            continue
+
+        if len(current_batch) > 0:
+            action_batches.append((current_batch, False))
+            current_batch = []
+        action_batches.append(([action], True))
+
+    if len(current_batch) > 0:
+        action_batches.append((current_batch, False))
+
+    return action_batches
+
+
+def group_by_destination_directory(actions):
+    """
+    Groups the actions by their destination directory, merging the
+    groups of any action whose destination contains the others'
+    (e.g. a sync into ~/.config/nvim and a symlink written inside
+    of it), so actions on overlapping paths still run in order
+    """
+    destination_directories = [os.path.dirname(os.path.abspath(str(action.destination))) for action in actions]
+    destinations = {os.path.abspath(str(action.destination)): destination_directory for action, destination_directory in zip(actions, destination_directories)}
+
+    # Each directory points at the directory whose group it was merged into
+    merged_directories = {}
+
+    def get_group_directory(directory):
+        while merged_directories.get(directory, directory) != directory:
+            directory = merged_directories[directory]
+        return directory
+
+    for destination_directory in destination_directories:
+        path = destination_directory
+        while True:
+            if path in destinations:
+                merged_directories[get_group_directory(destination_directory)] = get_group_directory(destinations[path])
+
+            parent_path = os.path.dirname(path)
+            if parent_path == path:
+                break
+            path = parent_path
+
+    action_groups = {}
+    for action, destination_directory in zip(actions, destination_directories):
+        action_groups.setdefault(get_group_directory(destination_directory), []).append(action)
+    return list(action_groups.values())
+
+
+def create_destination_directories(actions):
+    """
+    Creates every missing destination directory up front (in
+    one privileged round trip for the ones that need sudo),
+    journaling each one so a rollback removes it again
+    """
+    directories = {}
+    for action in actions:
+        destination_directory = os.path.dirname(os.path.abspath(str(action.destination)))
+        directories.setdefault(action.run_as_sudo, (set(), action.sudo_password))[0].add(destination_directory)
+
+    for run_as_sudo, (destination_directories, sudo_password) in directories.items():
+        make_directories_journaled(destination_directories, run_as_sudo, sudo_password)
+
+
+def do_action_group(actions):
+    """
+    Runs each action in order, returning the ones whose destination
+    already exists. Once a path has a conflict, any later action on
+    that same path is deferred as well, so their order is kept
+    """
+    conflicting_actions = []
+    conflicting_destinations = set()
+    for action in actions:
+        if action.destination in conflicting_destinations:
+            conflicting_actions.append(action)
+            continue
+
+        try:
+            do_action_with_override(None, action)
+        except FileExistsError:
+            logger.debug(f"Action: Failed to complete action [Action={action}]")
+            conflicting_actions.append(action)
+            conflicting_destinations.add(action.destination)
+
+    return conflicting_actions
+
+
+def undo_action_group(actions):
+    for action in actions:
+        try:
+            logger.info(f"Action: Starting undo action [Action={action}]")
+            action.undo()
+            logger.info(f"Action: Successfully undid action [Action={action}]")
+        except Exception:
+            logger.exception(f"Action: Failed to undo action [Action={action}]")
+            raise
+
+
+def resolve_conflicts(conflicting_actions):
+    """
+    Asks the user what to do about each conflicting action (unless
+    an earlier answer applies to all of them), and then applies it
+    """
+    override_action = None
+    for action in conflicting_actions:
+        try:
+            override_action = do_action_with_override(override_action, action)
+        except FileExistsError:
+            override_action = get_user_override(action)
+            override_action = do_action_with_override(override_action, action)
+
+
+def do_action_with_override(override_action, action):
+    # Normal procedure
+    if override_action is None:
+        logger.info(f"Action: Starting action [Action={action}]")
+        action.do()
+        logger.info(f"Action: Successfully completed action [Action={action}]")
+        return None
+
+    # Skips the actions
+    if override_action == OverrideAction.SKIP_FILE:
+        logger.info(f"Action: Skipping action [Action={action}]")
+        return None
+
+    if override_action == OverrideAction.SKIP_ALL_FILES:
+        logger.info(f"Action: Skipping all actions [Action={action}]")
+        return OverrideAction.SKIP_ALL_FILES
+
+    # Overwrites the actions
+    if override_action == OverrideAction.OVERWRITE_FILE:
+        logger.info(f"Action: Overwriting action destination [Action={action}]")
+        action.overwrite()
+        return None
+
+    if override_action == OverrideAction.OVERWRITE_ALL_FILES:
+        logger.info(f"Action: Overwriting all action's destinations [Action={action}]")
+        action.overwrite()
+        return OverrideAction.OVERWRITE_ALL_FILES
+
+    # Backs up first before performing the action
+    if override_action == OverrideAction.BACKUP_FILE:
+        logger.info(f"Action: Backing up first for action [Action={action}]")
+        action.backup()
+        return None
+
+    if override_action == OverrideAction.BACKUP_ALL_FILES:
+        logger.info(f"Action: Backing up first for all actions [Action={action}]")
+        action.backup()
+        return None
@@ -0,0 +1,395 @@
+# General imports
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+# Project imports
+from pydotfiles.utils import rm_file, rm_directory, rm_empty_directory, unsymlink_file, mv_file, run_file, is_executable
+from pydotfiles.utils import make_directories, get_missing_parent_directories
+from pydotfiles.utils import cached_isdir, cached_islink, cached_lexists
+
+
+"""
+A write-ahead journal of every file operation an install performs,
+so that a failed (or unwanted) install can be rolled back by undoing
+exactly what it did, in reverse. Each operation is written (and
+flushed to the OS) before it runs, and fsynced in batches, so a
+crash loses at most the last unsynced batch on power loss
+"""
+
+logger = logging.getLogger(__name__)
+
+# The effects that get journaled
+OPERATION_COPY = "copy"
+OPERATION_SYMLINK = "symlink"
+OPERATION_SCRIPT = "script"
+OPERATION_MOVE = "move"
+OPERATION_STASH = "stash"
+OPERATION_DIRECTORY = "directory"
+
+# fsyncs once this many operations are pending, or this long after the last fsync
+JOURNAL_SYNC_BATCH_SIZE = 64
+JOURNAL_SYNC_INTERVAL = 1.0
+
+# Older runs (and their stashed files) are pruned when a new run starts
+JOURNAL_RETAINED_RUNS = 10
+
+_active_journal = None
+
+
+class InstallJournal:
+    """
+    Class representing the journal of a single install run,
+    appended to by every thread of the file action executor
+    """
+
+    def __init__(self, journal_file, stash_directory, run_id=None):
+        self.journal_file = journal_file
+        self.run_id = get_run_id() if run_id is None else run_id
+        self.stash_directory = os.path.join(stash_directory, self.run_id)
+
+        self.journal_stream = None
+        self.next_sequence = 0
+        self.number_of_unsynced_records = 0
+        self.last_sync_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+        prune_journal(self.journal_file, os.path.dirname(self.stash_directory), JOURNAL_RETAINED_RUNS - 1)
+
+        self.journal_stream = open(self.journal_file, 'a')
+        self.append({"type": "begin", "run": self.run_id, "time": time.time()})
+        self.sync()
+
+    def close(self, status):
+        if self.journal_stream is None:
+            return
+
+        self.append({"type": "end", "run": self.run_id, "status": status})
+        self.sync()
+        self.journal_stream.close()
+        self.journal_stream = None
+
+    def begin_operation(self, operation, **details):
+        """
+        Journals an operation before it runs, returning its sequence
+        number (which is aborted if the operation didn't happen)
+        """
+        with self.lock:
+            sequence = self.next_sequence
+            self.next_sequence += 1
+
+        self.append(dict(details, type="operation", run=self.run_id, sequence=sequence, operation=operation))
+        return sequence
+
+    def abort_operation(self, sequence):
+        self.append({"type": "abort", "run": self.run_id, "sequence": sequence})
+
+    def get_stash_path(self, file):
+        with self.lock:
+            stash_number = self.next_sequence
+            self.next_sequence += 1
+
+        os.makedirs(self.stash_directory, exist_ok=True)
+        return os.path.join(self.stash_directory, f"{stash_number}-{os.path.basename(str(file))}")
+
+    def append(self, record):
+        with self.lock:
+            self.journal_stream.write(json.dumps(record, sort_keys=True) + "\n")
+
+            # Always hands the record to the OS before the operation runs, only the fsync is batched
+            self.journal_stream.flush()
+            self.number_of_unsynced_records += 1
+
+            if self.number_of_unsynced_records >= JOURNAL_SYNC_BATCH_SIZE or time.monotonic() - self.last_sync_time >= JOURNAL_SYNC_INTERVAL:
+                self.__sync__()
+
+    def sync(self):
+        with self.lock:
+            self.__sync__()
+
+    def __sync__(self):
+        os.fsync(self.journal_stream.fileno())
+        self.number_of_unsynced_records = 0
+        self.last_sync_time = time.monotonic()
+
+
+class JournalRun:
+    """
+    Class representing a single run read back from the
+    journal, with everything needed to roll it back
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.start_time = None
+        self.status = None
+        self.operations = []
+        self.aborted_sequences = set()
+        self.undone_sequences = set()
+
+    @property
+    def performed_operations(self):
+        return [operation for operation in self.operations if operation['sequence'] not in self.aborted_sequences]
+
+    @property
+    def pending_undo_operations(self):
+        return [operation for operation in reversed(self.performed_operations) if operation['sequence'] not in self.undone_sequences]
+
+    @property
+    def is_rolled_back(self):
+        return len(self.pending_undo_operations) == 0
+
+    @property
+    def is_sudo_used(self):
+        return any(operation.get('run_as_sudo', False) for operation in self.pending_undo_operations)
+
+
+@contextlib.contextmanager
+def journal_session(journal_file, stash_directory):
+    """
+    Journals every file operation run within the block as a single
+    install run, marking the run as failed if the block raises
+    """
+    global _active_journal
+
+    if journal_file is None or _active_journal is not None:
+        yield _active_journal
+        return
+
+    journal = InstallJournal(journal_file, stash_directory)
+    try:
+        journal.open()
+    except OSError as e:
+        logger.warning(f"Journal: Unable to open the install journal, this install can't be rolled back [file={journal_file}, error={e}]")
+        yield None
+        return
+
+    _active_journal = journal
+    status = "failed"
+    try:
+        yield journal
+        status = "completed"
+    finally:
+        _active_journal = None
+        journal.close(status)
+        logger.debug(f"Journal: Closed the install journal [run={journal.run_id}, status={status}, number_of_operations={journal.next_sequence}]")
+
+
+def get_active_journal():
+    return _active_journal
+
+
+def run_journaled(operation, run_operation, **details):
+    """
+    Runs a file operation, journaling it first if a journal is
+    active. The operation is aborted in the journal if it raises
+    or reports (by returning False) that there was nothing to do
+    """
+    journal = get_active_journal()
+    if journal is None:
+        return run_operation()
+
+    sequence = journal.begin_operation(operation, **details)
+    try:
+        is_performed = run_operation()
+    except BaseException:
+        journal.abort_operation(sequence)
+        raise
+
+    if is_performed is False:
+        journal.abort_operation(sequence)
+    return is_performed
+
+
+def remove_journaled(path, run_as_sudo=False, sudo_password=None):
+    """
+    Removes a file or directory tree, stashing it instead if a
+    journal is active, so that a rollback can put it back
+    """
+    if not cached_lexists(path):
+        return False
+
+    journal = get_active_journal()
+    if journal is not None:
+        stash_path = journal.get_stash_path(path)
+        return run_journaled(OPERATION_STASH, lambda: mv_file(path, stash_path, run_as_sudo, sudo_password), run_as_sudo=run_as_sudo, origin=str(path), destination=stash_path)
+
+    if cached_islink(path):
+        unsymlink_file(path, run_as_sudo, sudo_password)
+    elif cached_isdir(path):
+        rm_directory(path, run_as_sudo, sudo_password)
+    else:
+        rm_file(path, run_as_sudo, sudo_password)
+    return True
+
+
+def make_directories_journaled(directories, run_as_sudo=False, sudo_password=None):
+    """
+    Creates the directories in a single batch, journaling each one
+    that's missing (parents first, so a rollback removes children first)
+    """
+    journal = get_active_journal()
+    if journal is None:
+        return make_directories(directories, run_as_sudo, sudo_password)
+
+    missing_directories = get_missing_parent_directories({os.path.abspath(str(directory)) for directory in directories})
+    if len(missing_directories) == 0:
+        return
+
+    sequences = [journal.begin_operation(OPERATION_DIRECTORY, run_as_sudo=run_as_sudo, destination=missing_directory) for missing_directory in missing_directories]
+    try:
+        make_directories(missing_directories, run_as_sudo, sudo_password)
+    except BaseException:
+        for sequence, missing_directory in zip(sequences, missing_directories):
+            if not os.path.isdir(missing_directory):
+                journal.abort_operation(sequence)
+        raise
+
+
+"""
+Rollback functions
+"""
+
+
+def load_journal_runs(journal_file):
+    """
+    Reads every run back from the journal, in the order they
+    ran (a record cut short by a crash is just skipped)
+    """
+    runs = {}
+    if not os.path.isfile(journal_file):
+        return []
+
+    with open(journal_file, 'r') as journal_stream:
+        for journal_line in journal_stream:
+            try:
+                record = json.loads(journal_line)
+            except ValueError:
+                logger.debug(f"Journal: Skipping a partially written journal record [file={journal_file}]")
+                continue
+
+            run = runs.setdefault(record.get('run'), JournalRun(record.get('run')))
+            record_type = record.get('type')
+            if record_type == "begin":
+                run.start_time = record.get('time')
+            elif record_type == "end":
+                run.status = record.get('status')
+            elif record_type == "operation":
+                run.operations.append(record)
+            elif record_type == "abort":
+                run.aborted_sequences.add(record.get('sequence'))
+            elif record_type == "undo":
+                run.undone_sequences.add(record.get('sequence'))
+
+    return list(runs.values())
+
+
+def get_run_to_roll_back(journal_file, run_id=None):
+    runs = load_journal_runs(journal_file)
+    if run_id is not None:
+        return next((run for run in runs if run.run_id == run_id), None)
+
+    return next((run for run in reversed(runs) if not run.is_rolled_back), None)
+
+
+def roll_back_run(journal_file, run, sudo_password=None):
+    """
+    Undoes each of the run's operations in reverse, journaling each
+    undo as it completes, so an interrupted rollback picks up where
+    it left off. Returns the number of operations undone
+    """
+    number_of_undone_operations = 0
+    with open(journal_file, 'a') as journal_stream:
+        try:
+            for operation in run.pending_undo_operations:
+                undo_operation(operation, sudo_password)
+
+                journal_stream.write(json.dumps({"type": "undo", "run": run.run_id, "sequence": operation['sequence']}, sort_keys=True) + "\n")
+                journal_stream.flush()
+                number_of_undone_operations += 1
+        finally:
+            os.fsync(journal_stream.fileno())
+
+    logger.info(f"Rollback: Successfully rolled back install run [run={run.run_id}, number_of_operations={number_of_undone_operations}]")
+    return number_of_undone_operations
+
+
+def undo_operation(operation, sudo_password=None):
+    operation_type = operation.get('operation')
+    run_as_sudo = operation.get('run_as_sudo', False)
+    destination = operation.get('destination')
+
+    logger.info(f"Rollback: Undoing operation [operation={operation_type}, destination={destination}, sequence={operation['sequence']}]")
+
+    if operation_type == OPERATION_COPY:
+        # Only removes what the copy created, never a directory or link that's since replaced it
+        if os.path.isfile(destination) and not os.path.islink(destination):
+            rm_file(destination, run_as_sudo, sudo_password)
+    elif operation_type == OPERATION_SYMLINK:
+        if os.path.islink(destination) and os.readlink(destination) == operation.get('origin'):
+            unsymlink_file(destination, run_as_sudo, sudo_password)
+    elif operation_type == OPERATION_SCRIPT:
+        undo_script = operation.get('undo_script')
+        if undo_script is not None and is_executable(undo_script):
+            run_file(undo_script, run_as_sudo, sudo_password)
+        else:
+            logger.warning(f"Rollback: The script has no undo script, so its effects can't be rolled back [script={operation.get('origin')}]")
+    elif operation_type == OPERATION_DIRECTORY:
+        # Anything put into the directory since was undone before this, so it's only left behind if something else did
+        rm_empty_directory(destination, run_as_sudo, sudo_password)
+    elif operation_type in (OPERATION_MOVE, OPERATION_STASH):
+        # Moves the file back to where it was, as long as nothing has taken its place
+        original_path = operation.get('origin')
+        if os.path.lexists(destination) and not os.path.lexists(original_path):
+            mv_file(destination, original_path, run_as_sudo, sudo_password)
+    else:
+        raise NotImplementedError(f"Rollback: The journaled operation `{operation_type}` can't be undone")
+
+
+"""
+Helper functions
+"""
+
+
+def get_run_id():
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+def prune_journal(journal_file, stash_directory, number_of_retained_runs):
+    """
+    Drops all but the most recent runs from the journal (and
+    their stashed files), so the journal doesn't grow forever
+    """
+    runs = load_journal_runs(journal_file)
+    if len(runs) <= number_of_retained_runs:
+        return
+
+    pruned_run_ids = {run.run_id for run in runs[:len(runs) - number_of_retained_runs]}
+
+    # Writes to a temporary file first so that a crash never leaves a partial journal behind
+    temporary_journal_file = f"{journal_file}.{os.getpid()}.tmp"
+    with open(journal_file, 'r') as journal_stream, open(temporary_journal_file, 'w') as temporary_journal_stream:
+        for journal_line in journal_stream:
+            try:
+                record = json.loads(journal_line)
+            except ValueError:
+                continue
+
+            if record.get('run') not in pruned_run_ids:
+                temporary_journal_stream.write(journal_line)
+
+        temporary_journal_stream.flush()
+        os.fsync(temporary_journal_stream.fileno())
+    os.replace(temporary_journal_file, journal_file)
+
+    for pruned_run_id in pruned_run_ids:
+        # Files stashed with sudo might not be removable, which just leaves them behind
+        shutil.rmtree(os.path.join(stash_directory, str(pruned_run_id)), ignore_errors=True)
+
+    logger.debug(f"Journal: Pruned old install runs [number_of_pruned_runs={len(pruned_run_ids)}]")
@@ -0,0 +1,132 @@
+# General imports
+import logging
+import os
+
+# Project imports
+from pydotfiles.version import VERSION_NUMBER
+
+
+"""
+Persistent manifest of the fully resolved module graph, enabling
+repeat runs to skip re-walking and re-parsing every module when
+none of their inputs have changed
+"""
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the pickled layout of the module graph changes
+MANIFEST_FORMAT_VERSION = 4
+
+
+def load_cached_modules(cache_directory, config_repo_local, active_modules, host_os, require_validated=False):
+    """
+    Returns the cached (modules, is_sudo_used) pair if the
+    stored manifest is still fresh, otherwise returns None.
+    A manifest written without validation can't stand in
+    for a run that requires it
+    """
+    manifest = cache_directory.read_manifest()
+
+    if manifest is None:
+        logger.debug(f"Manifest: No manifest cache found [file={cache_directory.manifest_cache_file}]")
+        return None
+
+    if manifest.get('key') != get_manifest_key(config_repo_local, active_modules, host_os):
+        logger.debug(f"Manifest: Manifest cache was built for a different configuration, ignoring it [file={cache_directory.manifest_cache_file}]")
+        return None
+
+    if require_validated and not manifest.get('is_validated', False):
+        logger.debug(f"Manifest: Manifest cache was built without validation, ignoring it [file={cache_directory.manifest_cache_file}]")
+        return None
+
+    for input_path, input_fingerprint in manifest.get('inputs', []):
+        if get_input_fingerprint(input_path) != input_fingerprint:
+            logger.debug(f"Manifest: Manifest cache is stale [changed_input={input_path}]")
+            return None
+
+    modules = manifest.get('modules')
+    for module in modules.values():
+        module.attach_cache_directory(cache_directory)
+
+    logger.debug(f"Manifest: Loaded modules from the manifest cache [file={cache_directory.manifest_cache_file}, number_of_modules={len(modules)}]")
+    return modules, manifest.get('is_sudo_used')
+
+
+def save_cached_modules(cache_directory, config_repo_local, active_modules, host_os, modules, is_sudo_used, is_validated=False):
+    cache_directory.write_manifest({
+        'key': get_manifest_key(config_repo_local, active_modules, host_os),
+        'inputs': get_manifest_inputs(config_repo_local, modules, is_validated),
+        'modules': modules,
+        'is_sudo_used': is_sudo_used,
+        'is_validated': is_validated,
+    })
+    logger.debug(f"Manifest: Persisted the manifest cache [file={cache_directory.manifest_cache_file}, number_of_modules={len(modules)}]")
+
+
+"""
+Helper functions
+"""
+
+
+def get_manifest_key(config_repo_local, active_modules, host_os):
+    return (
+        MANIFEST_FORMAT_VERSION,
+        VERSION_NUMBER,
+        os.path.abspath(config_repo_local),
+        None if active_modules is None else tuple(active_modules),
+        host_os.name,
+    )
+
+
+def get_manifest_inputs(config_repo_local, modules, is_validated=False):
+    """
+    Every path whose change should invalidate the manifest: the
+    repo directory itself (modules added/removed), each module's
+    directory (files added/removed/renamed), and every parsed
+    settings/default settings file (contents changed). A validated
+    manifest also covers every file the settings reference, since
+    a nested one going missing wouldn't change any of the above
+    """
+    input_paths = [config_repo_local]
+
+    for module in modules.values():
+        input_paths.append(module.directory)
+
+        if module.settings_file is not None:
+            input_paths.append(module.settings_file)
+
+        if module.operating_system is not None and module.operating_system.default_settings_file is not None:
+            input_paths.append(module.operating_system.default_settings_file)
+
+        if is_validated:
+            input_paths.extend(get_referenced_paths(config_repo_local, module))
+
+    # Drops duplicates (e.g. a file referenced by several actions), keeping the order
+    return [(input_path, get_input_fingerprint(input_path)) for input_path in dict.fromkeys(input_paths)]
+
+
+def get_referenced_paths(config_repo_local, module):
+    """
+    Returns the repo files (and directories) that the module's
+    actions and scripts point at. Anything outside the repo isn't
+    checked by the validator, so it's left out
+    """
+    config_repo_local = os.path.abspath(config_repo_local)
+    actions = module.actions + [action for action in (module.start_action, module.post_action) if action is not None]
+
+    referenced_paths = []
+    for action in actions:
+        origin = os.path.abspath(str(action.origin))
+        if os.path.commonpath([config_repo_local, origin]) == config_repo_local:
+            referenced_paths.append(origin)
+
+    return referenced_paths
+
+
+def get_input_fingerprint(input_path):
+    try:
+        input_stat = os.stat(input_path)
+    except OSError:
+        return None
+
+    return input_stat.st_mtime_ns, input_stat.st_size
@@ -0,0 +1,161 @@
+# General imports
+import logging
+
+# Project imports
+from .enums import FileActionType, OperationType
+from .executor import FileActionExecutor
+from pydotfiles.utils import invalidating_all_paths
+
+
+"""
+Install plans, listing only the operations that are still
+pending. Everything is checked once while planning, so that
+executing the plan never re-checks (or re-logs) the steps
+that were already satisfied, other than the file actions
+that something run before them could have changed
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class PlannedOperation:
+    """
+    Class representing a single pending step of an
+    install, along with how to carry it out
+    """
+
+    def __init__(self, operation_type, description, run=None, target=None, is_rechecked=False):
+        self.operation_type = operation_type
+        self.description = description
+        self.run = run
+        self.target = target
+
+        # Already completed when planned, so it's only run if it's pending again by the time it's reached
+        self.is_rechecked = is_rechecked
+
+    def __str__(self):
+        return f"{self.operation_type.name.lower().replace('_', ' ')}: {self.description}"
+
+    def to_record(self):
+        return {
+            "type": self.operation_type.name.lower(),
+            "description": self.description,
+        }
+
+
+class ModulePlan:
+    """
+    Class representing the pending operations
+    of a single module, in install order
+    """
+
+    def __init__(self, module_name, operations):
+        self.module_name = module_name
+        self.operations = operations
+
+    @property
+    def pending_operations(self):
+        return [operation for operation in self.operations if not operation.is_rechecked]
+
+    @property
+    def is_empty(self):
+        return len(self.pending_operations) == 0
+
+    @property
+    def has_other_operations(self):
+        return any(operation.operation_type != OperationType.FILE_ACTION for operation in self.operations)
+
+    def execute(self, max_workers=None):
+        if len(self.operations) == 0:
+            logger.debug(f"Plan: Nothing to do for module [name={self.module_name}]")
+            return
+
+        logger.info(f"Install: Installing module [name={self.module_name}, number_of_operations={len(self.pending_operations)}]")
+
+        # Consecutive file actions are handed to the executor together, so they can run concurrently
+        pending_file_actions = []
+        for operation in self.operations:
+            if operation.operation_type == OperationType.FILE_ACTION:
+                if operation.is_rechecked and not is_file_action_pending(operation.target):
+                    logger.debug(f"Plan: Action still completed [Action={operation.target}]")
+                    continue
+
+                pending_file_actions.append(operation.target)
+                continue
+
+            if len(pending_file_actions) > 0:
+                FileActionExecutor(max_workers).do_actions(pending_file_actions)
+                pending_file_actions = []
+
+            # Packages, applications, settings, and scripts can write anywhere, so the file checks start over afterwards
+            with invalidating_all_paths():
+                operation.run()
+
+        if len(pending_file_actions) > 0:
+            FileActionExecutor(max_workers).do_actions(pending_file_actions)
+
+        logger.info(f"Install: Successfully installed module [name={self.module_name}]")
+
+    def to_record(self):
+        return {
+            "module": self.module_name,
+            "operations": [operation.to_record() for operation in self.pending_operations],
+        }
+
+
+class InstallPlan:
+    """
+    Class representing the pending operations
+    across every module being installed
+    """
+
+    def __init__(self, module_plans):
+        self.module_plans = module_plans
+
+    @property
+    def is_empty(self):
+        return all(module_plan.is_empty for module_plan in self.module_plans)
+
+    @property
+    def number_of_operations(self):
+        return sum(len(module_plan.pending_operations) for module_plan in self.module_plans)
+
+    def execute(self, max_workers=None):
+        if self.is_empty:
+            logger.info("Install: Everything is already installed, nothing to do")
+            return
+
+        for module_plan in self.module_plans:
+            module_plan.execute(max_workers)
+
+    def to_records(self):
+        return [module_plan.to_record() for module_plan in self.module_plans if not module_plan.is_empty]
+
+    def get_summary_lines(self):
+        summary_lines = []
+        for module_plan in self.module_plans:
+            if module_plan.is_empty:
+                continue
+
+            summary_lines.append(f"{module_plan.module_name}:")
+            summary_lines.extend(f"  + {operation}" for operation in module_plan.pending_operations)
+
+        summary_lines.append(f"Plan: {self.number_of_operations} pending operation(s) across {sum(not module_plan.is_empty for module_plan in self.module_plans)} module(s)")
+        return summary_lines
+
+
+"""
+Helper functions
+"""
+
+
+def is_file_action_pending(file_action):
+    # Scripts can't be checked ahead of time, so they always run
+    if file_action.action not in (FileActionType.COPY, FileActionType.SYMLINK, FileActionType.SYNC):
+        return True
+
+    try:
+        return not file_action.is_completed
+    except OSError:
+        # e.g. a missing origin, which running the action will surface properly
+        return True
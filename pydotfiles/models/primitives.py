@@ -3,12 +3,15 @@ import logging
 from pathlib import Path
 import os
 import json
+import pickle
 
 # Project imports
 from .enums import FileActionType
 from .constants import PYDOTFILES_CACHE_DIRECTORY
+from .journal import run_journaled, remove_journaled, OPERATION_COPY, OPERATION_SYMLINK, OPERATION_SCRIPT, OPERATION_MOVE
+from .sync import get_sync_changes, sync_directory, unsync_directory
 from pydotfiles.utils import copy_file, symlink_file, rm_file, unsymlink_file, mv_file, run_file
-from pydotfiles.utils import is_copied, is_linked
+from pydotfiles.utils import is_copied, is_linked, cached_isfile, cached_islink
 
 
 """
@@ -25,16 +28,21 @@ class FileAction:
     have convenience methods for
     """
 
-    def __init__(self, action, origin, destination, run_as_sudo, sudo_password=None):
+    def __init__(self, action, origin, destination, run_as_sudo, sudo_password=None, delete_extras=False):
         self.action = action
         self.origin = origin
         self.destination = destination
         self.run_as_sudo = run_as_sudo
         self.sudo_password = sudo_password
 
+        # Only used by syncs, to delete whatever's in the destination tree but not the origin tree
+        self.delete_extras = delete_extras
+
     def __str__(self):
         if self.action == FileActionType.SCRIPT or self.action == FileActionType.UNDO_SCRIPT:
             return f"{'SUDO ' if self.run_as_sudo else ''}{self.action.name} file={self.origin}, undo_file={self.destination}"
+        if self.action == FileActionType.SYNC and self.delete_extras:
+            return f"{'SUDO ' if self.run_as_sudo else ''}{self.action.name} {self.origin} -> {self.destination} (deleting extra files)"
         return f"{'SUDO ' if self.run_as_sudo else ''}{self.action.name} {self.origin} -> {self.destination}"
 
     @property
@@ -43,6 +51,11 @@ class FileAction:
             return is_copied(self.origin, self.destination)
         elif self.action == FileActionType.SYMLINK:
             return is_linked(self.origin, self.destination)
+        elif self.action == FileActionType.SYNC:
+            try:
+                return get_sync_changes(self.origin, self.destination, self.delete_extras).is_empty
+            except FileExistsError:
+                return False
         else:
             raise NotImplementedError(f"File Action: The action `{self.action}` is not supported yet (feel free to open a ticket on github!)")
 
@@ -57,11 +70,14 @@ class FileAction:
     def do(self):
         logger.debug(f"File Action: Starting action [action={self.action}, origin={self.origin}, destination={self.destination}, use_sudo={self.run_as_sudo}]")
         if self.action == FileActionType.COPY:
-            copy_file(self.origin, self.destination, self.run_as_sudo, self.sudo_password)
+            self.__run_journaled__(OPERATION_COPY, lambda: copy_file(self.origin, self.destination, self.run_as_sudo, self.sudo_password), origin=self.origin, destination=self.destination)
         elif self.action == FileActionType.SYMLINK:
-            symlink_file(self.origin, self.destination, self.run_as_sudo, self.sudo_password)
+            self.__run_journaled__(OPERATION_SYMLINK, lambda: symlink_file(self.origin, self.destination, self.run_as_sudo, self.sudo_password), origin=self.origin, destination=self.destination)
         elif self.action == FileActionType.SCRIPT:
-            run_file(self.origin, self.run_as_sudo, self.sudo_password)
+            self.__run_journaled__(OPERATION_SCRIPT, lambda: run_file(self.origin, self.run_as_sudo, self.sudo_password), origin=self.origin, undo_script=self.destination)
+        elif self.action == FileActionType.SYNC:
+            # Journals each synced file on its own, rather than the sync as a whole
+            sync_directory(self.origin, self.destination, self.delete_extras, self.run_as_sudo, self.sudo_password)
         else:
             raise NotImplementedError(f"File Action: The action `{self.action}` is not supported yet (feel free to open a ticket on github!)")
 
@@ -75,19 +91,21 @@ class FileAction:
             return
 
         if self.action == FileActionType.COPY:
-            if not os.path.isfile(self.destination):
+            if not cached_isfile(self.destination):
                 logger.info(f"File Action: No reverse action required [action={self.reverse_action}], file={self.destination}, use_sudo={self.run_as_sudo}")
                 return
 
             rm_file(self.destination, self.run_as_sudo, self.sudo_password)
         elif self.action == FileActionType.SYMLINK:
-            if not os.path.islink(self.destination):
+            if not cached_islink(self.destination):
                 logger.info(f"File Action: No reverse action required [action={self.reverse_action}], file={self.destination}, use_sudo={self.run_as_sudo}")
                 return
 
             unsymlink_file(self.destination, self.run_as_sudo, self.sudo_password)
         elif self.action == FileActionType.SCRIPT:
             run_file(self.destination, self.run_as_sudo, self.sudo_password)
+        elif self.action == FileActionType.SYNC:
+            unsync_directory(self.origin, self.destination, self.run_as_sudo, self.sudo_password)
         else:
             raise NotImplementedError(f"File Action: The undo action `{self.action}` is not supported yet (feel free to open a ticket on github!)")
 
@@ -96,18 +114,29 @@ class FileAction:
     def overwrite(self):
         # Just deletes the destination and then re-runs the operation
         logger.debug(f"File Action: Overwriting destination file [destination={self.destination}]")
-        rm_file(self.destination, self.run_as_sudo, self.sudo_password)
+        if cached_isfile(self.destination) or cached_islink(self.destination):
+            # Stashes the destination rather than deleting it if there's a journal, so that a rollback can restore it
+            remove_journaled(self.destination, self.run_as_sudo, self.sudo_password)
         logger.debug(f"File Action: Successfully primed overwrite [destination={self.destination}]")
 
         self.do()
 
     def backup(self):
         logger.debug(f"File Action: Backing up file first [original={self.destination}, backup={self.destination_backup}]")
-        mv_file(self.destination, self.destination_backup, self.run_as_sudo, self.sudo_password)
+        self.__run_journaled__(OPERATION_MOVE, lambda: mv_file(self.destination, self.destination_backup, self.run_as_sudo, self.sudo_password), origin=self.destination, destination=self.destination_backup)
         logger.debug(f"File Action: Successfully backed up file first [original={self.destination}, backup={self.destination_backup}]")
 
         self.do()
 
+    """
+    Helper methods
+    """
+
+    def __run_journaled__(self, operation, run_operation, **details):
+        # Journals the paths as strings, since the file action's paths might be pathlib paths
+        details = {key: None if value is None else str(value) for key, value in details.items()}
+        return run_journaled(operation, run_operation, run_as_sudo=self.run_as_sudo, **details)
+
 
 class CacheDirectory:
     """
@@ -120,12 +149,11 @@ class CacheDirectory:
         self.cache_directory = cache_directory
         self.package_manager = package_manager
 
-        self.installed_packages = None
-        self.installed_applications = None
-
-        if package_manager is not None:
-            self.reload_packages()
-            self.reload_applications()
+        # The package/application caches are only read in on first access
+        self._installed_packages = None
+        self._installed_applications = None
+        self._is_package_cache_loaded = False
+        self._is_application_cache_loaded = False
 
     @property
     def config_file(self):
@@ -139,6 +167,38 @@ class CacheDirectory:
     def package_cache_file(self):
         return f"{self.cache_directory}/{self.package_manager.name.lower()}-package-cache"
 
+    @property
+    def manifest_cache_file(self):
+        return f"{self.cache_directory}/manifest-cache"
+
+    @property
+    def validation_cache_file(self):
+        return f"{self.cache_directory}/validation-cache.json"
+
+    @property
+    def hash_database_file(self):
+        return f"{self.cache_directory}/hash-cache.sqlite3"
+
+    @property
+    def journal_file(self):
+        return f"{self.cache_directory}/install-journal"
+
+    @property
+    def journal_stash_directory(self):
+        return f"{self.cache_directory}/journal-stash"
+
+    @property
+    def installed_packages(self):
+        if not self._is_package_cache_loaded and self.package_manager is not None:
+            self.reload_packages()
+        return self._installed_packages
+
+    @property
+    def installed_applications(self):
+        if not self._is_application_cache_loaded and self.package_manager is not None:
+            self.reload_applications()
+        return self._installed_applications
+
     @property
     def is_created(self):
         return os.path.isdir(self.cache_directory)
@@ -160,6 +220,43 @@ class CacheDirectory:
         with open(self.config_file, 'r') as config_file:
             return json.load(config_file)
 
+    """
+    Manifest-file methods
+    """
+
+    def write_manifest(self, manifest):
+        self.__atomic_write__(self.manifest_cache_file, pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def read_manifest(self):
+        if not os.path.isfile(self.manifest_cache_file):
+            return None
+
+        try:
+            with open(self.manifest_cache_file, 'rb') as manifest_file:
+                return pickle.load(manifest_file)
+        except Exception:
+            # A corrupt or incompatible manifest is just a cache miss
+            logger.debug(f"Caching: Unable to read the manifest cache, ignoring it [file={self.manifest_cache_file}]", exc_info=True)
+            return None
+
+    """
+    Validation cache methods
+    """
+
+    def write_validation_cache(self, data):
+        self.__atomic_write__(self.validation_cache_file, json.dumps(data, sort_keys=True).encode())
+
+    def read_validation_cache(self):
+        if not os.path.isfile(self.validation_cache_file):
+            return {}
+
+        try:
+            with open(self.validation_cache_file, 'r') as validation_cache_file:
+                return json.load(validation_cache_file)
+        except ValueError:
+            logger.debug(f"Caching: Unable to read the validation cache, ignoring it [file={self.validation_cache_file}]")
+            return {}
+
     """
     Public cache accessors
     """
@@ -193,10 +290,12 @@ class CacheDirectory:
         self.__append_to_cache_file__(self.application_cache_file, application)
 
     def reload_packages(self):
-        self.installed_packages = self.__read_from_cache_file__(self.package_cache_file)
+        self._installed_packages = self.__read_from_cache_file__(self.package_cache_file)
+        self._is_package_cache_loaded = True
 
     def reload_applications(self):
-        self.installed_applications = self.__read_from_cache_file__(self.application_cache_file)
+        self._installed_applications = self.__read_from_cache_file__(self.application_cache_file)
+        self._is_application_cache_loaded = True
 
     """
     Internal helper methods
@@ -211,6 +310,15 @@ class CacheDirectory:
         Path(self.cache_directory).mkdir(parents=True, exist_ok=True)
         logger.debug(f"Caching: Successfully created cache directory [directory={self.cache_directory}]")
 
+    def __atomic_write__(self, cache_file, data):
+        self.__idempotent_create__()
+
+        # Writes to a temporary file first so that a crash (or concurrent reader) never sees a partial cache file
+        temporary_cache_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary_cache_file, 'wb') as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_cache_file, cache_file)
+
     def __overwrite_cache_file__(self, cache_file, data):
         self.__idempotent_create__()
         with open(cache_file, "w") as cache_file:
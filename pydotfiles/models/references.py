@@ -0,0 +1,175 @@
+# General imports
+import logging
+import os
+
+
+"""
+Semantic cross-reference validation, checking that every file a
+configuration file points at (action origins, scripts, default
+settings files) actually exists, using an in-memory index of the
+repo so that each lookup is a set membership test
+"""
+
+logger = logging.getLogger(__name__)
+
+# Nothing a configuration file references ever lives in here
+IGNORED_DIRECTORY_NAMES = {'.git'}
+
+# The one kind of reference that points at another configuration file (which gets validated in turn)
+DEFAULT_SETTINGS_FILE_REFERENCE = "default settings file"
+
+
+class DependencyGraph:
+    """
+    Tracks which files reference which other files, so a change
+    to a shared file can be traced back to all of its dependents
+    """
+
+    def __init__(self):
+        self.references = {}
+        self.dependents = {}
+
+    def set_references(self, file, referenced_files):
+        self.remove(file)
+
+        self.references[file] = set(referenced_files)
+        for referenced_file in referenced_files:
+            self.dependents.setdefault(referenced_file, set()).add(file)
+
+    def remove(self, file):
+        for referenced_file in self.references.pop(file, set()):
+            file_dependents = self.dependents.get(referenced_file)
+            if file_dependents is None:
+                continue
+
+            file_dependents.discard(file)
+            if len(file_dependents) == 0:
+                del self.dependents[referenced_file]
+
+    def get_affected_files(self, changed_files):
+        """
+        Returns the changed files along with every file that
+        (transitively) references one of them
+        """
+        affected_files = set()
+        files_to_visit = list(changed_files)
+        while len(files_to_visit) > 0:
+            file = files_to_visit.pop()
+            if file in affected_files:
+                continue
+
+            affected_files.add(file)
+            files_to_visit.extend(self.dependents.get(file, set()))
+
+        return affected_files
+
+
+class RepoFileIndex:
+    """
+    Class representing every path in a repo,
+    built from a single walk of the tree
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.paths = set()
+
+        # Follows symlinked directories (installing through them works), walking each target only once so links can't cycle
+        walked_link_targets = {os.path.realpath(self.directory)}
+        for path_prefix, directory_names, file_names in os.walk(self.directory, followlinks=True):
+            directory_names[:] = [directory_name for directory_name in directory_names if directory_name not in IGNORED_DIRECTORY_NAMES]
+            self.paths.update(os.path.join(path_prefix, directory_name) for directory_name in directory_names)
+            self.paths.update(os.path.join(path_prefix, file_name) for file_name in file_names)
+
+            directory_names[:] = [directory_name for directory_name in directory_names if self.__is_walked__(path_prefix, directory_name, walked_link_targets)]
+
+        logger.debug(f"References: Indexed repo files [directory={self.directory}, number_of_paths={len(self.paths)}]")
+
+    def __is_walked__(self, path_prefix, directory_name, walked_link_targets):
+        directory_path = os.path.join(path_prefix, directory_name)
+        if not os.path.islink(directory_path):
+            return True
+
+        link_target = os.path.realpath(directory_path)
+        if link_target in walked_link_targets:
+            logger.debug(f"References: Skipping an already indexed symlinked directory [directory={directory_path}, target={link_target}]")
+            return False
+
+        walked_link_targets.add(link_target)
+        return True
+
+    def __contains__(self, path):
+        path = os.path.normpath(os.path.abspath(path))
+
+        # Anything outside of the repo can't be indexed, so it falls back to asking the file system
+        if os.path.commonpath([self.directory, path]) != self.directory:
+            return os.path.exists(path)
+
+        return path in self.paths
+
+    def update(self, path):
+        """
+        Brings a single path (e.g. one reported by a file
+        watcher) back in line with the file system
+        """
+        path = os.path.normpath(os.path.abspath(path))
+        if os.path.exists(path):
+            self.paths.add(path)
+        else:
+            self.paths.discard(path)
+
+
+def get_required_references(data):
+    """
+    Returns every (json path, relative path, reference type) that the
+    given configuration data needs to exist, relative to the directory
+    of the file it was loaded from. Absolute origins are skipped, since
+    they depend on the machine rather than the repo
+    """
+    if not isinstance(data, dict) or data.get('schema') != 'core':
+        return []
+
+    required_references = []
+
+    default_settings_file = (data.get('os') or {}).get('default_settings_file')
+    if default_settings_file is not None:
+        required_references.append(("$.os.default_settings_file", default_settings_file, DEFAULT_SETTINGS_FILE_REFERENCE))
+
+    for action_index, action_group in enumerate(data.get('actions') or []):
+        if action_group.get('absolute', False):
+            continue
+
+        action = action_group.get('action')
+        for origin in (action_group.get('files') or {}).keys():
+            # The "all" case expands to whatever is in the module, so there's nothing to look up
+            if origin == '*':
+                continue
+
+            json_path = f"$.actions[{action_index}].files.{origin}"
+            if action == 'symlink':
+                required_references.append((json_path, f"{origin}.symlink", "symlink origin"))
+            elif action == 'script':
+                required_references.append((json_path, origin, "script"))
+            else:
+                required_references.append((json_path, origin, f"{action} origin"))
+
+    return required_references
+
+
+def find_missing_references(directory, required_references, file_index):
+    """
+    Returns a {path, reason, schema_pointer} record for every
+    required reference that isn't in the file index
+    """
+    missing_references = []
+    for json_path, relative_path, reference_type in required_references:
+        if os.path.join(directory, relative_path) in file_index:
+            continue
+
+        missing_references.append({
+            "path": json_path,
+            "reason": f"The {reference_type} `{relative_path}` does not exist",
+            "schema_pointer": None,
+        })
+
+    return missing_references
@@ -0,0 +1,45 @@
+from git import Repo
+from git.remote import RemoteProgress
+from progressbar import ProgressBar
+
+
+"""
+Git remote helpers, kept in their own module so that
+GitPython and progressbar are only imported by the
+commands that actually talk to a remote
+"""
+
+
+class GitRemoteProgress(RemoteProgress):
+    """
+    An object passed as a callback that will display
+    a progressbar while downloading files from the git
+    remote
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.progress_bar = None
+        self.is_done = False
+
+    def update(self, op_code, cur_count, max_count=None, message=''):
+        if self.is_done:
+            return
+
+        if self.progress_bar is None:
+            self.progress_bar = ProgressBar(max_value=max_count)
+            self.progress_bar.start()
+
+        if cur_count == max_count:
+            self.progress_bar.finish()
+            self.is_done = True
+        else:
+            self.progress_bar.update(cur_count)
+
+
+def clone_repo(config_repo_remote, config_repo_local):
+    Repo.clone_from(config_repo_remote, config_repo_local, progress=GitRemoteProgress())
+
+
+def pull_repo(config_repo_local):
+    Repo(config_repo_local).remote('origin').pull(progress=GitRemoteProgress())
@@ -0,0 +1,45 @@
+# General imports
+import logging
+import os
+
+from git import Repo
+from git.exc import GitError, InvalidGitRepositoryError, NoSuchPathError
+from gitdb.exc import BadName, BadObject
+
+# Project imports
+from .exceptions import ValidationError, ValidationErrorReason
+
+
+"""
+Git revision helpers, kept in their own module so that GitPython
+is only imported when validation is scoped to a revision
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def get_changed_files(directory, revision):
+    """
+    Returns the absolute paths of every file that changed between the
+    given revision and the working tree (committed, staged, unstaged,
+    or untracked), including files that were deleted or renamed away
+    """
+    try:
+        repo = Repo(directory, search_parent_directories=True)
+        revision_commit = repo.commit(revision)
+    except (InvalidGitRepositoryError, NoSuchPathError) as e:
+        raise ValidationError(ValidationErrorReason.INVALID_TARGET, f"The passed in directory is not inside a git repo [directory={directory}]") from e
+    except (BadName, BadObject, ValueError, GitError) as e:
+        raise ValidationError(ValidationErrorReason.INVALID_TARGET, f"The passed in git revision could not be found [revision={revision}]") from e
+
+    working_tree_directory = repo.working_tree_dir
+
+    changed_relative_paths = set()
+    for diff in revision_commit.diff(None):
+        changed_relative_paths.update(diff_path for diff_path in (diff.a_path, diff.b_path) if diff_path is not None)
+    changed_relative_paths.update(repo.untracked_files)
+
+    changed_files = {os.path.normpath(os.path.join(working_tree_directory, changed_relative_path)) for changed_relative_path in changed_relative_paths}
+
+    logger.debug(f"Revisions: Collected changed files [revision={revision}, commit={revision_commit.hexsha}, number_of_changed_files={len(changed_files)}]")
+    return changed_files
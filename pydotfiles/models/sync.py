@@ -0,0 +1,184 @@
+# General imports
+import logging
+import os
+import shutil
+
+# Project imports
+from .journal import run_journaled, remove_journaled, make_directories_journaled, OPERATION_COPY
+from pydotfiles.utils import copy_file, rm_file, rm_empty_directory, record_copied_origin
+from pydotfiles.utils import cached_isdir, cached_isfile, cached_islink, cached_lexists, cached_stat, get_file_hashes, invalidating_paths
+
+
+"""
+Mirrors a directory tree from a module into its destination,
+rsync-style: only files whose size, modified time or contents
+differ are transferred (a file that only differs by its modified
+time just gets its timestamps fixed), and anything in the
+destination that isn't in the module can optionally be deleted
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class SyncChanges:
+    """
+    Class representing everything a sync still has to do
+    to make the destination tree mirror the origin tree
+    """
+
+    def __init__(self):
+        self.removed_paths = []
+        self.created_directories = []
+        self.copied_files = []
+        self.updated_files = []
+        self.restamped_files = []
+
+    def __str__(self):
+        return f"removed={len(self.removed_paths)}, created_directories={len(self.created_directories)}, copied={len(self.copied_files)}, updated={len(self.updated_files)}, restamped={len(self.restamped_files)}"
+
+    @property
+    def is_empty(self):
+        return not any([self.removed_paths, self.created_directories, self.copied_files, self.updated_files, self.restamped_files])
+
+
+def get_sync_changes(origin_directory, destination_directory, delete_extras=False):
+    """
+    Compares the two trees, returning what syncing them would
+    change. The destination being a file (or symlink) rather
+    than a directory is left to the caller as a conflict
+    """
+    origin_directory = os.path.abspath(str(origin_directory))
+    destination_directory = os.path.abspath(str(destination_directory))
+
+    if not os.path.isdir(origin_directory):
+        raise FileNotFoundError(f"Sync: The directory to sync doesn't exist [origin={origin_directory}]")
+
+    if cached_lexists(destination_directory) and (cached_islink(destination_directory) or not cached_isdir(destination_directory)):
+        raise FileExistsError(f"The sync destination {destination_directory} already exists, and isn't a directory")
+
+    changes = SyncChanges()
+    compare_directories(origin_directory, destination_directory, delete_extras, changes)
+    return changes
+
+
+def sync_directory(origin_directory, destination_directory, delete_extras=False, use_sudo=False, sudo_password=""):
+    """
+    Syncs the destination tree with the origin tree, returning
+    False if it was already in sync. Each file is journaled on its
+    own, so a rollback undoes exactly the files that were changed
+    """
+    changes = get_sync_changes(origin_directory, destination_directory, delete_extras)
+    if changes.is_empty:
+        return False
+
+    logger.debug(f"Sync: Syncing directory [origin={origin_directory}, destination={destination_directory}, {changes}]")
+
+    # Clears anything in the way first, so that files can take the place of directories (and vice versa)
+    for removed_path in changes.removed_paths:
+        remove_journaled(removed_path, use_sudo, sudo_password)
+
+    make_directories_journaled(changes.created_directories, use_sudo, sudo_password)
+
+    for origin_file, destination_file in changes.updated_files:
+        remove_journaled(destination_file, use_sudo, sudo_password)
+
+    for origin_file, destination_file in changes.copied_files + changes.updated_files:
+        run_journaled(OPERATION_COPY, lambda: copy_file(origin_file, destination_file, use_sudo, sudo_password), run_as_sudo=use_sudo, origin=origin_file, destination=destination_file)
+
+    for origin_file, destination_file in changes.restamped_files:
+        restamp_file(origin_file, destination_file, use_sudo, sudo_password)
+
+    return True
+
+
+def unsync_directory(origin_directory, destination_directory, use_sudo=False, sudo_password=""):
+    """
+    Removes each file the origin tree would have synced, and then
+    each of its directories that's left empty, leaving anything
+    else in the destination tree alone
+    """
+    origin_directory = os.path.abspath(str(origin_directory))
+    destination_directory = os.path.abspath(str(destination_directory))
+
+    if not os.path.isdir(origin_directory) or cached_islink(destination_directory) or not cached_isdir(destination_directory):
+        return
+
+    # Walks bottom-up, so each directory's files are gone by the time it's checked for being empty
+    for current_origin_directory, directory_names, file_names in os.walk(origin_directory, topdown=False):
+        current_destination_directory = os.path.join(destination_directory, os.path.relpath(current_origin_directory, origin_directory))
+
+        for file_name in file_names:
+            destination_file = os.path.join(current_destination_directory, file_name)
+            if cached_isfile(destination_file) and not cached_islink(destination_file):
+                rm_file(destination_file, use_sudo, sudo_password)
+
+        rm_empty_directory(os.path.normpath(current_destination_directory), use_sudo, sudo_password)
+
+
+"""
+Helper functions
+"""
+
+
+def compare_directories(origin_directory, destination_directory, delete_extras, changes):
+    with os.scandir(origin_directory) as origin_entries:
+        origin_entries = sorted(origin_entries, key=lambda origin_entry: origin_entry.name)
+
+    # A symlink in place of a directory is replaced (by the caller), rather than synced through
+    is_destination_created = cached_isdir(destination_directory) and not cached_islink(destination_directory)
+    if not is_destination_created:
+        changes.created_directories.append(destination_directory)
+
+    for origin_entry in origin_entries:
+        destination_path = os.path.join(destination_directory, origin_entry.name)
+
+        if origin_entry.is_dir():
+            if is_destination_created and cached_lexists(destination_path) and (cached_islink(destination_path) or not cached_isdir(destination_path)):
+                changes.removed_paths.append(destination_path)
+            compare_directories(origin_entry.path, destination_path, delete_extras, changes)
+        elif origin_entry.is_file():
+            compare_files(origin_entry.path, destination_path, is_destination_created, changes)
+        else:
+            logger.debug(f"Sync: Skipping a file that can't be synced (e.g. a broken symlink) [file={origin_entry.path}]")
+
+    if delete_extras and is_destination_created:
+        origin_names = {origin_entry.name for origin_entry in origin_entries}
+        with os.scandir(destination_directory) as destination_entries:
+            changes.removed_paths.extend(sorted(destination_entry.path for destination_entry in destination_entries if destination_entry.name not in origin_names))
+
+
+def compare_files(origin_file, destination_file, is_destination_created, changes):
+    if not is_destination_created or not cached_lexists(destination_file):
+        changes.copied_files.append((origin_file, destination_file))
+        return
+
+    if cached_islink(destination_file) or not cached_isfile(destination_file):
+        changes.removed_paths.append(destination_file)
+        changes.copied_files.append((origin_file, destination_file))
+        return
+
+    origin_stat = cached_stat(origin_file)
+    destination_stat = cached_stat(destination_file)
+    if origin_stat.st_size != destination_stat.st_size:
+        changes.updated_files.append((origin_file, destination_file))
+        return
+
+    # Compares contents even when the metadata matches (the hash database makes this a lookup for unchanged files)
+    origin_hash, destination_hash = get_file_hashes([origin_file, destination_file])
+    if origin_hash != destination_hash:
+        changes.updated_files.append((origin_file, destination_file))
+    elif origin_stat.st_mtime_ns != destination_stat.st_mtime_ns:
+        changes.restamped_files.append((origin_file, destination_file))
+
+
+def restamp_file(origin_file, destination_file, use_sudo=False, sudo_password=""):
+    # The privileged helper can only copy, which still fixes the timestamps
+    if use_sudo:
+        remove_journaled(destination_file, use_sudo, sudo_password)
+        run_journaled(OPERATION_COPY, lambda: copy_file(origin_file, destination_file, use_sudo, sudo_password), run_as_sudo=use_sudo, origin=origin_file, destination=destination_file)
+        return
+
+    with invalidating_paths(destination_file):
+        shutil.copystat(origin_file, destination_file)
+
+    record_copied_origin(origin_file)
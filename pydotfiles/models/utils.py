@@ -4,13 +4,11 @@ import shutil
 import subprocess
 import getpass
 import sys
-import json
-import yaml
-from pathlib import Path
 
 # Project imports
 from pydotfiles.models import OverrideAction
 from pydotfiles.utils import PrettyLogFormatter, PrettyPrint
+from pydotfiles.utils import load_config_file
 
 
 logger = logging.getLogger(__name__)
@@ -65,22 +63,9 @@ def load_data_from_file(config_file):
     if config_file is None:
         return {}
 
-    # TODO P3: We're doing this path -> string convert here to not break
-    # current APIs, but we'll want to come back and re-write everything in
-    # terms of Path later on
-    if isinstance(config_file, Path):
-        config_file = str(config_file)
-
-    with open(config_file, 'r') as config_fd:
-        if config_file.endswith("json"):
-            return json.load(config_fd)
-        elif config_file.endswith("yaml") or config_file.endswith("yml"):
-            try:
-                return yaml.load(config_fd)
-            except yaml.YAMLError:
-                raise
-        else:
-            raise RuntimeError(f"Configuration Data Load: The file type of the settings configuration file {config_file} could not be parsed (not a supported filetype)")
+    data, backend = load_config_file(config_file)
+    logger.debug(f"Configuration Data Load: Loaded configuration file [file={config_file}, backend={backend}]")
+    return data
 
 
 """
@@ -1,16 +1,35 @@
 import logging
 import os
 import json
+import fnmatch
+import hashlib
+import math
+import pkgutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import yaml
 import jsonschema
 from pathlib import Path
-from pkg_resources import resource_stream, resource_filename
 
-from .utils import set_logging, load_data_from_file
+from .utils import set_logging
 from .exceptions import ValidationError, ValidationErrorReason
+from .discovery import discover_modules, SETTINGS_FILE_NAMES
+from .references import RepoFileIndex, DependencyGraph, get_required_references, find_missing_references, DEFAULT_SETTINGS_FILE_REFERENCE
+from .codegen import get_generated_validator
+from pydotfiles.utils import parse_config_data
+from pydotfiles.version import VERSION_NUMBER
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the layout of the validation cache entries changes
+VALIDATION_CACHE_FORMAT_VERSION = 2
+
+# Trees that never contain pydotfiles configuration, but often contain plenty of other JSON/YAML files
+DEFAULT_IGNORE_PATTERNS = ['.git', 'node_modules']
+
+# The validator of a parallel validation's worker process, set once when the worker starts
+_worker_validator = None
+
 
 class ConfigMapper:
     """
@@ -19,16 +38,107 @@ class ConfigMapper:
     structure
     """
 
+    # Process-wide registry of compiled validators, keyed by (version, schema)
+    compiled_validators = {}
+    compiled_validators_lock = threading.Lock()
+
+    # The code-generated fast path for each compiled validator (None if the schema can't be generated)
+    generated_validators = {}
+
     @staticmethod
     def get_schema(version, schema):
-        schema_file = resource_stream(f"pydotfiles.resources.schemas.{version}", f"{schema}.json")
-        return json.load(schema_file)
+        return json.loads(load_schema_resource(version, f"{schema}.json"))
+
+    @staticmethod
+    def get_inlined_schema(version, schema):
+        """
+        Returns the schema with its whole $ref graph (including
+        references into other schema files) inlined, so that
+        no resolver is needed at validation time
+        """
+        return inline_schema_references(ConfigMapper.get_schema(version, schema), version, f"{schema}.json", {}, [])
+
+    @staticmethod
+    def get_validator(version, schema):
+        """
+        Returns the pre-compiled validator for a given schema,
+        compiling it on first use
+        """
+        schema_key = (version, schema)
+        compiled_validator = ConfigMapper.compiled_validators.get(schema_key)
+        if compiled_validator is not None:
+            return compiled_validator
+
+        with ConfigMapper.compiled_validators_lock:
+            compiled_validator = ConfigMapper.compiled_validators.get(schema_key)
+            if compiled_validator is None:
+                inlined_schema = ConfigMapper.get_inlined_schema(version, schema)
+                validator_class = jsonschema.validators.validator_for(inlined_schema)
+                validator_class.check_schema(inlined_schema)
+                compiled_validator = validator_class(inlined_schema)
+                ConfigMapper.generated_validators[schema_key] = get_generated_validator(inlined_schema)
+                ConfigMapper.compiled_validators[schema_key] = compiled_validator
+                logger.debug(f"Validator: Compiled schema validator [version={version}, schema={schema}]")
+
+        return compiled_validator
 
     @staticmethod
-    def get_resolver(version, schema):
-        schema_file_name = resource_filename(f"pydotfiles.resources.schemas.{version}", f"{schema}.json")
-        schema_file_path = Path(schema_file_name)
-        return jsonschema.RefResolver(f"file://{str(schema_file_path.parent)}/", None)
+    def get_generated_validator(version, schema):
+        """
+        Returns the code-generated validation function for a given
+        schema, which only answers whether a document is valid
+        """
+        schema_key = (version, schema)
+        if schema_key not in ConfigMapper.generated_validators:
+            ConfigMapper.get_validator(version, schema)
+        return ConfigMapper.generated_validators.get(schema_key)
+
+
+class ValidationCache:
+    """
+    Records the content hashes of files that have
+    successfully passed validation, so that unchanged
+    files can be skipped on later runs
+    """
+
+    def __init__(self, cache_directory):
+        self.cache_directory = cache_directory
+        self.cache_key = get_validation_cache_key()
+
+        cached_data = cache_directory.read_validation_cache()
+        self.validated_files = cached_data.get('validated_files', {}) if cached_data.get('key') == self.cache_key else {}
+        self.seen_files = {}
+
+    def is_validated(self, content_hash):
+        return content_hash in self.validated_files
+
+    def get_entry(self, content_hash):
+        """
+        Returns the files a validated file references (and needs to
+        exist), marking the entry as still in use
+        """
+        cache_entry = self.validated_files.get(content_hash, {})
+        self.seen_files[content_hash] = cache_entry
+        return cache_entry
+
+    def add(self, content_hash, referenced_files, required_references=None):
+        cache_entry = {
+            'referenced_files': referenced_files,
+            'required_references': [] if required_references is None else [list(required_reference) for required_reference in required_references],
+        }
+        self.validated_files[content_hash] = cache_entry
+        self.seen_files[content_hash] = cache_entry
+
+    def merge(self, cache_entries):
+        self.validated_files.update(cache_entries)
+        self.seen_files.update(cache_entries)
+
+    def save(self):
+        # Only the entries used in this run are kept, which stops the cache from growing with every edit
+        self.cache_directory.write_validation_cache({
+            'key': self.cache_key,
+            'validated_files': self.seen_files,
+        })
 
 
 class Validator:
@@ -37,12 +147,43 @@ class Validator:
     or file is pydotfiles-compliant
     """
 
-    def __init__(self, is_quiet=False, is_verbose=False):
+    def __init__(self, is_quiet=False, is_verbose=False, cache_directory=None, error_stream=None, is_layout_aware=False, ignore_patterns=None, check_references=True):
         self.is_quiet = is_quiet
         self.is_verbose = is_verbose
+
+        # Cross-reference checks run against an index of the directory being validated, built once per run
+        self.check_references = check_references
+        self.file_index = None
+
+        # Layout-aware validation only looks at the files pydotfiles itself would load, instead of every config file
+        self.is_layout_aware = is_layout_aware
+        self.ignore_patterns = DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns
+        self.validation_cache = None if cache_directory is None else ValidationCache(cache_directory)
+
+        # If set, every validation error is streamed to it as NDJSON records as soon as it's found
+        self.error_stream = error_stream
+        self.reported_errors = set()
+
+        # Outcome of every file validated during a directory run, so shared files are only validated once
+        self.visited_files = None
+
+        # Parallel runs validate referenced files on their own instead, so they aren't validated once per chunk
+        self.is_following_references = True
+
+        # If set, records which files reference which (e.g. a core settings file and its default settings file)
+        self.dependency_graph = None
+
+        # Data of every file handed out by load_validated_file, so shared files are only read and parsed once
+        self.loaded_files = {}
         set_logging(is_quiet, is_verbose)
 
-    def validate_directory(self, directory):
+    def __getstate__(self):
+        # Streams can't be sent to worker processes, so errors are only ever reported from the parent process
+        state = self.__dict__.copy()
+        state['error_stream'] = None
+        return state
+
+    def validate_directory(self, directory, max_workers=None, changed_files=None):
         if directory is None:
             raise ValidationError(ValidationErrorReason.INVALID_TARGET, "The passed in directory is invalid [directory=None]")
 
@@ -56,31 +197,260 @@ class Validator:
 
         logger.info(f"Validator: Validating directory [directory={directory}]")
 
-        # Generates a set of files that we need to validate from a tree structure
-        initial_files_to_validate = set()
-        for path_prefix, directory_names, file_names in os.walk(directory):
-            for file_name_path in file_names:
-                file_name = str(file_name_path)
-                if file_name.endswith(".json") or file_name.endswith(".yaml") or file_name.endswith(".yml"):
-                    initial_files_to_validate.add(os.path.join(path_prefix, file_name))
+        files_to_validate = self.get_files_to_validate(directory)
+        self.index_directory(directory)
 
-        validation_exceptions = []
-        for file_to_validate in initial_files_to_validate:
+        # Scopes validation down to just what a set of changes (e.g. since a git revision) could have broken
+        if changed_files is not None:
+            files_to_validate = self.get_affected_files(files_to_validate, changed_files)
+            logger.info(f"Validator: Scoped validation to changed files [number_of_changed_files={len(changed_files)}, number_of_files_to_validate={len(files_to_validate)}]")
+
+        if max_workers is None or max_workers <= 1 or len(files_to_validate) <= 1:
+            validation_exceptions, _ = self.validate_files(files_to_validate)
+        else:
+            validation_exceptions = self.validate_files_in_parallel(files_to_validate, max_workers)
+
+        if self.validation_cache is not None:
             try:
-                self.validate_file(file_to_validate)
-            except ValidationError as e:
-                if self.is_verbose:
-                    logger.exception(e.help_message)
-                validation_exceptions.append(e)
+                self.validation_cache.save()
+            except OSError:
+                logger.warning("Validator: Unable to persist the validation cache", exc_info=True)
+
+        validation_exceptions = get_validation_report(validation_exceptions)
 
         number_of_validation_errors = len(validation_exceptions)
         if number_of_validation_errors == 0:
             logger.info(f"Validator: Successfully validated directory [directory={directory}]")
         else:
+            for validation_exception in validation_exceptions:
+                logger.error(f"Validator: {validation_exception.help_message}")
             logger.error(f"Validator: Directory failed validation [directory={directory}, number_of_validation_errors={number_of_validation_errors}]")
             raise validation_exceptions[0]
 
+    def index_directory(self, directory):
+        if self.check_references:
+            self.file_index = RepoFileIndex(directory)
+
+    def load_validated_file(self, config_file):
+        """
+        Reads, parses, and validates a configuration file exactly once,
+        handing back its data so that loading a module doesn't need to
+        parse it again. Mirrors load_data_from_file, so a missing (None)
+        file is just empty data
+        """
+        if config_file is None:
+            return {}
+
+        loaded_file_key = os.path.abspath(config_file)
+        if loaded_file_key in self.loaded_files:
+            return self.loaded_files[loaded_file_key]
+
+        file = Path(config_file)
+        if not file.is_file():
+            validation_error = ValidationError(ValidationErrorReason.INVALID_TARGET, f"Validator: The passed in file is invalid")
+            validation_error.context_map['file'] = file
+            raise validation_error
+
+        logger.debug(f"Validator: Loading and validating file [file={file}]")
+        file_data = parse_file_data(file, file.read_bytes())
+
+        try:
+            self.validate_data(file_data)
+        except ValidationError as e:
+            e.context_map['file_name'] = file
+            raise e
+
+        self.validate_references(file, get_required_references(file_data))
+
+        self.loaded_files[loaded_file_key] = file_data
+        return file_data
+
+    def get_files_to_validate(self, directory):
+        """
+        Generates the sorted list of files that we need
+        to validate from a tree structure
+        """
+        if self.is_layout_aware:
+            return self.get_module_files_to_validate(directory)
+
+        initial_files_to_validate = set()
+        for path_prefix, directory_names, file_names in os.walk(directory):
+            relative_path_prefix = os.path.relpath(path_prefix, directory)
+
+            # Prunes ignored trees in place, so they're never descended into
+            directory_names[:] = [directory_name for directory_name in directory_names if not is_ignored_path(os.path.join(relative_path_prefix, directory_name), self.ignore_patterns)]
+
+            for file_name in file_names:
+                if is_config_file(file_name) and not is_ignored_path(os.path.join(relative_path_prefix, file_name), self.ignore_patterns):
+                    initial_files_to_validate.add(os.path.join(path_prefix, file_name))
+
+        return sorted(initial_files_to_validate)
+
+    def get_module_files_to_validate(self, directory):
+        """
+        Discovers files the same way loading the modules does: only
+        each top-level module's settings file is a starting point,
+        and the default settings files they reference get validated
+        along with them
+        """
+        with os.scandir(directory) as directory_entries:
+            module_names = sorted(directory_entry.name for directory_entry in directory_entries if directory_entry.is_dir() and not is_ignored_path(directory_entry.name, self.ignore_patterns))
+
+        module_index = discover_modules(directory, module_names)
+        return sorted(module_files.settings_file for module_files in module_index.values() if module_files.settings_file is not None)
+
+    def get_affected_files(self, files_to_validate, changed_files):
+        """
+        Narrows the files to validate down to the changed ones, plus
+        every file that (transitively) references a changed file
+        """
+        dependency_graph = DependencyGraph()
+        for file_to_validate in files_to_validate:
+            dependency_graph.set_references(os.path.abspath(file_to_validate), self.get_file_references(file_to_validate))
+
+        affected_files = dependency_graph.get_affected_files({os.path.abspath(changed_file) for changed_file in changed_files})
+        return [file_to_validate for file_to_validate in files_to_validate if os.path.abspath(file_to_validate) in affected_files]
+
+    def get_file_references(self, file, reference_type=None):
+        """
+        Returns the absolute paths of every file the given file
+        references (optionally only of the given type), re-using
+        the validation cache's record of them if the file is
+        unchanged (so it isn't even parsed)
+        """
+        file = Path(file)
+        try:
+            raw_file_data = file.read_bytes()
+        except OSError:
+            return set()
+
+        content_hash = hashlib.sha256(raw_file_data).hexdigest()
+        if self.validation_cache is not None and self.validation_cache.is_validated(content_hash):
+            required_references = self.validation_cache.get_entry(content_hash).get('required_references', [])
+        else:
+            try:
+                required_references = get_required_references(parse_file_data(file, raw_file_data))
+            except ValidationError:
+                # A file that can't even be parsed references nothing, and it only gets validated if it changed itself
+                return set()
+
+        return {os.path.normpath(os.path.join(os.path.abspath(file.parent), relative_path)) for _, relative_path, required_reference_type in required_references if reference_type is None or required_reference_type == reference_type}
+
+    def is_validation_target(self, file, directory):
+        """
+        Whether the given file would be picked up when
+        validating the given directory
+        """
+        relative_path = os.path.relpath(file, directory)
+        if relative_path.startswith(os.pardir) or not is_config_file(file) or is_ignored_path(relative_path, self.ignore_patterns):
+            return False
+
+        if self.is_layout_aware:
+            relative_path_parts = Path(relative_path).parts
+            return len(relative_path_parts) == 2 and relative_path_parts[1] in SETTINGS_FILE_NAMES
+
+        return True
+
+    def validate_files(self, files_to_validate):
+        """
+        Validates each of the given files, returning the
+        collected validation errors and the validation cache
+        entries that were used along the way
+        """
+        self.visited_files = {}
+
+        validation_exceptions = []
+        try:
+            for file_to_validate in files_to_validate:
+                try:
+                    self.validate_file(file_to_validate)
+                except ValidationError as e:
+                    if self.is_verbose:
+                        logger.exception(e.help_message)
+                    self.report_error(e)
+                    validation_exceptions.append(e)
+        finally:
+            self.visited_files = None
+
+        return validation_exceptions, {} if self.validation_cache is None else self.validation_cache.seen_files
+
+    def validate_files_in_parallel(self, files_to_validate, max_workers):
+        """
+        Fans the file validation out over a process pool, since
+        schema validation is CPU-bound. Each worker is sent its own
+        copy of this validator (and its cache entries) once when it
+        starts, and the cache entries each chunk used are merged
+        back in afterwards
+        """
+        # A file shared by several others (e.g. a default settings file) is listed once on its own, rather than followed from every chunk
+        unique_files_to_validate = {}
+        for file_to_validate in files_to_validate:
+            unique_files_to_validate.setdefault(os.path.abspath(file_to_validate))
+            for referenced_file in sorted(self.get_file_references(file_to_validate, DEFAULT_SETTINGS_FILE_REFERENCE)):
+                unique_files_to_validate.setdefault(referenced_file)
+        files_to_validate = list(unique_files_to_validate)
+
+        # Several chunks per worker keep the pool balanced when some files are much larger than others
+        chunk_size = max(1, math.ceil(len(files_to_validate) / (max_workers * 4)))
+        file_chunks = [files_to_validate[index:index + chunk_size] for index in range(0, len(files_to_validate), chunk_size)]
+
+        logger.debug(f"Validator: Validating files in parallel [number_of_files={len(files_to_validate)}, max_workers={max_workers}, number_of_chunks={len(file_chunks)}]")
+
+        validation_exceptions = []
+        self.is_following_references = False
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=initialize_worker_validator, initargs=(self,)) as executor:
+                for chunk_exceptions, chunk_cache_entries in executor.map(validate_files_in_worker, file_chunks):
+                    for chunk_exception in chunk_exceptions:
+                        self.report_error(chunk_exception)
+                    validation_exceptions.extend(chunk_exceptions)
+
+                    if self.validation_cache is not None:
+                        self.validation_cache.merge(chunk_cache_entries)
+        finally:
+            self.is_following_references = True
+
+        return validation_exceptions
+
+    def report_error(self, validation_exception):
+        """
+        Streams a validation error's records, making sure a shared
+        file's error is only ever streamed once
+        """
+        if self.error_stream is None:
+            return
+
+        for validation_record in get_validation_records(validation_exception):
+            validation_record_key = json.dumps(validation_record, sort_keys=True)
+            if validation_record_key in self.reported_errors:
+                continue
+
+            self.reported_errors.add(validation_record_key)
+            self.error_stream.write(f"{validation_record_key}\n")
+
+        self.error_stream.flush()
+
     def validate_file(self, file):
+        # Fast return if this file was already validated during this run (e.g. a shared default settings file)
+        if self.visited_files is not None and file is not None:
+            visited_file_key = os.path.abspath(file)
+            if visited_file_key in self.visited_files:
+                visited_file_exception = self.visited_files[visited_file_key]
+                if visited_file_exception is not None:
+                    raise visited_file_exception
+                return
+
+            try:
+                self.__validate_file__(file)
+            except ValidationError as e:
+                self.visited_files[visited_file_key] = e
+                raise
+            self.visited_files[visited_file_key] = None
+            return
+
+        self.__validate_file__(file)
+
+    def __validate_file__(self, file):
         if file is None:
             raise ValidationError(ValidationErrorReason.INVALID_TARGET, "Validator: No file was passed in")
 
@@ -94,19 +464,27 @@ class Validator:
         if type(file) is str:
             file = Path(file)
 
+        with open(file, 'rb') as file_descriptor:
+            raw_file_data = file_descriptor.read()
+
+        # Skips re-validating a file that's unchanged since it last passed, but still follows its references
+        content_hash = hashlib.sha256(raw_file_data).hexdigest()
+        if self.validation_cache is not None and self.validation_cache.is_validated(content_hash):
+            logger.info(f"Validator: File is unchanged since it was last validated, skipping [file={file}]")
+            cache_entry = self.validation_cache.get_entry(content_hash)
+            referenced_file_names = cache_entry.get('referenced_files', [])
+            required_references = cache_entry.get('required_references', [])
+
+            # The contents are unchanged, but the files they point at might not be
+            self.record_references(file, referenced_file_names, required_references)
+            self.validate_references(file, required_references)
+            self.validate_referenced_files(file, referenced_file_names)
+            return
+
         logger.info(f"Validator: Validating file [file={file}]")
 
         # Validates the format
-        try:
-            file_data = load_data_from_file(file)
-        except json.JSONDecodeError as e:
-            validation_error = ValidationError(ValidationErrorReason.INVALID_SYNTAX, f"Validator: An invalid JSON syntax error was detected")
-            validation_error.context_map['file'] = file
-            raise validation_error from e
-        except yaml.YAMLError as e:
-            validation_error = ValidationError(ValidationErrorReason.INVALID_SYNTAX, f"Validator: An invalid YAML syntax error was detected")
-            validation_error.context_map['file'] = file
-            raise validation_error from e
+        file_data = parse_file_data(file, raw_file_data)
 
         # Validates the schema
         try:
@@ -115,15 +493,52 @@ class Validator:
             e.context_map['file_name'] = file
             raise e
 
+        # Validates that everything the file points at exists
+        required_references = get_required_references(file_data)
+        self.validate_references(file, required_references)
+
         # Recursively dispatches to validate other files if needed
+        referenced_file_names = []
         if file_data.get('schema') == 'core':
             defaults_setting_file_name = file_data.get('os', {}).get('default_settings_file')
             if defaults_setting_file_name is not None:
-                defaults_settings_file_path = Path.joinpath(file.parent, defaults_setting_file_name)
-                self.validate_file(defaults_settings_file_path)
+                referenced_file_names.append(defaults_setting_file_name)
+
+        self.record_references(file, referenced_file_names, required_references)
+        self.validate_referenced_files(file, referenced_file_names)
+
+        if self.validation_cache is not None:
+            self.validation_cache.add(content_hash, referenced_file_names, required_references)
 
         logger.info(f"Validator: Successfully validated file [file={file}]")
 
+    def validate_referenced_files(self, file, referenced_file_names):
+        if not self.is_following_references:
+            return
+
+        for referenced_file_name in referenced_file_names:
+            self.validate_file(Path.joinpath(file.parent, referenced_file_name))
+
+    def validate_references(self, file, required_references):
+        if self.file_index is None or len(required_references) == 0:
+            return
+
+        missing_references = find_missing_references(file.parent, required_references, self.file_index)
+        if len(missing_references) > 0:
+            validation_error = ValidationError(ValidationErrorReason.MISSING_REFERENCE, schema_errors=missing_references)
+            validation_error.context_map['reason'] = '; '.join(f"{missing_reference['path']}: {missing_reference['reason']}" for missing_reference in missing_references)
+            validation_error.context_map['file_name'] = file
+            raise validation_error
+
+    def record_references(self, file, referenced_file_names, required_references=()):
+        if self.dependency_graph is None:
+            return
+
+        # Required files are tracked too, so e.g. deleting a symlink origin revalidates the settings file using it
+        referenced_files = {os.path.abspath(Path.joinpath(file.parent, referenced_file_name)) for referenced_file_name in referenced_file_names}
+        referenced_files.update(os.path.normpath(os.path.join(os.path.abspath(file.parent), relative_path)) for _, relative_path, _ in required_references)
+        self.dependency_graph.set_references(os.path.abspath(file), referenced_files)
+
     @staticmethod
     def validate_data(data):
         if data is None:
@@ -139,17 +554,202 @@ class Validator:
         if schema_type is None:
             raise ValidationError(ValidationErrorReason.INVALID_SCHEMA_TYPE, "Validator: The schema type was not found (is there a 'schema' field?)")
 
-        # Retrieves the required schema
-        schema = ConfigMapper.get_schema(version, schema_type)
+        # Retrieves the required pre-compiled schema validators
+        try:
+            schema_validator = ConfigMapper.get_validator(version, schema_type)
+            generated_validator = ConfigMapper.get_generated_validator(version, schema_type)
+        except ImportError as e:
+            raise ValidationError(ValidationErrorReason.INVALID_SCHEMA_VERSION, f"Validator: The schema version is not supported [version={version}]") from e
+        except OSError as e:
+            raise ValidationError(ValidationErrorReason.INVALID_SCHEMA_TYPE, f"Validator: The schema type is not supported [version={version}, schema={schema_type}]") from e
 
-        # We need a custom resolver since we're referencing other schemas
-        # For more information, see https://stackoverflow.com/a/53968771
-        resolver = ConfigMapper.get_resolver(version, schema_type)
+        # Fast path: the generated validator accepts almost every real file without touching jsonschema
+        if generated_validator is not None and generated_validator(data):
+            return
 
-        # Validates the given data to the schema
-        try:
-            jsonschema.validate(data, schema, resolver=resolver)
-        except jsonschema.exceptions.ValidationError as e:
-            validator_error = ValidationError(ValidationErrorReason.INVALID_SCHEMA)
-            validator_error.context_map['reason'] = e.message
-            raise validator_error from e
+        # Validates the given data to the schema, collecting every error in a single pass
+        schema_errors = list(schema_validator.iter_errors(data))
+        if len(schema_errors) > 0:
+            schema_errors.sort(key=lambda error: ([str(path_part) for path_part in error.absolute_path], error.message))
+
+            # The headline reason is the same error jsonschema.validate would have raised
+            best_schema_error = jsonschema.exceptions.best_match(schema_errors)
+            validator_error = ValidationError(ValidationErrorReason.INVALID_SCHEMA, schema_errors=[serialize_schema_error(schema_error) for schema_error in schema_errors])
+            validator_error.context_map['reason'] = best_schema_error.message
+
+            if len(schema_errors) > 1:
+                validator_error.context_map['all_errors'] = '; '.join(f"{schema_error['path']}: {schema_error['reason']}" for schema_error in validator_error.schema_errors)
+
+            raise validator_error from best_schema_error
+
+
+"""
+Helper functions
+"""
+
+
+def initialize_worker_validator(validator):
+    global _worker_validator
+    _worker_validator = validator
+
+
+def validate_files_in_worker(files_to_validate):
+    # Only the cache entries this chunk used are sent back, rather than every one the worker has seen so far
+    if _worker_validator.validation_cache is not None:
+        _worker_validator.validation_cache.seen_files = {}
+
+    return _worker_validator.validate_files(files_to_validate)
+
+
+def get_validation_report(validation_exceptions):
+    """
+    Merges validation errors into a deterministic report, sorted by
+    the failing file and with duplicates (e.g. a broken default
+    settings file referenced by several modules) only kept once
+    """
+    report = {}
+    for validation_exception in validation_exceptions:
+        failing_file = validation_exception.context_map.get('file', validation_exception.context_map.get('file_name', ''))
+        report.setdefault((str(failing_file), validation_exception.help_message), validation_exception)
+
+    return [report[report_key] for report_key in sorted(report)]
+
+
+def parse_file_data(file, raw_file_data):
+    try:
+        file_data, _ = parse_config_data(raw_file_data, file)
+    except json.JSONDecodeError as e:
+        validation_error = ValidationError(ValidationErrorReason.INVALID_SYNTAX, f"Validator: An invalid JSON syntax error was detected")
+        validation_error.context_map['file'] = file
+        raise validation_error from e
+    except yaml.YAMLError as e:
+        validation_error = ValidationError(ValidationErrorReason.INVALID_SYNTAX, f"Validator: An invalid YAML syntax error was detected")
+        validation_error.context_map['file'] = file
+        raise validation_error from e
+
+    return file_data
+
+
+def is_ignored_path(relative_path, ignore_patterns):
+    """
+    A path is ignored if either the whole relative path or any
+    single part of it matches one of the (fnmatch-style) patterns
+    """
+    for ignore_pattern in ignore_patterns:
+        if fnmatch.fnmatch(relative_path, ignore_pattern):
+            return True
+
+        for path_part in Path(relative_path).parts:
+            if fnmatch.fnmatch(path_part, ignore_pattern):
+                return True
+
+    return False
+
+
+def is_config_file(file_name):
+    file_name = str(file_name)
+    return file_name.endswith(".json") or file_name.endswith(".yaml") or file_name.endswith(".yml")
+
+
+def serialize_schema_error(schema_error):
+    return {
+        "path": get_json_path(schema_error.absolute_path),
+        "reason": schema_error.message,
+        "schema_pointer": "/" + "/".join(str(schema_path_part).replace("~", "~0").replace("/", "~1") for schema_path_part in schema_error.absolute_schema_path),
+    }
+
+
+def get_json_path(path_parts):
+    json_path = "$"
+    for path_part in path_parts:
+        json_path += f"[{path_part}]" if isinstance(path_part, int) else f".{path_part}"
+    return json_path
+
+
+def get_validation_records(validation_exception):
+    """
+    Flattens a validation error into one record per individual
+    problem, ready to be serialized as NDJSON
+    """
+    failing_file = validation_exception.context_map.get('file', validation_exception.context_map.get('file_name'))
+    failing_file = None if failing_file is None else str(failing_file)
+
+    if len(validation_exception.schema_errors) == 0:
+        return [{
+            "file": failing_file,
+            "error": validation_exception.reason.name,
+            "path": None,
+            "reason": validation_exception.undecorated_help_message,
+            "schema_pointer": None,
+        }]
+
+    return [{
+        "file": failing_file,
+        "error": validation_exception.reason.name,
+        "path": schema_error["path"],
+        "reason": schema_error["reason"],
+        "schema_pointer": schema_error["schema_pointer"],
+    } for schema_error in validation_exception.schema_errors]
+
+
+def load_schema_resource(version, schema_file_name):
+    """
+    Reads a bundled schema file (pkgutil is used instead of
+    pkg_resources, since it's far cheaper to import and still
+    supports zipped installs)
+    """
+    schema_data = pkgutil.get_data(f"pydotfiles.resources.schemas.{version}", schema_file_name)
+    if schema_data is None:
+        raise FileNotFoundError(f"Validator: Unable to load schema resource [version={version}, file={schema_file_name}]")
+    return schema_data
+
+
+def inline_schema_references(schema_node, version, schema_file_name, schema_documents, reference_stack):
+    """
+    Recursively replaces every {"$ref": ...} node with a copy of
+    the (inlined) schema node that it points to
+    """
+    if isinstance(schema_node, list):
+        return [inline_schema_references(child_node, version, schema_file_name, schema_documents, reference_stack) for child_node in schema_node]
+
+    if not isinstance(schema_node, dict):
+        return schema_node
+
+    reference = schema_node.get("$ref")
+    if reference is None:
+        return {key: inline_schema_references(child_node, version, schema_file_name, schema_documents, reference_stack) for key, child_node in schema_node.items()}
+
+    referenced_file_name, _, json_pointer = reference.partition("#")
+    referenced_file_name = schema_file_name if referenced_file_name == "" else os.path.normpath(os.path.join(os.path.dirname(schema_file_name), referenced_file_name))
+
+    absolute_reference = f"{referenced_file_name}#{json_pointer}"
+    if absolute_reference in reference_stack:
+        raise ValueError(f"Validator: Recursive schema references can't be inlined [reference={absolute_reference}]")
+
+    if referenced_file_name not in schema_documents:
+        schema_documents[referenced_file_name] = json.loads(load_schema_resource(version, referenced_file_name))
+
+    referenced_node = resolve_json_pointer(schema_documents[referenced_file_name], json_pointer)
+    return inline_schema_references(referenced_node, version, referenced_file_name, schema_documents, reference_stack + [absolute_reference])
+
+
+def resolve_json_pointer(document, json_pointer):
+    node = document
+    for pointer_part in json_pointer.split("/")[1:]:
+        pointer_part = pointer_part.replace("~1", "/").replace("~0", "~")
+        node = node[int(pointer_part)] if isinstance(node, list) else node[pointer_part]
+    return node
+
+
+def get_validation_cache_key():
+    """
+    Validation results are only reusable for the same pydotfiles
+    version and the exact same set of bundled schemas
+    """
+    import pydotfiles.resources.schemas as schemas_package
+
+    schemas_hasher = hashlib.sha256()
+    for schema_file in sorted(Path(schemas_package.__file__).parent.rglob("*.json")):
+        schemas_hasher.update(schema_file.read_bytes())
+
+    return f"{VALIDATION_CACHE_FORMAT_VERSION}:{VERSION_NUMBER}:{schemas_hasher.hexdigest()}"
@@ -0,0 +1,292 @@
+# General imports
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+# Project imports
+from .exceptions import ValidationError, ValidationErrorReason
+from .validator import get_validation_report, is_ignored_path
+from .references import RepoFileIndex, DependencyGraph, IGNORED_DIRECTORY_NAMES
+
+
+"""
+Watch mode for the validator, incrementally revalidating only
+the files that changed (plus every file that references them)
+while keeping compiled schemas and the dependency graph warm
+"""
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+# Editors tend to save in bursts (temp file, rename, chmod), so events are batched for this long
+DEFAULT_SETTLE_INTERVAL = 0.1
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class InotifyFileWatcher:
+    """
+    Watches a directory tree using the Linux inotify API (called
+    directly through ctypes, so no extra dependency is needed)
+    """
+
+    def __init__(self, directory, settle_interval=DEFAULT_SETTLE_INTERVAL, ignore_patterns=None):
+        self.directory = os.path.abspath(directory)
+        self.settle_interval = settle_interval
+        self.ignore_patterns = [] if ignore_patterns is None else ignore_patterns
+
+        self.libc = load_inotify_library()
+        self.inotify_fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.inotify_fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, f"Watcher: Unable to initialize inotify [error={os.strerror(error_number)}]")
+
+        self.watched_directories = {}
+        self.add_watches(self.directory)
+
+    def add_watches(self, directory):
+        """
+        Recursively watches the directory, returning every
+        file found along the way
+        """
+        found_files = set()
+        for path_prefix, directory_names, file_names in os.walk(directory):
+            directory_names[:] = [directory_name for directory_name in directory_names if not is_ignored_directory(os.path.join(path_prefix, directory_name), self.directory, self.ignore_patterns)]
+
+            watch_descriptor = self.libc.inotify_add_watch(self.inotify_fd, os.fsencode(path_prefix), WATCH_MASK)
+            if watch_descriptor < 0:
+                logger.warning(f"Watcher: Unable to watch directory [directory={path_prefix}, error={os.strerror(ctypes.get_errno())}]")
+                continue
+
+            self.watched_directories[watch_descriptor] = path_prefix
+            found_files.update(os.path.join(path_prefix, file_name) for file_name in file_names)
+
+        return found_files
+
+    def wait_for_changes(self, timeout=None):
+        readable, _, _ = select.select([self.inotify_fd], [], [], timeout)
+        if len(readable) == 0:
+            return set()
+
+        changed_files = set()
+        while True:
+            changed_files.update(self.read_events())
+
+            # Keeps draining until the burst of events has settled
+            readable, _, _ = select.select([self.inotify_fd], [], [], self.settle_interval)
+            if len(readable) == 0:
+                return changed_files
+
+    def read_events(self):
+        try:
+            event_buffer = os.read(self.inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed_files = set()
+        offset = 0
+        while offset < len(event_buffer):
+            watch_descriptor, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(event_buffer, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            file_name = os.fsdecode(event_buffer[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so everything has to be treated as changed
+                logger.warning(f"Watcher: The inotify event queue overflowed, rescanning [directory={self.directory}]")
+                changed_files.update(self.add_watches(self.directory))
+                continue
+
+            if mask & IN_IGNORED:
+                self.watched_directories.pop(watch_descriptor, None)
+                continue
+
+            directory = self.watched_directories.get(watch_descriptor)
+            if directory is None or not file_name:
+                continue
+
+            path = os.path.join(directory, file_name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not is_ignored_directory(path, self.directory, self.ignore_patterns):
+                    changed_files.update(self.add_watches(path))
+            else:
+                changed_files.add(path)
+
+        return changed_files
+
+    def close(self):
+        if self.inotify_fd >= 0:
+            os.close(self.inotify_fd)
+            self.inotify_fd = -1
+
+
+class PollingFileWatcher:
+    """
+    Fallback watcher for platforms without inotify, comparing
+    snapshots of every file's stat information
+    """
+
+    def __init__(self, directory, poll_interval=DEFAULT_POLL_INTERVAL, ignore_patterns=None):
+        self.directory = os.path.abspath(directory)
+        self.poll_interval = poll_interval
+        self.ignore_patterns = [] if ignore_patterns is None else ignore_patterns
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        snapshot = {}
+        for path_prefix, directory_names, file_names in os.walk(self.directory):
+            directory_names[:] = [directory_name for directory_name in directory_names if not is_ignored_directory(os.path.join(path_prefix, directory_name), self.directory, self.ignore_patterns)]
+
+            for file_name in file_names:
+                file_path = os.path.join(path_prefix, file_name)
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+
+        return snapshot
+
+    def wait_for_changes(self, timeout=None):
+        time.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+
+        new_snapshot = self.take_snapshot()
+        changed_files = {file_path for file_path in self.snapshot.keys() | new_snapshot.keys() if self.snapshot.get(file_path) != new_snapshot.get(file_path)}
+        self.snapshot = new_snapshot
+        return changed_files
+
+    def close(self):
+        pass
+
+
+class ValidationWatcher:
+    """
+    Runs a full validation pass once, and then revalidates only
+    what's affected by each batch of file changes
+    """
+
+    def __init__(self, validator, directory, file_watcher=None):
+        self.validator = validator
+        self.directory = os.path.abspath(directory)
+        self.file_watcher = file_watcher
+
+        self.dependency_graph = DependencyGraph()
+        self.validator.dependency_graph = self.dependency_graph
+
+    def watch(self):
+        if not os.path.isdir(self.directory):
+            raise ValidationError(ValidationErrorReason.INVALID_TARGET, f"The passed in directory is invalid [directory={self.directory}]")
+
+        if self.file_watcher is None:
+            self.file_watcher = get_file_watcher(self.directory, self.validator.ignore_patterns)
+
+        self.validate_all()
+        logger.info(f"Watcher: Watching for changes [directory={self.directory}, watcher={type(self.file_watcher).__name__}]")
+
+        try:
+            while True:
+                changed_files = self.file_watcher.wait_for_changes()
+                if len(changed_files) > 0:
+                    self.revalidate(changed_files)
+        finally:
+            self.file_watcher.close()
+
+    def validate_all(self):
+        if self.validator.check_references:
+            self.validator.file_index = RepoFileIndex(self.directory)
+
+        return self.run_validation_pass(self.validator.get_files_to_validate(self.directory))
+
+    def revalidate(self, changed_files):
+        changed_files = {os.path.abspath(changed_file) for changed_file in changed_files}
+
+        if self.validator.file_index is not None:
+            for changed_file in changed_files:
+                self.validator.file_index.update(changed_file)
+
+        # Files referenced by another file are always relevant, even if they wouldn't be validated on their own
+        relevant_changed_files = {changed_file for changed_file in changed_files if changed_file in self.dependency_graph.dependents or self.validator.is_validation_target(changed_file, self.directory)}
+
+        affected_files = self.dependency_graph.get_affected_files(relevant_changed_files)
+
+        # Deleted files drop out of the graph, but anything that referenced them still gets revalidated (and fails)
+        for affected_file in affected_files:
+            if not os.path.isfile(affected_file):
+                self.dependency_graph.remove(affected_file)
+
+        logger.info(f"Watcher: Detected changes [number_of_changed_files={len(changed_files)}, number_of_affected_files={len(affected_files)}]")
+        return self.run_validation_pass(sorted(affected_file for affected_file in affected_files if os.path.isfile(affected_file)))
+
+    def run_validation_pass(self, files_to_validate):
+        # Each pass reports its errors afresh, even ones that were already reported in an earlier pass
+        self.validator.reported_errors = set()
+
+        validation_exceptions, _ = self.validator.validate_files(files_to_validate)
+
+        if self.validator.validation_cache is not None:
+            try:
+                self.validator.validation_cache.save()
+            except OSError:
+                logger.warning("Watcher: Unable to persist the validation cache", exc_info=True)
+
+        validation_exceptions = get_validation_report(validation_exceptions)
+        if len(validation_exceptions) == 0:
+            logger.info(f"Watcher: Successfully validated files [number_of_files={len(files_to_validate)}]")
+        else:
+            for validation_exception in validation_exceptions:
+                logger.error(f"Watcher: {validation_exception.help_message}")
+            logger.error(f"Watcher: Files failed validation [number_of_files={len(files_to_validate)}, number_of_validation_errors={len(validation_exceptions)}]")
+
+        return validation_exceptions
+
+
+"""
+Helper functions
+"""
+
+
+def get_file_watcher(directory, ignore_patterns=None):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyFileWatcher(directory, ignore_patterns=ignore_patterns)
+        except OSError:
+            logger.debug(f"Watcher: inotify is unavailable, falling back to polling [directory={directory}]", exc_info=True)
+
+    return PollingFileWatcher(directory, ignore_patterns=ignore_patterns)
+
+
+def is_ignored_directory(directory, watched_directory, ignore_patterns):
+    # Skips the same trees that validating the directory does (e.g. `--ignore node_modules`), so they're never watched
+    return os.path.basename(directory) in IGNORED_DIRECTORY_NAMES or is_ignored_path(os.path.relpath(directory, watched_directory), ignore_patterns)
+
+
+def load_inotify_library():
+    library_name = ctypes.util.find_library("c")
+    try:
+        libc = ctypes.CDLL(library_name, use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError) as e:
+        raise OSError(f"Watcher: The inotify API could not be loaded [library={library_name}]") from e
+    return libc
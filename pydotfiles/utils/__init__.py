@@ -1,2 +1,7 @@
 from .general import *
+from .copying import *
+from .hashes import *
 from .io import *
+from .loaders import *
+from .privileged import *
+from .stats import *
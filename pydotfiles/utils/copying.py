@@ -0,0 +1,150 @@
+# General imports
+import errno
+import logging
+import os
+import shutil
+import stat
+import sys
+
+
+"""
+A copy engine that keeps file contents inside the kernel wherever it
+can: a reflink (FICLONE) on copy-on-write file systems (btrfs, XFS),
+then copy_file_range (which can also offload to NFS servers), then
+sendfile, and only then a plain buffered copy. Metadata is copied
+afterwards exactly like shutil.copy2 does
+"""
+
+logger = logging.getLogger(__name__)
+
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+BUFFERED_COPY_CHUNK_SIZE = 1024 * 1024
+
+COPY_METHOD_REFLINK = "reflink"
+COPY_METHOD_COPY_FILE_RANGE = "copy_file_range"
+COPY_METHOD_SENDFILE = "sendfile"
+COPY_METHOD_BUFFERED = "buffered"
+COPY_METHOD_SHUTIL = "shutil"
+
+# Errors meaning "this file system/kernel can't do it this way", rather than that the copy itself failed
+UNSUPPORTED_COPY_ERRNOS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP),
+    errno.ENOTTY,
+    errno.EBADF,
+    errno.EPERM,
+    errno.ETXTBSY,
+}
+
+
+def fast_copy_file(origin, destination):
+    """
+    Copies the origin's contents and metadata to the destination (the
+    same result as shutil.copy2), returning which copy method was used
+    """
+    origin = str(origin)
+    destination = str(destination)
+
+    # Everything but Linux (e.g. macOS, where shutil already uses fcopyfile) goes through shutil
+    if not sys.platform.startswith("linux"):
+        shutil.copy2(origin, destination)
+        return COPY_METHOD_SHUTIL
+
+    with open(origin, 'rb') as origin_file:
+        origin_stat = os.fstat(origin_file.fileno())
+
+        # Directories, FIFOs, devices etc. keep shutil's own handling (and error messages)
+        if not stat.S_ISREG(origin_stat.st_mode):
+            shutil.copy2(origin, destination)
+            return COPY_METHOD_SHUTIL
+
+        with open(destination, 'wb') as destination_file:
+            copy_method = copy_file_contents(origin_file.fileno(), destination_file.fileno(), origin_stat.st_size)
+
+    shutil.copystat(origin, destination)
+    logger.debug(f"File Copying: Copied file [origin={origin}, destination={destination}, method={copy_method}]")
+    return copy_method
+
+
+def copy_file_contents(origin_fd, destination_fd, origin_size):
+    if copy_with_reflink(origin_fd, destination_fd):
+        return COPY_METHOD_REFLINK
+
+    # Each method picks up from wherever the one before it stopped
+    offset = 0
+    for copy_method, copy_chunk in get_kernel_copy_methods():
+        try:
+            offset = copy_until_end(copy_chunk, origin_fd, destination_fd, offset)
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_COPY_ERRNOS:
+                raise
+            logger.debug(f"File Copying: Copy method is unsupported, falling back [method={copy_method}, error={os.strerror(e.errno)}]")
+            continue
+
+        # Some (e.g. FUSE) file systems report an early end of file instead of failing
+        if offset >= origin_size:
+            return copy_method
+
+    copy_until_end(copy_chunk_buffered, origin_fd, destination_fd, offset)
+    return COPY_METHOD_BUFFERED
+
+
+"""
+Helper functions
+"""
+
+
+def copy_with_reflink(origin_fd, destination_fd):
+    try:
+        import fcntl
+        fcntl.ioctl(destination_fd, FICLONE, origin_fd)
+        return True
+    except ImportError:
+        return False
+    except OSError as e:
+        if e.errno not in UNSUPPORTED_COPY_ERRNOS:
+            raise
+        return False
+
+
+def get_kernel_copy_methods():
+    kernel_copy_methods = []
+    if hasattr(os, 'copy_file_range'):
+        kernel_copy_methods.append((COPY_METHOD_COPY_FILE_RANGE, copy_chunk_with_copy_file_range))
+    if hasattr(os, 'sendfile'):
+        kernel_copy_methods.append((COPY_METHOD_SENDFILE, copy_chunk_with_sendfile))
+    return kernel_copy_methods
+
+
+def copy_until_end(copy_chunk, origin_fd, destination_fd, offset):
+    while True:
+        number_of_bytes_copied = copy_chunk(origin_fd, destination_fd, offset)
+        if number_of_bytes_copied == 0:
+            return offset
+        offset += number_of_bytes_copied
+
+
+def copy_chunk_with_copy_file_range(origin_fd, destination_fd, offset):
+    return os.copy_file_range(origin_fd, destination_fd, COPY_CHUNK_SIZE, offset, offset)
+
+
+def copy_chunk_with_sendfile(origin_fd, destination_fd, offset):
+    # sendfile writes at the destination's file position, which earlier methods (with explicit offsets) never moved
+    os.lseek(destination_fd, offset, os.SEEK_SET)
+    return os.sendfile(destination_fd, origin_fd, offset, COPY_CHUNK_SIZE)
+
+
+def copy_chunk_buffered(origin_fd, destination_fd, offset):
+    chunk = os.pread(origin_fd, BUFFERED_COPY_CHUNK_SIZE, offset)
+
+    number_of_bytes_written = 0
+    while number_of_bytes_written < len(chunk):
+        number_of_bytes_written += os.pwrite(destination_fd, chunk[number_of_bytes_written:], offset + number_of_bytes_written)
+
+    return len(chunk)
@@ -1,12 +1,31 @@
 import hashlib
+import mmap
+import os
 import sys
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
 """
 General non-project specific helper utilities
 """
 
+# SHA-256 is hardware-accelerated on most current CPUs (see benchmarks/bench_hashing.py for the alternatives)
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+# The algorithms that can be picked for comparing copied files (e.g. `pydotfiles install --hash-algorithm blake2b`)
+HASH_ALGORITHMS = ["sha256", "blake2b", "sha512"]
+DEFAULT_HASH_BLOCK_SIZE = 65536
+
+# Below this, setting up a memory map costs more than it saves
+MMAP_HASH_THRESHOLD = 1024 * 1024
+
+DEFAULT_HASH_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_hashing_executor = None
+_hashing_executor_lock = threading.Lock()
+
 
 class PrettyLogFormatter(logging.Formatter):
     """
@@ -128,14 +147,63 @@ def remove_prefix(text, prefix):
     return text[text.startswith(prefix) and len(prefix):]
 
 
-def hash_file(file_path, block_size=65536):
+def hash_file(file_path, block_size=DEFAULT_HASH_BLOCK_SIZE, algorithm=DEFAULT_HASH_ALGORITHM):
     """
-    Hashes a given file
+    Hashes a given file, memory-mapping it if
+    it's large enough for that to pay off
     """
-    hasher = hashlib.sha256()
+    hasher = hashlib.new(algorithm)
     with open(file_path, 'rb') as hashed_file:
-        buf = hashed_file.read(block_size)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = hashed_file.read(block_size)
+        file_size = os.fstat(hashed_file.fileno()).st_size
+
+        if file_size >= MMAP_HASH_THRESHOLD:
+            try:
+                with mmap.mmap(hashed_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                    hasher.update(mapped_file)
+                return hasher.hexdigest()
+            except (OSError, ValueError):
+                # Some file systems (e.g. certain FUSE mounts) can't be memory-mapped
+                hashed_file.seek(0)
+
+        # Reads into a single re-used buffer, rather than allocating a new one per block
+        buffer = bytearray(block_size)
+        buffer_view = memoryview(buffer)
+        number_of_bytes_read = hashed_file.readinto(buffer)
+        while number_of_bytes_read:
+            hasher.update(buffer_view[:number_of_bytes_read])
+            number_of_bytes_read = hashed_file.readinto(buffer)
+
     return hasher.hexdigest()
+
+
+def hash_files(file_paths, algorithm=DEFAULT_HASH_ALGORITHM, max_workers=None):
+    """
+    Hashes many files concurrently (hashlib and file reads both
+    release the GIL), returning a {file path: hash} dictionary
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        return {file_path: hash_file(file_path, algorithm=algorithm) for file_path in file_paths}
+
+    hashing_executor = get_hashing_executor() if max_workers is None else ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        file_hashes = hashing_executor.map(lambda file_path: hash_file(file_path, algorithm=algorithm), file_paths)
+        return dict(zip(file_paths, file_hashes))
+    finally:
+        if max_workers is not None:
+            hashing_executor.shutdown()
+
+
+def get_hashing_executor():
+    """
+    Returns the thread pool shared by every batch hash,
+    so that small batches don't pay for starting threads
+    """
+    global _hashing_executor
+
+    if _hashing_executor is None:
+        with _hashing_executor_lock:
+            if _hashing_executor is None:
+                _hashing_executor = ThreadPoolExecutor(max_workers=DEFAULT_HASH_MAX_WORKERS, thread_name_prefix="pydotfiles-hashing")
+
+    return _hashing_executor
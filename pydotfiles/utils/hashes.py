@@ -0,0 +1,238 @@
+# General imports
+import contextlib
+import logging
+import os
+import threading
+import time
+
+# Project imports
+from .general import hash_file, hash_files, DEFAULT_HASH_ALGORITHM
+from .stats import cached_stat
+
+
+"""
+A persistent database of file content hashes, keyed by each file's
+stat information, so that a file whose (inode, size, mtime, ctime)
+hasn't changed since it was last hashed (with the same algorithm)
+is never read again
+"""
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the table layout changes, so an older database is just rebuilt
+HASH_DATABASE_SCHEMA_VERSION = 2
+
+NANOSECONDS_PER_SECOND = 1000000000
+
+# Covers the coarsest timestamp granularity in common use (FAT's 2 seconds), along with some clock skew between hosts
+RACY_INTERVAL_NS = 2 * NANOSECONDS_PER_SECOND
+
+# Handing small files to worker threads costs more than just hashing them one after the other
+PARALLEL_HASH_THRESHOLD = 4 * 1024 * 1024
+
+_active_hash_database = None
+
+# Set by hash_database_session, so the chosen algorithm is used even when the database itself can't be opened
+_active_hash_algorithm = DEFAULT_HASH_ALGORITHM
+
+
+class HashDatabase:
+    """
+    Class representing the hash database (an SQLite file,
+    indexed by path), shared by every thread of a run
+    """
+
+    def __init__(self, database_file, algorithm=DEFAULT_HASH_ALGORITHM):
+        self.database_file = database_file
+        self.algorithm = algorithm
+        self.connection = None
+
+        # A single connection is shared across the file action executor's threads
+        self.lock = threading.Lock()
+
+    def open(self):
+        import sqlite3
+
+        os.makedirs(os.path.dirname(self.database_file), exist_ok=True)
+        self.connection = sqlite3.connect(self.database_file, check_same_thread=False)
+
+        try:
+            self.__create_tables__()
+        except sqlite3.DatabaseError:
+            # A corrupt database is just an empty cache
+            logger.debug(f"Hash Database: Unable to read the hash database, rebuilding it [file={self.database_file}]", exc_info=True)
+            self.connection.close()
+            os.remove(self.database_file)
+            self.connection = sqlite3.connect(self.database_file, check_same_thread=False)
+            self.__create_tables__()
+
+    def close(self):
+        if self.connection is None:
+            return
+
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    def get_hash(self, path, file_stat):
+        """
+        Returns the recorded hash of the file, or None if the file
+        changed (or might have changed) since it was recorded
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT inode, size, mtime_ns, ctime_ns, digest, recorded_ns FROM file_hashes WHERE path = ? AND algorithm = ?", (path, self.algorithm)).fetchone()
+
+        if row is None:
+            return None
+
+        inode, size, mtime_ns, ctime_ns, digest, recorded_ns = row
+        if (inode, size, mtime_ns, ctime_ns) != get_stat_key(file_stat):
+            return None
+
+        if is_racily_recorded(file_stat, recorded_ns):
+            return None
+
+        return digest
+
+    def record(self, path, digest, file_stat):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, algorithm, inode, size, mtime_ns, ctime_ns, digest, recorded_ns) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, self.algorithm) + get_stat_key(file_stat) + (digest, time.time_ns())
+            )
+
+    def __create_tables__(self):
+        schema_version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version != HASH_DATABASE_SCHEMA_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS file_hashes")
+
+        self.connection.execute("CREATE TABLE IF NOT EXISTS file_hashes (path TEXT NOT NULL, algorithm TEXT NOT NULL, inode INTEGER NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, ctime_ns INTEGER NOT NULL, digest TEXT NOT NULL, recorded_ns INTEGER NOT NULL, PRIMARY KEY (path, algorithm)) WITHOUT ROWID")
+        self.connection.execute(f"PRAGMA user_version = {HASH_DATABASE_SCHEMA_VERSION}")
+        self.connection.commit()
+
+
+@contextlib.contextmanager
+def hash_database_session(database_file, algorithm=DEFAULT_HASH_ALGORITHM):
+    """
+    Opens the hash database for the duration of the block, making it
+    the one that file hashing goes through. If it can't be opened,
+    files are just hashed every time (still with the given algorithm)
+    """
+    global _active_hash_database, _active_hash_algorithm
+
+    if _active_hash_database is not None:
+        yield _active_hash_database
+        return
+
+    previous_hash_algorithm = _active_hash_algorithm
+    _active_hash_algorithm = algorithm
+    try:
+        if database_file is None:
+            yield None
+            return
+
+        hash_database = HashDatabase(database_file, algorithm)
+        try:
+            hash_database.open()
+        except Exception as e:
+            # The database is purely an optimization (and sqlite3 is missing from some minimal Python builds)
+            logger.warning(f"Hash Database: Unable to open the hash database, hashing files every time [file={database_file}, error={e}]")
+            yield None
+            return
+
+        _active_hash_database = hash_database
+        try:
+            yield hash_database
+        finally:
+            _active_hash_database = None
+            hash_database.close()
+    finally:
+        _active_hash_algorithm = previous_hash_algorithm
+
+
+def get_hash_database():
+    return _active_hash_database
+
+
+def get_hash_algorithm():
+    return _active_hash_algorithm
+
+
+def get_file_hash(file_path):
+    """
+    Hashes a given file, re-using its recorded
+    hash if the file hasn't changed since
+    """
+    return get_file_hashes([file_path])[0]
+
+
+def get_file_hashes(file_paths):
+    """
+    Hashes the given files (concurrently, if more than one of
+    them actually has to be read), returning the hashes in the
+    same order. Without an active hash database, every file is
+    read, using the algorithm of the current session (if any)
+    """
+    hash_database = get_hash_database()
+    if hash_database is None:
+        algorithm = get_hash_algorithm()
+        file_hashes = hash_files(file_paths, algorithm) if sum_file_sizes(file_paths) >= PARALLEL_HASH_THRESHOLD else {file_path: hash_file(file_path, algorithm=algorithm) for file_path in file_paths}
+        return [file_hashes[file_path] for file_path in file_paths]
+
+    file_paths = [os.path.abspath(str(file_path)) for file_path in file_paths]
+
+    # Stats before reading, so a file that changes mid-hash is recorded with stale stats (and rehashed next time)
+    file_stats = {file_path: cached_stat(file_path) for file_path in file_paths}
+    file_hashes = {file_path: hash_database.get_hash(file_path, file_stats[file_path]) for file_path in file_paths}
+
+    unhashed_file_paths = [file_path for file_path, file_hash in file_hashes.items() if file_hash is None]
+    if sum(file_stats[file_path].st_size for file_path in unhashed_file_paths) >= PARALLEL_HASH_THRESHOLD:
+        new_file_hashes = hash_files(unhashed_file_paths, hash_database.algorithm)
+    else:
+        new_file_hashes = {file_path: hash_file(file_path, algorithm=hash_database.algorithm) for file_path in unhashed_file_paths}
+
+    for file_path, file_hash in new_file_hashes.items():
+        hash_database.record(file_path, file_hash, file_stats[file_path])
+        file_hashes[file_path] = file_hash
+
+    return [file_hashes[file_path] for file_path in file_paths]
+
+
+def record_copied_origin(origin):
+    """
+    Records the hash of a file that was just copied. Only the origin
+    is recorded, since the destination was only just written (so its
+    recording would always be racy), leaving it to the next run
+    """
+    if get_hash_database() is None:
+        return
+
+    try:
+        get_file_hash(origin)
+    except OSError:
+        # e.g. an origin that can't be read, which just means hashing it next time
+        logger.debug(f"Hash Database: Unable to record copied file [origin={origin}]", exc_info=True)
+
+
+"""
+Helper functions
+"""
+
+
+def sum_file_sizes(file_paths):
+    return sum(cached_stat(file_path).st_size for file_path in file_paths)
+
+
+def get_stat_key(file_stat):
+    return file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ctime_ns
+
+
+def is_racily_recorded(file_stat, recorded_ns):
+    """
+    A file changed within a timestamp tick of being hashed can keep
+    the same stats, so (like git's racy-clean check) a recording made
+    that soon after the file's last change isn't trusted. Rehashing
+    records it again, by which point it's usually no longer racy
+    """
+    return max(file_stat.st_mtime_ns, file_stat.st_ctime_ns) >= recorded_ns - RACY_INTERVAL_NS
@@ -5,7 +5,11 @@ import shutil
 import subprocess
 
 # Project imports
-from .general import hash_file
+from .copying import fast_copy_file
+from .hashes import get_file_hashes, record_copied_origin
+from .privileged import get_privileged_helper
+from .stats import cached_isfile, cached_islink, cached_isdir, cached_exists, cached_stat, cached_realpath
+from .stats import invalidating_paths, invalidating_all_paths
 
 
 """
@@ -20,29 +24,19 @@ def mv_file(origin, destination, use_sudo=False, sudo_password=""):
 
     # Fast return if there is no need for the operation
     if is_moved(origin, destination):
-        return
+        return False
 
     # Fail fast if a destination file already exists
-    if os.path.isfile(destination) or os.path.islink(destination):
+    if cached_isfile(destination) or cached_islink(destination):
         raise RuntimeError(f"File Moving: Destination file already exists [origin={origin}, destination={destination}]")
 
-    if use_sudo:
-        command = f"mv {origin} {destination}"
-        process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-
-        try:
-            stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
+    with invalidating_paths(origin, destination):
+        if use_sudo:
+            run_privileged_file_operation(f"mv {origin} {destination}", sudo_password, 'move', origin=origin, destination=destination)
+        else:
+            shutil.move(origin, destination)
 
-            if "File exists" in stderr:
-                raise FileExistsError(f"The file {destination} already exists")
-
-            if process.returncode != 0:
-                raise RuntimeError(stderr)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise
-    else:
-        shutil.move(origin, destination)
+    return True
 
 
 def rm_file(file, use_sudo=False, sudo_password=""):
@@ -51,23 +45,14 @@ def rm_file(file, use_sudo=False, sudo_password=""):
         raise RuntimeError(f"File Removing: Invalid file passed in [file={file}]")
 
     # Fast return if there is no need for the operation
-    if not os.path.isfile(file) and not is_broken_link(file):
+    if not cached_isfile(file) and not is_broken_link(file):
         return
 
-    if use_sudo:
-        command = f"rm {file}"
-        process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
-
-        try:
-            stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
-
-            if process.returncode != 0:
-                raise RuntimeError(stderr)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise
-    else:
-        os.unlink(file)
+    with invalidating_paths(file):
+        if use_sudo:
+            run_privileged_file_operation(f"rm {file}", sudo_password, 'remove', file=file)
+        else:
+            os.unlink(file)
 
 
 def copy_file(origin, destination, use_sudo=False, sudo_password=""):
@@ -77,29 +62,21 @@ def copy_file(origin, destination, use_sudo=False, sudo_password=""):
 
     # Fast return if there is no need for the operation
     if is_copied(origin, destination):
-        return
+        return False
 
     # Fast fail if the file already exists
-    if os.path.isfile(destination) or os.path.islink(destination):
+    if cached_isfile(destination) or cached_islink(destination):
         raise RuntimeError(f"File Copying: Destination file already exists [origin={origin}, destination={destination}]")
 
-    if use_sudo:
-        command = f"cp {origin} {destination}"
-        process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    with invalidating_paths(destination):
+        if use_sudo:
+            run_privileged_file_operation(f"cp {origin} {destination}", sudo_password, 'copy', origin=origin, destination=destination)
+        else:
+            fast_copy_file(origin, destination)
 
-        try:
-            stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
+    record_copied_origin(origin)
 
-            if "File exists" in stderr:
-                raise FileExistsError(f"The file {destination} already exists")
-
-            if process.returncode != 0:
-                raise RuntimeError(stderr)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise
-    else:
-        shutil.copy2(origin, destination)
+    return True
 
 
 def symlink_file(origin, destination, use_sudo=False, sudo_password=""):
@@ -109,53 +86,90 @@ def symlink_file(origin, destination, use_sudo=False, sudo_password=""):
 
     # Fast return if there is no need for the operation
     if is_linked(origin, destination):
-        return
+        return False
 
     # Fast fail if the file already exists
-    if os.path.isfile(destination) or os.path.islink(destination):
+    if cached_isfile(destination) or cached_islink(destination):
         raise RuntimeError(f"File Symlinking: Destination file already exists [origin={origin}, destination={destination}]")
 
-    if use_sudo:
-        command = f"ln -s {origin} {destination}"
-        process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    with invalidating_paths(destination):
+        if use_sudo:
+            run_privileged_file_operation(f"ln -s {origin} {destination}", sudo_password, 'symlink', origin=origin, destination=destination)
+        else:
+            os.symlink(origin, destination)
 
-        try:
-            stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
-
-            if "File exists" in stderr:
-                raise FileExistsError(f"The file {destination} already exists")
-
-            if process.returncode != 0:
-                raise RuntimeError(stderr)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise
-    else:
-        os.symlink(origin, destination)
+    return True
 
 
 def unsymlink_file(file, use_sudo=False, sudo_password=""):
     # Fast fail if invalid file name or type passed in
-    if file is None or not os.path.islink(file):
+    if file is None or not cached_islink(file):
         raise RuntimeError(f"File Unsymlinking: File does not exist or is a symlink [file={file}]")
 
-    if use_sudo:
-        command = f"unlink {file}"
-        process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    with invalidating_paths(file):
+        if use_sudo:
+            run_privileged_file_operation(f"unlink {file}", sudo_password, 'unlink', file=file)
+        else:
+            os.unlink(file)
 
-        try:
-            stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
 
-            if "File exists" in stderr:
-                raise FileExistsError(f"The file {file} already exists")
+def rm_directory(directory, use_sudo=False, sudo_password=""):
+    # Fast fail if invalid directory is passed in
+    if directory is None or cached_islink(directory):
+        raise RuntimeError(f"Directory Removing: Invalid directory passed in [directory={directory}]")
 
-            if process.returncode != 0:
-                raise RuntimeError(stderr)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            raise
-    else:
-        os.unlink(file)
+    # Fast return if there is no need for the operation
+    if not cached_isdir(directory):
+        return
+
+    with invalidating_paths(directory):
+        if use_sudo:
+            run_privileged_file_operation(f"rm -r {directory}", sudo_password, 'rmtree', directory=directory)
+        else:
+            shutil.rmtree(directory)
+
+
+def rm_empty_directory(directory, use_sudo=False, sudo_password=""):
+    # Fast return if there is no need for (or no way to do) the operation
+    if not cached_isdir(directory) or cached_islink(directory) or not is_empty_directory(directory):
+        return False
+
+    with invalidating_paths(directory):
+        if use_sudo:
+            run_privileged_file_operation(f"rmdir {directory}", sudo_password, 'rmdir', directory=directory)
+        else:
+            os.rmdir(directory)
+
+    return True
+
+
+def make_directories(directories, use_sudo=False, sudo_password=""):
+    # Fast return if every directory already exists
+    missing_directories = sorted({str(directory) for directory in directories if not cached_isdir(directory)})
+    if len(missing_directories) == 0:
+        return
+
+    with invalidating_paths(*get_missing_parent_directories(missing_directories)):
+        create_directories(missing_directories, use_sudo, sudo_password)
+
+
+def create_directories(missing_directories, use_sudo, sudo_password):
+    if not use_sudo:
+        for directory in missing_directories:
+            os.makedirs(directory, exist_ok=True)
+        return
+
+    # Creates every directory in a single round trip if the privileged helper is running
+    privileged_helper = get_privileged_helper()
+    if privileged_helper is not None:
+        results = privileged_helper.execute_batch([{'operation': 'mkdir', 'directory': directory} for directory in missing_directories])
+        for result in results:
+            if not result.get('ok'):
+                raise RuntimeError(f"Directory Creation: Failed to create directory [error={result.get('message')}]")
+        return
+
+    for directory in missing_directories:
+        run_privileged_file_operation(f"mkdir -p {directory}", sudo_password, 'mkdir', directory=directory)
 
 
 def run_file(file, use_sudo=False, sudo_password=""):
@@ -163,6 +177,12 @@ def run_file(file, use_sudo=False, sudo_password=""):
     if file is None or not is_executable(file):
         raise RuntimeError(f"File Execution: File does not exist or have execution permissions [file={file}]")
 
+    # A script can change anything, so nothing seen before it runs can be trusted after
+    with invalidating_all_paths():
+        run_file_process(file, use_sudo, sudo_password)
+
+
+def run_file_process(file, use_sudo, sudo_password):
     if use_sudo:
         command = f"{file}"
         process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
@@ -182,6 +202,31 @@ def run_file(file, use_sudo=False, sudo_password=""):
             raise RuntimeError(command_result.stderr.decode())
 
 
+def run_privileged_file_operation(command, sudo_password, operation, **arguments):
+    """
+    Routes a sudo file operation through the privileged helper if
+    one is running, otherwise spawns sudo for just this command
+    """
+    privileged_helper = get_privileged_helper()
+    if privileged_helper is not None:
+        privileged_helper.execute(operation, **{argument_name: str(argument) for argument_name, argument in arguments.items()})
+        return
+
+    process = subprocess.Popen(['sudo', '-S'] + command.split(), stdin=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+    try:
+        stdout, stderr = process.communicate(sudo_password + '\n', timeout=3)
+
+        if "File exists" in stderr:
+            raise FileExistsError(f"The file {arguments.get('destination', arguments.get('file'))} already exists")
+
+        if process.returncode != 0:
+            raise RuntimeError(stderr)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        raise
+
+
 def run_command(command, use_sudo=False, sudo_password="", check_output=True):
     # Fast fail if invalid command is passed in
     if command is None:
@@ -220,51 +265,69 @@ Utility functions
 
 def is_moved(origin, destination):
     # Enables fast-failing based on existence
-    if not os.path.isfile(destination):
+    if not cached_isfile(destination):
         return False
 
-    if os.path.isfile(origin):
+    if cached_isfile(origin):
         return False
 
     return True
 
 
 def is_broken_link(file):
-    return os.path.islink(file) and not os.path.exists(file)
+    return cached_islink(file) and not cached_exists(file)
 
 
 def is_linked(origin, destination):
-    return os.path.islink(destination) and os.path.realpath(destination) == os.path.realpath(origin)
+    return cached_islink(destination) and cached_realpath(destination) == cached_realpath(origin)
 
 
 def is_copied(origin, destination):
     # Enables fast-failing based on type
-    if os.path.islink(destination):
+    if cached_islink(destination):
         return False
 
     # Enables fast-failing based on existence
-    if not os.path.isfile(destination):
+    if not cached_isfile(destination):
         return False
 
     # Enables fast-failing based on file size
-    origin_file_size = os.stat(origin).st_size
-    destination_file_size = os.stat(destination).st_size
+    origin_stat = cached_stat(origin)
+    destination_stat = cached_stat(destination)
 
-    if origin_file_size != destination_file_size:
+    if origin_stat.st_size != destination_stat.st_size:
         return False
 
     # Enables fast-failing based on metadata
-    origin_last_modified_time = os.path.getmtime(origin)
-    destination_last_modified_time = os.path.getmtime(destination)
+    origin_last_modified_time = origin_stat.st_mtime
+    destination_last_modified_time = destination_stat.st_mtime
 
     if origin_last_modified_time != destination_last_modified_time:
         return False
 
-    # Loads in the files and checks that their hashes are the same
-    origin_file_hash = hash_file(origin)
-    destination_file_hash = hash_file(destination)
+    # Checks that their hashes are the same (hashing both at once, and only the files that changed since they were last hashed)
+    origin_file_hash, destination_file_hash = get_file_hashes([origin, destination])
     return origin_file_hash == destination_file_hash
 
 
 def is_executable(file):
     return os.access(file, os.X_OK)
+
+
+def is_empty_directory(directory):
+    with os.scandir(directory) as directory_entries:
+        return next(directory_entries, None) is None
+
+
+def get_missing_parent_directories(missing_directories):
+    """
+    Returns the missing directories along with each of their missing
+    parents, since creating a directory creates those as well
+    """
+    missing_parent_directories = set()
+    for directory in missing_directories:
+        while directory not in missing_parent_directories and not cached_isdir(directory) and os.path.dirname(directory) != directory:
+            missing_parent_directories.add(directory)
+            directory = os.path.dirname(directory)
+
+    return sorted(missing_parent_directories)
@@ -0,0 +1,169 @@
+# General imports
+import importlib
+import json
+import logging
+import os
+
+
+"""
+Configuration-file loading backends, picking the fastest
+available parser for each format (and falling back cleanly
+to the pure-Python/stdlib implementations)
+"""
+
+logger = logging.getLogger(__name__)
+
+# Ordered from fastest to slowest, the first importable backend wins
+JSON_BACKENDS = ["orjson", "ujson", "json"]
+YAML_BACKENDS = ["libyaml", "pyyaml"]
+
+# Enables forcing a given backend, e.g. PYDOTFILES_JSON_BACKEND=json
+JSON_BACKEND_ENVIRONMENT_VARIABLE = "PYDOTFILES_JSON_BACKEND"
+YAML_BACKEND_ENVIRONMENT_VARIABLE = "PYDOTFILES_YAML_BACKEND"
+
+_resolved_json_backend = None
+_resolved_yaml_backend = None
+
+
+"""
+Public loading functions
+"""
+
+
+def load_config_file(config_file):
+    """
+    Loads a configuration file, returning a tuple
+    of (data, name of the backend that parsed it)
+    """
+    with open(config_file, 'rb') as config_fd:
+        raw_data = config_fd.read()
+
+    return parse_config_data(raw_data, config_file)
+
+
+def parse_config_data(raw_data, config_file):
+    """
+    Parses the raw bytes of an already-read configuration file
+    (the file name is only used to detect the format), returning
+    a tuple of (data, name of the backend that parsed it)
+    """
+    config_file = str(config_file)
+
+    if config_file.endswith("json"):
+        backend_name, loads = get_json_backend()
+    elif config_file.endswith("yaml") or config_file.endswith("yml"):
+        backend_name, loads = get_yaml_backend()
+    else:
+        raise RuntimeError(f"Configuration Data Load: The file type of the settings configuration file {config_file} could not be parsed (not a supported filetype)")
+
+    return loads(raw_data), backend_name
+
+
+def get_loader_backends():
+    """
+    Reports which backend is used for each format
+    """
+    return {
+        "json": get_json_backend()[0],
+        "yaml": get_yaml_backend()[0],
+    }
+
+
+def set_loader_backends(json_backend=None, yaml_backend=None):
+    """
+    Overrides the automatically-detected backends (a None
+    value re-runs the detection for that format)
+    """
+    global _resolved_json_backend, _resolved_yaml_backend
+    _resolved_json_backend = None if json_backend is None else resolve_json_backend([json_backend])
+    _resolved_yaml_backend = None if yaml_backend is None else resolve_yaml_backend([yaml_backend])
+
+
+"""
+Backend resolution
+"""
+
+
+def get_json_backend():
+    global _resolved_json_backend
+    if _resolved_json_backend is None:
+        _resolved_json_backend = resolve_json_backend(get_backend_preference(JSON_BACKEND_ENVIRONMENT_VARIABLE, JSON_BACKENDS))
+        logger.debug(f"Loading: Resolved JSON backend [backend={_resolved_json_backend[0]}]")
+    return _resolved_json_backend
+
+
+def get_yaml_backend():
+    global _resolved_yaml_backend
+    if _resolved_yaml_backend is None:
+        _resolved_yaml_backend = resolve_yaml_backend(get_backend_preference(YAML_BACKEND_ENVIRONMENT_VARIABLE, YAML_BACKENDS))
+        logger.debug(f"Loading: Resolved YAML backend [backend={_resolved_yaml_backend[0]}]")
+    return _resolved_yaml_backend
+
+
+def resolve_json_backend(backend_names):
+    for backend_name in backend_names:
+        if backend_name not in JSON_BACKENDS:
+            raise ValueError(f"Loading: Unknown JSON backend [backend={backend_name}, supported_backends={JSON_BACKENDS}]")
+
+        try:
+            backend_module = importlib.import_module(backend_name)
+        except ImportError:
+            logger.debug(f"Loading: JSON backend is not installed, falling back [backend={backend_name}]")
+            continue
+
+        if backend_name == "ujson":
+            return backend_name, build_normalized_json_loads(backend_module.loads)
+
+        # Both orjson and the stdlib raise json.JSONDecodeError (or a subclass of it)
+        return backend_name, backend_module.loads
+
+    raise ImportError(f"Loading: None of the requested JSON backends are installed [backends={backend_names}]")
+
+
+def resolve_yaml_backend(backend_names):
+    for backend_name in backend_names:
+        if backend_name not in YAML_BACKENDS:
+            raise ValueError(f"Loading: Unknown YAML backend [backend={backend_name}, supported_backends={YAML_BACKENDS}]")
+
+        import yaml
+
+        if backend_name == "libyaml":
+            yaml_loader = getattr(yaml, "CSafeLoader", None)
+            if yaml_loader is None:
+                logger.debug(f"Loading: PyYAML was built without libyaml, falling back [backend={backend_name}]")
+                continue
+        else:
+            yaml_loader = yaml.SafeLoader
+
+        return backend_name, build_yaml_loads(yaml, yaml_loader)
+
+    raise ImportError(f"Loading: None of the requested YAML backends are available [backends={backend_names}]")
+
+
+def get_backend_preference(environment_variable, default_backends):
+    forced_backend = os.environ.get(environment_variable)
+    return default_backends if not forced_backend else [forced_backend]
+
+
+"""
+Helper functions
+"""
+
+
+def build_normalized_json_loads(backend_loads):
+    """
+    Wraps a JSON backend that raises a plain ValueError, so callers
+    only ever have to handle json.JSONDecodeError
+    """
+    def loads(raw_data):
+        try:
+            return backend_loads(raw_data)
+        except ValueError as e:
+            raise json.JSONDecodeError(str(e), raw_data.decode(errors='replace'), 0) from e
+    return loads
+
+
+def build_yaml_loads(yaml, yaml_loader):
+    def loads(raw_data):
+        return yaml.load(raw_data, Loader=yaml_loader)
+    return loads
@@ -0,0 +1,222 @@
+# General imports
+import contextlib
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import sys
+import threading
+
+
+"""
+A long-lived privileged helper process for sudo file operations.
+Authenticating once and then sending batches of operations over a
+pipe avoids spawning (and authenticating) a new sudo process per
+file. This module only relies on the standard library, since it's
+also run directly as the helper's script (where the pydotfiles
+package might not be importable, as sudo resets the environment)
+"""
+
+logger = logging.getLogger(__name__)
+
+# sudo reads the password from stdin (-S), never re-uses cached credentials (-k) and doesn't print a prompt (-p '')
+DEFAULT_COMMAND_PREFIX = ['sudo', '-S', '-k', '-p', '']
+
+# Authenticating can be slow (e.g. PAM modules, an overloaded machine), but a wrong password shouldn't hang the run
+AUTHENTICATION_TIMEOUT = 30
+
+READY_MESSAGE = "ready"
+
+_active_privileged_helper = None
+
+
+class PrivilegedHelper:
+    """
+    Class representing a running privileged helper
+    process, and the pipe to talk to it over
+    """
+
+    def __init__(self, command_prefix=None):
+        self.command_prefix = DEFAULT_COMMAND_PREFIX if command_prefix is None else command_prefix
+        self.process = None
+        self.next_request_id = 0
+
+        # Requests and responses share a single pipe, so concurrent callers have to take turns
+        self.lock = threading.Lock()
+
+    def start(self, sudo_password):
+        # Isolated mode (-I) stops the root process from picking up the user's site-packages or PYTHON* variables
+        command = self.command_prefix + [sys.executable, '-I', os.path.abspath(__file__)]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, bufsize=1)
+
+        # With -S, sudo consumes just the first line as the password and hands the rest of stdin to the helper
+        self.process.stdin.write(f"{sudo_password}\n")
+        self.process.stdin.flush()
+
+        readable, _, _ = select.select([self.process.stdout], [], [], AUTHENTICATION_TIMEOUT)
+        ready_line = self.process.stdout.readline() if len(readable) > 0 else ""
+
+        if ready_line.strip() != READY_MESSAGE:
+            self.stop()
+            raise RuntimeError(f"Privileged Helper: Failed to authenticate the privileged helper [command={command[0]}]")
+
+        logger.debug(f"Privileged Helper: Started the privileged helper [pid={self.process.pid}]")
+
+    def stop(self):
+        if self.process is None:
+            return
+
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=AUTHENTICATION_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+        logger.debug(f"Privileged Helper: Stopped the privileged helper [pid={self.process.pid}]")
+        self.process = None
+
+    @property
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def execute_batch(self, operations):
+        """
+        Sends a batch of operations (each a dictionary with an
+        `operation` name and its arguments) in a single round trip,
+        returning a per-operation result dictionary with an `ok` flag
+        (and the `error`/`message` if it failed)
+        """
+        if not self.is_running:
+            raise RuntimeError("Privileged Helper: The privileged helper is not running")
+
+        with self.lock:
+            self.next_request_id += 1
+            request = {'id': self.next_request_id, 'operations': operations}
+
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+
+            response_line = self.process.stdout.readline()
+
+        if not response_line:
+            raise RuntimeError(f"Privileged Helper: The privileged helper exited unexpectedly [stderr={self.process.stderr.read()}]")
+
+        response = json.loads(response_line)
+        if response.get('id') != request['id']:
+            raise RuntimeError(f"Privileged Helper: Received an out-of-order response [expected_id={request['id']}, id={response.get('id')}]")
+
+        return response.get('results')
+
+    def execute(self, operation, **arguments):
+        """
+        Runs a single operation, raising the same kind of
+        error the operation itself would have raised
+        """
+        result = self.execute_batch([dict(arguments, operation=operation)])[0]
+        if not result.get('ok'):
+            raise get_operation_exception(result)
+
+
+@contextlib.contextmanager
+def privileged_session(sudo_password, command_prefix=None):
+    """
+    Runs a privileged helper for the duration of the block, making it
+    the one that sudo file operations are routed through. If there is
+    no sudo password (i.e. nothing needs sudo) or the helper can't be
+    started, file operations fall back to running sudo per operation
+    """
+    global _active_privileged_helper
+
+    if sudo_password is None or _active_privileged_helper is not None:
+        yield _active_privileged_helper
+        return
+
+    privileged_helper = PrivilegedHelper(command_prefix)
+    try:
+        privileged_helper.start(sudo_password)
+    except (OSError, RuntimeError):
+        logger.warning("Privileged Helper: Unable to start the privileged helper, falling back to running sudo per operation", exc_info=True)
+        yield None
+        return
+
+    _active_privileged_helper = privileged_helper
+    try:
+        yield privileged_helper
+    finally:
+        _active_privileged_helper = None
+        privileged_helper.stop()
+
+
+def get_privileged_helper():
+    if _active_privileged_helper is not None and _active_privileged_helper.is_running:
+        return _active_privileged_helper
+    return None
+
+
+"""
+Helper functions
+"""
+
+
+def get_operation_exception(result):
+    if result.get('error') == 'FileExistsError':
+        return FileExistsError(result.get('message'))
+    return RuntimeError(result.get('message'))
+
+
+def run_operation(operation):
+    operation_name = operation.get('operation')
+
+    if operation_name == 'copy':
+        shutil.copy2(operation['origin'], operation['destination'])
+    elif operation_name == 'move':
+        shutil.move(operation['origin'], operation['destination'])
+    elif operation_name == 'symlink':
+        os.symlink(operation['origin'], operation['destination'])
+    elif operation_name in ('remove', 'unlink'):
+        os.unlink(operation['file'])
+    elif operation_name == 'mkdir':
+        os.makedirs(operation['directory'], exist_ok=True)
+    elif operation_name == 'rmdir':
+        os.rmdir(operation['directory'])
+    elif operation_name == 'rmtree':
+        shutil.rmtree(operation['directory'])
+    else:
+        raise ValueError(f"Unknown operation `{operation_name}`")
+
+
+def serve(input_stream, output_stream):
+    """
+    The helper's side of the pipe: answers each request line with
+    a response line, until the other side closes the pipe
+    """
+    output_stream.write(f"{READY_MESSAGE}\n")
+    output_stream.flush()
+
+    for request_line in input_stream:
+        try:
+            request = json.loads(request_line)
+        except ValueError:
+            request = None
+
+        # Anything that isn't a request (e.g. the password, if sudo didn't need to read it) is ignored
+        if not isinstance(request, dict) or 'operations' not in request:
+            continue
+
+        results = []
+        for operation in request['operations']:
+            try:
+                run_operation(operation)
+                results.append({'ok': True})
+            except Exception as e:
+                results.append({'ok': False, 'error': type(e).__name__, 'message': str(e)})
+
+        output_stream.write(json.dumps({'id': request.get('id'), 'results': results}) + "\n")
+        output_stream.flush()
+
+
+if __name__ == "__main__":
+    serve(sys.stdin, sys.stdout)
@@ -0,0 +1,359 @@
+# General imports
+import contextlib
+import errno
+import logging
+import os
+import stat
+import threading
+
+
+"""
+A run-scoped cache of file metadata. Each directory is read once
+(via scandir, whose entries already know each file's type), and
+every existence/type/stat/realpath check on a file within it is
+answered from memory from then on. pydotfiles invalidates it on
+each of its own writes; changes made by anything else during a
+run (other than by the scripts it runs) aren't picked up
+"""
+
+logger = logging.getLogger(__name__)
+
+# Returned in place of an entry when the path's directory can't be cached (e.g. it can't be read)
+UNCACHEABLE = object()
+
+# Stands in for the entry of a file that pydotfiles wrote to, until it's next checked
+STALE = object()
+
+# Past this many nested symlinks, resolving is left to os.path.realpath (which handles symlink loops)
+MAX_SYMLINK_DEPTH = 40
+
+_active_stat_cache = None
+
+
+class StatCache:
+    """
+    Class representing the directory listings (and resolved
+    paths) seen so far, shared by every thread of a run
+    """
+
+    def __init__(self):
+        self.directory_listings = {}
+        self.realpaths = {}
+
+        # Bumped on every change to a directory (or any path), so a listing read mid-write is never stored
+        self.directory_generations = {}
+        self.realpath_generation = 0
+        self.lock = threading.Lock()
+
+    def get_entry(self, path):
+        """
+        Returns the directory entry for the path, None if
+        it doesn't exist, or UNCACHEABLE if it can't be known
+        """
+        directory, name = os.path.split(path)
+        if name == "":
+            return UNCACHEABLE
+
+        with self.lock:
+            directory_listing = self.directory_listings.get(directory, UNCACHEABLE)
+            generation = self.directory_generations.get(directory, 0)
+
+        if directory_listing is UNCACHEABLE:
+            directory_listing = scan_directory(directory)
+
+            with self.lock:
+                if generation == self.directory_generations.get(directory, 0):
+                    self.directory_listings[directory] = directory_listing
+
+        if directory_listing is None or directory_listing is UNCACHEABLE:
+            return directory_listing
+
+        entry = directory_listing.get(name)
+        if entry is STALE:
+            # Only the file that was written to gets checked again, rather than the whole directory
+            entry = get_path_entry(path)
+
+            with self.lock:
+                if generation == self.directory_generations.get(directory, 0):
+                    directory_listing[name] = entry
+
+        return entry
+
+    def get_realpath(self, path, depth=0):
+        with self.lock:
+            realpath = self.realpaths.get(path)
+            generation = self.realpath_generation
+
+        if realpath is None:
+            realpath = self.__resolve_realpath__(path, depth)
+
+            with self.lock:
+                if generation == self.realpath_generation:
+                    self.realpaths[path] = realpath
+
+        return realpath
+
+    def __resolve_realpath__(self, path, depth):
+        """
+        Resolves a path from its (cached) parent's resolved path, so only
+        symlinks cost a system call, rather than every path component
+        """
+        directory, name = os.path.split(path)
+        if name == "" or depth > MAX_SYMLINK_DEPTH:
+            return os.path.realpath(path)
+
+        entry = self.get_entry(path)
+        if entry is UNCACHEABLE:
+            return os.path.realpath(path)
+
+        resolved_directory = self.get_realpath(directory, depth)
+        if entry is None or not entry.is_symlink():
+            return os.path.join(resolved_directory, name)
+
+        link_target = os.readlink(path)
+        if os.pardir in link_target.split(os.sep):
+            # `..` after a symlinked component can't just be normalized away
+            return os.path.realpath(path)
+
+        return self.get_realpath(os.path.normpath(os.path.join(resolved_directory, link_target)), depth + 1)
+
+    def invalidate(self, paths):
+        with self.lock:
+            self.realpath_generation += 1
+
+            for path in paths:
+                directory, name = os.path.split(path)
+                self.directory_generations[directory] = self.directory_generations.get(directory, 0) + 1
+
+                directory_listing = self.directory_listings.get(directory)
+                if isinstance(directory_listing, dict):
+                    directory_listing[name] = STALE
+                else:
+                    # The directory was missing (or unreadable), and might not be anymore
+                    self.directory_listings.pop(directory, None)
+
+                # The path might have been (or now be) a directory, with different contents
+                for changed_directory in [listed_directory for listed_directory in self.directory_listings if is_within(listed_directory, path)]:
+                    self.directory_generations[changed_directory] = self.directory_generations.get(changed_directory, 0) + 1
+                    del self.directory_listings[changed_directory]
+
+                # Any path resolved through (or to) the changed path might now resolve elsewhere
+                for resolved_path in [resolved_path for resolved_path, realpath in self.realpaths.items() if is_within(resolved_path, path) or is_within(realpath, path)]:
+                    del self.realpaths[resolved_path]
+
+    def clear(self):
+        with self.lock:
+            self.realpath_generation += 1
+            for directory in self.directory_listings:
+                self.directory_generations[directory] = self.directory_generations.get(directory, 0) + 1
+
+            self.directory_listings.clear()
+            self.realpaths.clear()
+
+
+class PathEntry:
+    """
+    Class standing in for the directory entry of a single file
+    that was checked again on its own, with the same interface
+    """
+
+    def __init__(self, path, lstat_result):
+        self.path = path
+        self.lstat_result = lstat_result
+        self.stat_result = None
+
+    def is_symlink(self):
+        return stat.S_ISLNK(self.lstat_result.st_mode)
+
+    def is_file(self, follow_symlinks=True):
+        return self.__is_mode__(stat.S_ISREG, follow_symlinks)
+
+    def is_dir(self, follow_symlinks=True):
+        return self.__is_mode__(stat.S_ISDIR, follow_symlinks)
+
+    def stat(self, follow_symlinks=True):
+        if not follow_symlinks or not self.is_symlink():
+            return self.lstat_result
+
+        if self.stat_result is None:
+            self.stat_result = os.stat(self.path)
+        return self.stat_result
+
+    def __is_mode__(self, is_mode, follow_symlinks):
+        # Like a directory entry, a broken symlink is neither a file nor a directory
+        try:
+            return is_mode(self.stat(follow_symlinks).st_mode)
+        except OSError:
+            return False
+
+
+@contextlib.contextmanager
+def stat_cache_session():
+    """
+    Caches file metadata for the duration of the block,
+    making it the cache that every file check goes through
+    """
+    global _active_stat_cache
+
+    if _active_stat_cache is not None:
+        yield _active_stat_cache
+        return
+
+    _active_stat_cache = StatCache()
+    try:
+        yield _active_stat_cache
+    finally:
+        _active_stat_cache = None
+
+
+def get_stat_cache():
+    return _active_stat_cache
+
+
+def invalidate_paths(*paths):
+    stat_cache = get_stat_cache()
+    if stat_cache is not None:
+        stat_cache.invalidate([normalize_path(path) for path in paths if path is not None])
+
+
+def invalidate_all_paths():
+    stat_cache = get_stat_cache()
+    if stat_cache is not None:
+        stat_cache.clear()
+
+
+@contextlib.contextmanager
+def invalidating_paths(*paths):
+    """
+    Invalidates the given paths once the block is done
+    writing to them, even if it fails part way through
+    """
+    try:
+        yield
+    finally:
+        invalidate_paths(*paths)
+
+
+@contextlib.contextmanager
+def invalidating_all_paths():
+    try:
+        yield
+    finally:
+        invalidate_all_paths()
+
+
+"""
+Cached equivalents of os.path/os functions
+"""
+
+
+def cached_lexists(path):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.path.lexists(path)
+
+    return entry is not None
+
+
+def cached_exists(path):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.path.exists(path)
+
+    if entry is None:
+        return False
+
+    if not entry.is_symlink():
+        return True
+
+    try:
+        entry.stat()
+        return True
+    except OSError:
+        return False
+
+
+def cached_isfile(path):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.path.isfile(path)
+
+    return entry is not None and entry.is_file()
+
+
+def cached_isdir(path):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.path.isdir(path)
+
+    return entry is not None and entry.is_dir()
+
+
+def cached_islink(path):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.path.islink(path)
+
+    return entry is not None and entry.is_symlink()
+
+
+def cached_stat(path, follow_symlinks=True):
+    entry = get_cache_entry(path)
+    if entry is UNCACHEABLE:
+        return os.stat(path, follow_symlinks=follow_symlinks)
+
+    if entry is None:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+
+    return entry.stat(follow_symlinks=follow_symlinks)
+
+
+def cached_realpath(path):
+    stat_cache = get_stat_cache()
+    if stat_cache is None:
+        return os.path.realpath(path)
+
+    return stat_cache.get_realpath(normalize_path(path))
+
+
+"""
+Helper functions
+"""
+
+
+def get_cache_entry(path):
+    stat_cache = get_stat_cache()
+    if stat_cache is None:
+        return UNCACHEABLE
+
+    return stat_cache.get_entry(normalize_path(path))
+
+
+def scan_directory(directory):
+    """
+    Lists a directory's entries by name, returning None if
+    the directory doesn't exist (so none of its files do)
+    """
+    try:
+        with os.scandir(directory) as directory_entries:
+            return {directory_entry.name: directory_entry for directory_entry in directory_entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError:
+        logger.debug(f"Stat Cache: Unable to list directory, checking its files directly [directory={directory}]", exc_info=True)
+        return UNCACHEABLE
+
+
+def get_path_entry(path):
+    try:
+        return PathEntry(path, os.lstat(path))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def normalize_path(path):
+    return os.path.abspath(os.fspath(path))
+
+
+def is_within(path, parent_path):
+    return path == parent_path or path.startswith(parent_path + os.sep)
@@ -73,6 +73,10 @@ setup(
         'release': [
             'wheel',
             'twine'
+        ],
+        'speedups': [
+            # Faster JSON parsing (YAML speedups come from building PyYAML against libyaml)
+            'orjson',
         ]
     }
 
@@ -0,0 +1,32 @@
+import inspect
+
+import pytest
+
+
+"""
+Shared fixtures
+"""
+
+
+@pytest.fixture
+def spy(monkeypatch):
+    """
+    Returns a function that swaps `target.name` for a wrapper that
+    records each call before passing it through to the original.
+    By default the positional arguments are recorded, otherwise
+    whatever `record` returns when given the same arguments
+    """
+
+    def spy_on(target, name, record=None):
+        calls = []
+        original = getattr(target, name)
+
+        def recording_wrapper(*args, **kwargs):
+            calls.append(args if record is None else record(*args, **kwargs))
+            return original(*args, **kwargs)
+
+        is_static = inspect.isclass(target) and isinstance(inspect.getattr_static(target, name), staticmethod)
+        monkeypatch.setattr(target, name, staticmethod(recording_wrapper) if is_static else recording_wrapper)
+        return calls
+
+    return spy_on
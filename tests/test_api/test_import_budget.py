@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import pytest
+
+
+"""
+Import budget tests
+
+Every CLI invocation goes through the ArgumentDispatcher, so each
+sub-command should only import the vendor libraries it actually uses
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISPATCH_SNIPPET = "import sys; from pydotfiles.api import ArgumentDispatcher; ArgumentDispatcher(['pydotfiles'] + sys.argv[1:]).dispatch()"
+
+# The total self-time (in microseconds) that pydotfiles' own modules are
+# allowed to spend being imported, regardless of the sub-command
+PYDOTFILES_SELF_IMPORT_BUDGET_US = 250000
+
+
+def run_with_import_time(tmpdir, command_arguments):
+    """
+    Runs the CLI under `python -X importtime`, and returns a mapping
+    of every imported module to its self import time (in microseconds)
+    """
+    environment = dict(os.environ)
+    environment['HOME'] = tmpdir.strpath
+    environment['PYTHONPATH'] = REPO_ROOT
+
+    command_result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', DISPATCH_SNIPPET] + command_arguments,
+        cwd=tmpdir.strpath,
+        env=environment,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+    # A command that crashed early would otherwise look well within the budget
+    assert command_result.returncode == 0, command_result.stderr
+
+    import_times = {}
+    for line in command_result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, _, module_name = line[len("import time:"):].split("|")
+        import_times[module_name.strip()] = int(self_time)
+
+    return import_times
+
+
+def is_imported(import_times, package):
+    return any(module_name == package or module_name.startswith(f"{package}.") for module_name in import_times)
+
+
+@pytest.mark.parametrize("command_arguments, forbidden_packages", [
+    (["--version"], ["pydotfiles.models", "git", "progressbar", "jsonschema", "yaml"]),
+    (["set", "-l", "some-local-directory", "-r", "some-remote-repo"], ["git", "progressbar", "jsonschema"]),
+    (["clean", "cache"], ["git", "progressbar", "jsonschema"]),
+    (["validate", "-d", "."], ["git", "progressbar"]),
+])
+def test_sub_command_import_budget(tmpdir, command_arguments, forbidden_packages):
+    # System under test
+    import_times = run_with_import_time(tmpdir, command_arguments)
+
+    # Verification
+    assert is_imported(import_times, "pydotfiles.api")
+
+    for forbidden_package in forbidden_packages:
+        assert not is_imported(import_times, forbidden_package), f"`{' '.join(command_arguments)}` should not import `{forbidden_package}`"
+
+    pydotfiles_self_import_time = sum(self_time for module_name, self_time in import_times.items() if module_name.split(".")[0] == "pydotfiles")
+    assert pydotfiles_self_import_time < PYDOTFILES_SELF_IMPORT_BUDGET_US
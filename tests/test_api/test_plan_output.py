@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+
+
+"""
+Helper functions
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISPATCH_SNIPPET = "import sys; from pydotfiles.api import ArgumentDispatcher; ArgumentDispatcher(['pydotfiles'] + sys.argv[1:]).dispatch()"
+
+
+def run_command(tmpdir, command_arguments):
+    environment = dict(os.environ)
+    environment['HOME'] = tmpdir.strpath
+    environment['PYTHONPATH'] = REPO_ROOT
+
+    return subprocess.run(
+        [sys.executable, '-c', DISPATCH_SNIPPET] + command_arguments,
+        cwd=tmpdir.strpath,
+        env=environment,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+
+"""
+Plan output tests
+"""
+
+
+def test_json_plan_output_is_only_json(tmpdir):
+    # Setup
+    config_repo = tmpdir.mkdir("repo")
+    config_repo.mkdir(".git")
+    other_os = "linux" if sys.platform == "darwin" else "macos"
+    config_repo.mkdir("shell").join("settings.json").write(json.dumps({"version": "alpha", "schema": "core", "os": {"name": other_os}}))
+    run_command(tmpdir, ["set", "-l", config_repo.strpath, "-r", "some-remote-repo"])
+
+    # System under test
+    command_result = run_command(tmpdir, ["plan", "-f", "json"])
+
+    # Verification
+    assert json.loads(command_result.stdout) == []
@@ -0,0 +1,77 @@
+import os
+
+from pydotfiles.models.discovery import discover_modules
+
+
+"""
+Helper functions
+"""
+
+
+def create_module(config_repo, module_name, file_names):
+    module_directory = config_repo.mkdir(module_name)
+    for file_name in file_names:
+        module_directory.join(file_name).write("")
+    return module_directory
+
+
+"""
+Module discovery tests
+"""
+
+
+def test_discover_modules_classifies_files(tmpdir):
+    # Setup
+    config_repo = tmpdir.mkdir("repo")
+    config_repo.mkdir(".git")
+    config_repo.join("README.md").write("")
+    module_directory = create_module(config_repo, "shell", ["start", "undo-start", "post", "undo-post", "settings.yaml", "zshrc.symlink", "aliases"])
+    module_directory.mkdir("functions")
+
+    # System under test
+    module_index = discover_modules(config_repo.strpath)
+
+    # Verification
+    assert list(module_index) == ["shell"]
+
+    module_files = module_index["shell"]
+    assert module_files.directory == module_directory.strpath
+    assert module_files.start_file == module_directory.join("start").strpath
+    assert module_files.undo_start_file == module_directory.join("undo-start").strpath
+    assert module_files.post_file == module_directory.join("post").strpath
+    assert module_files.undo_post_file == module_directory.join("undo-post").strpath
+    assert module_files.settings_file == module_directory.join("settings.yaml").strpath
+    assert module_files.symlinks == [module_directory.join("zshrc.symlink").strpath]
+    assert module_files.other_files == [module_directory.join("aliases").strpath]
+    assert module_files.directories == [module_directory.join("functions").strpath]
+
+
+def test_discover_active_modules_only(tmpdir):
+    # Setup
+    config_repo = tmpdir.mkdir("repo")
+    create_module(config_repo, "shell", ["settings.json"])
+    create_module(config_repo, "git", ["settings.json"])
+
+    # System under test
+    module_index = discover_modules(config_repo.strpath, ["git"])
+
+    # Verification
+    assert list(module_index) == ["git"]
+
+
+def test_discover_modules_without_extra_stat_calls(tmpdir, monkeypatch):
+    # Setup
+    config_repo = tmpdir.mkdir("repo")
+    create_module(config_repo, "shell", ["settings.json", "zshrc.symlink", "aliases"])
+
+    def fail_on_stat(*args, **kwargs):
+        raise AssertionError("Discovery should rely on the os.scandir type information")
+
+    monkeypatch.setattr(os.path, "isdir", fail_on_stat)
+    monkeypatch.setattr(os.path, "isfile", fail_on_stat)
+
+    # System under test
+    module_index = discover_modules(config_repo.strpath)
+
+    # Verification
+    assert module_index["shell"].settings_file is not None
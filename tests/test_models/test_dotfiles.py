@@ -0,0 +1,63 @@
+import os
+
+import pydotfiles.models
+from pydotfiles.models import Dotfiles
+from pydotfiles.models.primitives import CacheDirectory
+
+
+"""
+Helper functions
+"""
+
+
+def create_config_repo(tmpdir, settings_content):
+    config_repo = tmpdir.mkdir("repo")
+    config_repo.mkdir(".git")
+    config_repo.mkdir("shell").join("settings.json").write(settings_content)
+    return config_repo
+
+
+"""
+Lazy module loading tests
+"""
+
+
+def test_modules_not_loaded_on_construction(tmpdir, spy):
+    # Setup
+    config_repo = create_config_repo(tmpdir, "{\"version\": \"alpha\", \"schema\": \"core\"}")
+    load_calls = spy(pydotfiles.models, "load_active_modules")
+
+    # System under test
+    dotfiles = Dotfiles(config_repo.strpath, "some-remote-repo", True, False)
+
+    # Verification
+    assert load_calls == []
+    dotfiles.cache_directory = CacheDirectory(package_manager=dotfiles.cache_directory.package_manager, cache_directory=tmpdir.join("cache").strpath)
+    assert list(dotfiles.modules) == ["shell"]
+    assert dotfiles.is_sudo_used is False
+    assert len(load_calls) == 1
+
+
+def test_clean_repo_with_malformed_module(tmpdir):
+    # Setup
+    config_repo = create_config_repo(tmpdir, "{ this is not json")
+    dotfiles = Dotfiles(config_repo.strpath, "some-remote-repo", True, False)
+
+    # System under test
+    dotfiles.clean("repo")
+
+    # Verification
+    assert not os.path.isdir(config_repo.strpath)
+
+
+def test_cache_directory_loads_package_cache_on_access(tmpdir):
+    # Setup
+    cache_directory = CacheDirectory(package_manager=pydotfiles.models.PackageManager.BREW, cache_directory=tmpdir.strpath)
+    tmpdir.join("brew-package-cache").write("git\nzsh\n")
+
+    # System under test
+    is_installed = cache_directory.is_package_installed("zsh")
+
+    # Verification
+    assert is_installed
+    assert cache_directory.installed_applications is None
@@ -0,0 +1,205 @@
+import os
+import threading
+
+import pytest
+
+import pydotfiles.models.executor
+from pydotfiles.models.enums import FileActionType, OverrideAction
+from pydotfiles.models.executor import FileActionExecutor, get_action_batches, group_by_destination_directory
+from pydotfiles.models.primitives import FileAction
+
+
+"""
+Helper functions
+"""
+
+
+class RecordingAction:
+    """
+    Stand-in for a FileAction that records
+    the order that it was run in
+    """
+
+    def __init__(self, destination, history, action=FileActionType.COPY, conflict=False):
+        self.action = action
+        self.destination = destination
+        self.run_as_sudo = False
+        self.sudo_password = None
+        self.history = history
+        self.conflict = conflict
+
+    def __str__(self):
+        return f"{self.action.name} -> {self.destination}"
+
+    def do(self):
+        if self.conflict:
+            raise FileExistsError(self.destination)
+        self.history.append(("do", self.destination, threading.current_thread().name))
+
+    def undo(self):
+        self.history.append(("undo", self.destination, threading.current_thread().name))
+
+    def overwrite(self):
+        self.history.append(("overwrite", self.destination, threading.current_thread().name))
+
+
+def create_origin_files(tmpdir, number_of_files):
+    origin_directory = tmpdir.mkdir("origin")
+    for file_number in range(number_of_files):
+        origin_directory.join(f"file-{file_number}").write(f"content {file_number}")
+    return origin_directory
+
+
+"""
+Grouping tests
+"""
+
+
+def test_scripts_split_actions_into_serial_barriers(tmpdir):
+    # Setup
+    history = []
+    first_copy = RecordingAction(tmpdir.join("a").strpath, history)
+    script = RecordingAction(tmpdir.join("script").strpath, history, action=FileActionType.SCRIPT)
+    second_copy = RecordingAction(tmpdir.join("b").strpath, history)
+
+    # System under test
+    action_batches = get_action_batches([first_copy, script, second_copy])
+
+    # Verification
+    assert action_batches == [([first_copy], False), ([script], True), ([second_copy], False)]
+
+
+def test_actions_grouped_by_destination_directory(tmpdir):
+    # Setup
+    history = []
+    first_action = RecordingAction(tmpdir.join("first", "a").strpath, history)
+    second_action = RecordingAction(tmpdir.join("second", "b").strpath, history)
+    third_action = RecordingAction(tmpdir.join("first", "c").strpath, history)
+
+    # System under test
+    action_groups = group_by_destination_directory([first_action, second_action, third_action])
+
+    # Verification
+    assert action_groups == [[first_action, third_action], [second_action]]
+
+
+def test_actions_inside_another_destination_grouped_together(tmpdir):
+    # Setup
+    history = []
+    sync_action = RecordingAction(tmpdir.join("home", ".config", "nvim").strpath, history, action=FileActionType.SYNC)
+    other_action = RecordingAction(tmpdir.join("home", ".bashrc").strpath, history)
+    inner_action = RecordingAction(tmpdir.join("home", ".config", "nvim", "init.vim").strpath, history, action=FileActionType.SYMLINK)
+    nested_action = RecordingAction(tmpdir.join("home", ".config", "nvim", "lua", "plugins.lua").strpath, history)
+
+    # System under test
+    action_groups = group_by_destination_directory([nested_action, sync_action, other_action, inner_action])
+
+    # Verification
+    assert action_groups == [[nested_action, sync_action, inner_action], [other_action]]
+
+
+"""
+Execution tests
+"""
+
+
+def test_parallel_copies_match_serial_copies(tmpdir):
+    # Setup
+    origin_directory = create_origin_files(tmpdir, 20)
+    actions = [FileAction(FileActionType.COPY, origin_directory.join(f"file-{file_number}").strpath, tmpdir.join("home", f"directory-{file_number % 4}", f"file-{file_number}").strpath, False) for file_number in range(20)]
+
+    # System under test
+    FileActionExecutor(max_workers=4).do_actions(actions)
+
+    # Verification
+    for file_number in range(20):
+        destination = tmpdir.join("home", f"directory-{file_number % 4}", f"file-{file_number}")
+        assert destination.read() == f"content {file_number}"
+
+
+def test_missing_destination_directories_created_up_front(tmpdir, monkeypatch):
+    # Setup
+    created_directories = []
+    monkeypatch.setattr(pydotfiles.models.executor, "make_directories_journaled", lambda directories, use_sudo, sudo_password: created_directories.extend(sorted(directories)))
+    history = []
+    actions = [RecordingAction(tmpdir.join("home", "config", f"file-{file_number}").strpath, history) for file_number in range(3)]
+
+    # System under test
+    FileActionExecutor(max_workers=2).do_actions(actions)
+
+    # Verification
+    assert created_directories == [tmpdir.join("home", "config").strpath]
+
+
+def test_scripts_run_between_parallel_batches(tmpdir):
+    # Setup
+    history = []
+    first_copy = RecordingAction(tmpdir.join("a", "file").strpath, history)
+    script = RecordingAction(tmpdir.join("script").strpath, history, action=FileActionType.SCRIPT)
+    second_copy = RecordingAction(tmpdir.join("b", "file").strpath, history)
+
+    # System under test
+    FileActionExecutor(max_workers=2).do_actions([first_copy, script, second_copy])
+
+    # Verification
+    assert [entry[:2] for entry in history] == [("do", first_copy.destination), ("do", script.destination), ("do", second_copy.destination)]
+
+
+def test_same_directory_actions_stay_ordered(tmpdir):
+    # Setup
+    history = []
+    actions = [RecordingAction(tmpdir.join(f"directory-{file_number % 2}", "file").strpath, history) for file_number in range(10)]
+
+    # System under test
+    FileActionExecutor(max_workers=4).do_actions(actions)
+
+    # Verification
+    for directory_number in range(2):
+        destination = tmpdir.join(f"directory-{directory_number}", "file").strpath
+        assert [entry for entry in history if entry[1] == destination] == [("do", destination, entry[2]) for entry in history if entry[1] == destination]
+        assert len({entry[2] for entry in history if entry[1] == destination}) == 1
+
+
+def test_conflicts_resolved_after_other_actions(tmpdir, monkeypatch):
+    # Setup
+    history = []
+    prompts = []
+
+    def override_all(action):
+        prompts.append(action.destination)
+        return OverrideAction.OVERWRITE_ALL_FILES
+
+    monkeypatch.setattr(pydotfiles.models.executor, "get_user_override", override_all)
+    first_conflict = RecordingAction(tmpdir.join("a", "conflict").strpath, history, conflict=True)
+    second_conflict = RecordingAction(tmpdir.join("b", "conflict").strpath, history, conflict=True)
+    normal_action = RecordingAction(tmpdir.join("c", "file").strpath, history)
+
+    # System under test
+    FileActionExecutor(max_workers=3).do_actions([first_conflict, second_conflict, normal_action])
+
+    # Verification
+    assert prompts == [first_conflict.destination]
+    assert [entry[:2] for entry in history] == [("do", normal_action.destination), ("overwrite", first_conflict.destination), ("overwrite", second_conflict.destination)]
+
+
+def test_first_failure_raised(tmpdir):
+    # Setup
+    actions = [FileAction(FileActionType.COPY, tmpdir.join("missing-origin").strpath, tmpdir.join("home", f"directory-{file_number}", "file").strpath, False) for file_number in range(3)]
+
+    # System under test / Verification
+    with pytest.raises(OSError):
+        FileActionExecutor(max_workers=3).do_actions(actions)
+
+
+def test_undo_actions_in_parallel(tmpdir):
+    # Setup
+    origin_directory = create_origin_files(tmpdir, 6)
+    actions = [FileAction(FileActionType.SYMLINK, origin_directory.join(f"file-{file_number}").strpath, tmpdir.join("home", f"directory-{file_number % 3}", f"file-{file_number}").strpath, False) for file_number in range(6)]
+    executor = FileActionExecutor(max_workers=3)
+    executor.do_actions(actions)
+
+    # System under test
+    executor.undo_actions(actions)
+
+    # Verification
+    assert all(not os.path.lexists(action.destination) for action in actions)
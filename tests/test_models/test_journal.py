@@ -0,0 +1,218 @@
+import json
+import os
+
+import pytest
+
+import pydotfiles.models.journal
+from pydotfiles.models.enums import FileActionType
+from pydotfiles.models.executor import FileActionExecutor
+from pydotfiles.models.journal import journal_session, get_active_journal, load_journal_runs, get_run_to_roll_back, roll_back_run
+from pydotfiles.models.primitives import FileAction
+
+
+"""
+Helper functions
+"""
+
+
+def get_journal_paths(tmpdir):
+    return tmpdir.join("cache", "install-journal").strpath, tmpdir.join("cache", "journal-stash").strpath
+
+
+def read_journal_records(journal_file):
+    with open(journal_file, 'r') as journal_stream:
+        return [json.loads(journal_line) for journal_line in journal_stream]
+
+
+"""
+Journaling tests
+"""
+
+
+def test_install_journals_performed_operations(tmpdir):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    symlink_destination = tmpdir.join("symlink-destination")
+    copy_destination = tmpdir.join("copy-destination")
+
+    # Already installed, so there's nothing to journal
+    os.symlink(origin.strpath, symlink_destination.strpath)
+
+    # System under test
+    with journal_session(journal_file, stash_directory):
+        FileAction(FileActionType.SYMLINK, origin.strpath, symlink_destination.strpath, False).do()
+        FileAction(FileActionType.COPY, origin.strpath, copy_destination.strpath, False).do()
+
+    # Verification
+    runs = load_journal_runs(journal_file)
+    assert len(runs) == 1
+    assert runs[0].status == "completed"
+    assert [(operation['operation'], operation['destination']) for operation in runs[0].performed_operations] == [("copy", copy_destination.strpath)]
+    assert get_active_journal() is None
+
+
+def test_failed_operation_aborted_in_journal(tmpdir):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    destination = tmpdir.join("destination")
+    destination.write("some other content")
+
+    # System under test
+    with pytest.raises(RuntimeError):
+        with journal_session(journal_file, stash_directory):
+            FileAction(FileActionType.COPY, origin.strpath, destination.strpath, False).do()
+
+    # Verification
+    run = load_journal_runs(journal_file)[0]
+    assert run.status == "failed"
+    assert len(run.operations) == 1
+    assert run.performed_operations == []
+
+
+def test_journal_fsyncs_in_batches(tmpdir, monkeypatch):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    fsynced_descriptors = []
+    monkeypatch.setattr(pydotfiles.models.journal, "JOURNAL_SYNC_BATCH_SIZE", 10)
+    monkeypatch.setattr(pydotfiles.models.journal, "JOURNAL_SYNC_INTERVAL", float("inf"))
+    monkeypatch.setattr(pydotfiles.models.journal.os, "fsync", fsynced_descriptors.append)
+
+    # System under test
+    with journal_session(journal_file, stash_directory) as journal:
+        for file_number in range(25):
+            journal.begin_operation("copy", origin="origin", destination=f"destination-{file_number}")
+
+    # Verification: once on opening, twice for the 25 operations, then once on closing
+    assert len(fsynced_descriptors) == 4
+    assert len(read_journal_records(journal_file)) == 27
+
+
+def test_journal_skips_partially_written_records(tmpdir):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    with journal_session(journal_file, stash_directory) as journal:
+        journal.begin_operation("symlink", origin="origin", destination="destination")
+
+    with open(journal_file, 'a') as journal_stream:
+        journal_stream.write('{"type": "operation", "run": ')
+
+    # System under test
+    runs = load_journal_runs(journal_file)
+
+    # Verification
+    assert len(runs) == 1
+    assert len(runs[0].performed_operations) == 1
+
+
+def test_old_runs_pruned(tmpdir, monkeypatch):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    monkeypatch.setattr(pydotfiles.models.journal, "JOURNAL_RETAINED_RUNS", 2)
+    run_ids = iter(["first-run", "second-run", "third-run"])
+    monkeypatch.setattr(pydotfiles.models.journal, "get_run_id", lambda: next(run_ids))
+
+    # System under test
+    for _ in range(3):
+        with journal_session(journal_file, stash_directory) as journal:
+            journal.get_stash_path("some-file")
+
+    # Verification
+    assert [run.run_id for run in load_journal_runs(journal_file)] == ["second-run", "third-run"]
+    assert sorted(os.listdir(stash_directory)) == ["second-run", "third-run"]
+
+
+"""
+Rollback tests
+"""
+
+
+def test_rollback_restores_overwritten_and_backed_up_files(tmpdir):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    origin = tmpdir.join("origin")
+    origin.write("new content")
+    overwritten = tmpdir.join("overwritten")
+    overwritten.write("overwritten content")
+    backed_up = tmpdir.join("backed-up")
+    backed_up.write("backed up content")
+    created = tmpdir.join("created")
+
+    with journal_session(journal_file, stash_directory):
+        FileAction(FileActionType.COPY, origin.strpath, overwritten.strpath, False).overwrite()
+        FileAction(FileActionType.SYMLINK, origin.strpath, backed_up.strpath, False).backup()
+        FileAction(FileActionType.SYMLINK, origin.strpath, created.strpath, False).do()
+
+    assert overwritten.read() == "new content"
+    assert os.path.islink(backed_up.strpath)
+
+    # System under test
+    run = get_run_to_roll_back(journal_file)
+    number_of_undone_operations = roll_back_run(journal_file, run)
+
+    # Verification
+    assert number_of_undone_operations == 5
+    assert overwritten.read() == "overwritten content"
+    assert not os.path.islink(backed_up.strpath)
+    assert backed_up.read() == "backed up content"
+    assert not os.path.lexists(f"{backed_up.strpath}.backup")
+    assert not os.path.lexists(created.strpath)
+    assert get_run_to_roll_back(journal_file) is None
+
+
+def test_interrupted_rollback_resumes(tmpdir, monkeypatch):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    destinations = [tmpdir.join(f"destination-{file_number}") for file_number in range(3)]
+
+    with journal_session(journal_file, stash_directory):
+        for destination in destinations:
+            FileAction(FileActionType.SYMLINK, origin.strpath, destination.strpath, False).do()
+
+    undo_operation = pydotfiles.models.journal.undo_operation
+    undone_destinations = []
+
+    def undo_once_then_fail(operation, sudo_password=None):
+        if len(undone_destinations) > 0:
+            raise OSError("interrupted")
+        undone_destinations.append(operation['destination'])
+        undo_operation(operation, sudo_password)
+
+    monkeypatch.setattr(pydotfiles.models.journal, "undo_operation", undo_once_then_fail)
+    with pytest.raises(OSError):
+        roll_back_run(journal_file, get_run_to_roll_back(journal_file))
+    monkeypatch.setattr(pydotfiles.models.journal, "undo_operation", undo_operation)
+
+    # System under test
+    run = get_run_to_roll_back(journal_file)
+    number_of_undone_operations = roll_back_run(journal_file, run)
+
+    # Verification
+    assert undone_destinations == [destinations[2].strpath]
+    assert number_of_undone_operations == 2
+    assert not any(os.path.lexists(destination.strpath) for destination in destinations)
+
+
+def test_rollback_removes_created_destination_directories(tmpdir):
+    # Setup
+    journal_file, stash_directory = get_journal_paths(tmpdir)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    home = tmpdir.mkdir("home")
+    actions = [FileAction(FileActionType.COPY, origin.strpath, home.join("config", f"directory-{directory_number}", "file").strpath, False) for directory_number in range(2)]
+
+    with journal_session(journal_file, stash_directory):
+        FileActionExecutor(max_workers=2).do_actions(actions)
+
+    # System under test
+    run = get_run_to_roll_back(journal_file)
+    roll_back_run(journal_file, run)
+
+    # Verification
+    assert [operation['destination'] for operation in run.performed_operations if operation['operation'] == "directory"] == [home.join("config").strpath, home.join("config", "directory-0").strpath, home.join("config", "directory-1").strpath]
+    assert home.listdir() == []
@@ -0,0 +1,86 @@
+import os
+import pytest
+
+import pydotfiles.models
+from pydotfiles.common import OS
+from pydotfiles.models import load_active_modules
+from pydotfiles.models.primitives import CacheDirectory
+
+
+"""
+Helper functions
+"""
+
+
+@pytest.fixture
+def config_repo(tmpdir):
+    module_directory = tmpdir.mkdir("repo").mkdir("shell")
+    module_directory.join("zshrc.symlink").write("")
+    module_directory.join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"actions\": [{\"action\": \"symlink\", \"sudo\": true, \"files\": {\"zshrc\": \"~/.zshrc\"}}]}")
+    return tmpdir.join("repo")
+
+
+@pytest.fixture
+def cache_directory(tmpdir):
+    return CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+
+
+def fail_on_parse(*args, **kwargs):
+    raise AssertionError("The settings file should not have been re-parsed")
+
+
+"""
+Manifest cache tests
+"""
+
+
+def test_manifest_cache_reused_when_unchanged(config_repo, cache_directory, monkeypatch):
+    # Setup
+    modules, is_sudo_used = load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+    monkeypatch.setattr(pydotfiles.models, "load_data_from_file", fail_on_parse)
+
+    # System under test
+    cached_modules, cached_is_sudo_used = load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+
+    # Verification
+    assert os.path.isfile(cache_directory.manifest_cache_file)
+    assert list(cached_modules) == list(modules) == ["shell"]
+    assert cached_is_sudo_used is is_sudo_used is True
+    assert [str(action) for action in cached_modules["shell"].actions] == [str(action) for action in modules["shell"].actions]
+    assert cached_modules["shell"].cache_directory is cache_directory
+
+
+def test_manifest_cache_invalidated_on_settings_change(config_repo, cache_directory):
+    # Setup
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+    settings_file = config_repo.join("shell").join("settings.json")
+    settings_file.write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    os.utime(settings_file.strpath, ns=(0, 0))
+
+    # System under test
+    modules, is_sudo_used = load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+
+    # Verification
+    assert modules["shell"].actions == []
+    assert is_sudo_used is False
+
+
+def test_manifest_cache_invalidated_on_new_module(config_repo, cache_directory):
+    # Setup
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+    config_repo.mkdir("git").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    os.utime(config_repo.strpath, ns=(0, 0))
+
+    # System under test
+    modules, is_sudo_used = load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+
+    # Verification
+    assert sorted(modules) == ["git", "shell"]
+
+
+def test_manifest_cache_disabled(config_repo, cache_directory):
+    # System under test
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, use_manifest_cache=False)
+
+    # Verification
+    assert not os.path.isfile(cache_directory.manifest_cache_file)
@@ -0,0 +1,32 @@
+from pydotfiles.common import OS
+from pydotfiles.models import parse_active_modules
+from pydotfiles.models.primitives import CacheDirectory
+
+
+"""
+Parallel module parsing tests
+"""
+
+
+def test_parallel_parsing_matches_serial_parsing(tmpdir):
+    # Setup
+    config_repo = tmpdir.mkdir("repo")
+    for module_index in range(6):
+        module_directory = config_repo.mkdir(f"module-{module_index}")
+        module_directory.join(f"file-{module_index}.symlink").write("")
+        is_sudo_used = "true" if module_index == 4 else "false"
+        module_directory.join("settings.json").write(f"{{\"version\": \"alpha\", \"schema\": \"core\", \"actions\": [{{\"action\": \"symlink\", \"sudo\": {is_sudo_used}, \"files\": {{\"*\": \"~\"}}}}]}}")
+
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+
+    # System under test
+    serial_modules, serial_is_sudo_used = parse_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+    parallel_modules, parallel_is_sudo_used = parse_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, max_workers=3)
+
+    # Verification
+    assert list(parallel_modules) == list(serial_modules)
+    assert parallel_is_sudo_used is serial_is_sudo_used is True
+
+    for module_name, parallel_module in parallel_modules.items():
+        assert [str(action) for action in parallel_module.actions] == [str(action) for action in serial_modules[module_name].actions]
+        assert parallel_module.cache_directory is cache_directory
@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+import pydotfiles.models
+from pydotfiles.models import Dotfiles
+from pydotfiles.models.enums import OperationType
+from pydotfiles.models.primitives import CacheDirectory
+
+
+"""
+Helper functions
+"""
+
+
+def create_dotfiles(tmpdir, settings_data, module_files=None):
+    config_repo = tmpdir.mkdir("repo")
+    config_repo.mkdir(".git")
+    module_directory = config_repo.mkdir("shell")
+    module_directory.join("settings.json").write(json.dumps(settings_data))
+    for file_name, content in (module_files or {}).items():
+        module_directory.join(file_name).write(content)
+
+    dotfiles = Dotfiles(config_repo.strpath, "some-remote-repo", True, False)
+    dotfiles.cache_directory = CacheDirectory(package_manager=dotfiles.cache_directory.package_manager, cache_directory=tmpdir.join("cache").strpath)
+    return dotfiles
+
+
+def get_symlink_settings(home_directory):
+    return {
+        "version": "alpha",
+        "schema": "core",
+        "actions": [{
+            "action": "symlink",
+            "files": {
+                "bashrc": home_directory.join("bashrc").strpath,
+                "zshrc": home_directory.join("zshrc").strpath,
+            },
+        }],
+    }
+
+
+"""
+Planning tests
+"""
+
+
+def test_plan_lists_only_pending_file_actions(tmpdir):
+    # Setup
+    home_directory = tmpdir.mkdir("home")
+    dotfiles = create_dotfiles(tmpdir, get_symlink_settings(home_directory), {"bashrc.symlink": "bash", "zshrc.symlink": "zsh"})
+    os.symlink(tmpdir.join("repo", "shell", "bashrc.symlink").strpath, home_directory.join("bashrc").strpath)
+
+    # System under test
+    install_plan = dotfiles.plan()
+
+    # Verification
+    operations = install_plan.module_plans[0].operations
+    assert [operation.operation_type for operation in operations] == [OperationType.FILE_ACTION]
+    assert operations[0].target.destination == home_directory.join("zshrc").strpath
+    assert install_plan.to_records() == [{"module": "shell", "operations": [{"type": "file_action", "description": str(operations[0].target)}]}]
+
+
+def test_executed_plan_converges(tmpdir):
+    # Setup
+    home_directory = tmpdir.mkdir("home")
+    dotfiles = create_dotfiles(tmpdir, get_symlink_settings(home_directory), {"bashrc.symlink": "bash", "zshrc.symlink": "zsh"})
+
+    # System under test
+    dotfiles.install_all()
+
+    # Verification
+    assert os.path.islink(home_directory.join("bashrc").strpath)
+    assert os.path.islink(home_directory.join("zshrc").strpath)
+    assert dotfiles.plan().is_empty
+
+
+def test_plan_skips_cached_packages(tmpdir):
+    # Setup
+    host_os = pydotfiles.models.OS.from_string(pydotfiles.models.sys.platform)
+    settings_data = {
+        "version": "alpha",
+        "schema": "core",
+        "os": {
+            "name": host_os.name.lower(),
+            "packages": ["git", "zsh --with-extras"],
+            "applications": [],
+        },
+    }
+    dotfiles = create_dotfiles(tmpdir, settings_data)
+    tmpdir.join("cache").ensure(dir=True)
+    tmpdir.join("cache", f"{dotfiles.cache_directory.package_manager.name.lower()}-package-cache").write("git\n")
+
+    # System under test
+    install_plan = dotfiles.plan()
+
+    # Verification
+    assert [operation.description for operation in install_plan.module_plans[0].operations] == ["zsh --with-extras"]
+    assert install_plan.get_summary_lines()[-1] == "Plan: 1 pending operation(s) across 1 module(s)"
+
+
+def test_completed_action_rechecked_after_start_script(tmpdir):
+    # Setup
+    home_directory = tmpdir.mkdir("home")
+    dotfiles = create_dotfiles(tmpdir, get_symlink_settings(home_directory), {"bashrc.symlink": "bash", "zshrc.symlink": "zsh", "start": f"#!/bin/sh\nrm {home_directory.join('bashrc').strpath}\n"})
+    os.chmod(tmpdir.join("repo", "shell", "start").strpath, 0o755)
+    os.symlink(tmpdir.join("repo", "shell", "bashrc.symlink").strpath, home_directory.join("bashrc").strpath)
+    os.symlink(tmpdir.join("repo", "shell", "zshrc.symlink").strpath, home_directory.join("zshrc").strpath)
+
+    # System under test
+    install_plan = dotfiles.plan()
+    dotfiles.install_all()
+
+    # Verification
+    assert [operation.operation_type for operation in install_plan.module_plans[0].pending_operations] == [OperationType.START_ACTION]
+    assert os.path.islink(home_directory.join("bashrc").strpath)
+    assert os.path.islink(home_directory.join("zshrc").strpath)
+
+
+def test_plan_never_asks_for_sudo_password_for_file_actions(tmpdir, monkeypatch):
+    # Setup
+    home_directory = tmpdir.mkdir("home")
+    settings_data = get_symlink_settings(home_directory)
+    settings_data["actions"][0]["sudo"] = True
+    dotfiles = create_dotfiles(tmpdir, settings_data, {"bashrc.symlink": "bash", "zshrc.symlink": "zsh"})
+    monkeypatch.setattr(pydotfiles.models, "ask_sudo_password", lambda: pytest.fail("Asked for the sudo password"))
+
+    # System under test
+    install_plan = dotfiles.plan()
+
+    # Verification
+    assert dotfiles.is_sudo_used
+    assert install_plan.number_of_operations == 2
+
+
+def test_install_hashes_copies_with_chosen_algorithm(tmpdir):
+    # Setup
+    home_directory = tmpdir.mkdir("home")
+    settings_data = {
+        "version": "alpha",
+        "schema": "core",
+        "actions": [{
+            "action": "copy",
+            "files": {
+                "bashrc": home_directory.join("bashrc").strpath,
+            },
+        }],
+    }
+    dotfiles = create_dotfiles(tmpdir, settings_data, {"bashrc": "bash"})
+    dotfiles.hash_algorithm = "blake2b"
+
+    # System under test
+    dotfiles.install_all()
+
+    # Verification
+    with sqlite3.connect(dotfiles.cache_directory.hash_database_file) as connection:
+        algorithms = {row[0] for row in connection.execute("SELECT algorithm FROM file_hashes")}
+    assert algorithms == {"blake2b"}
+    assert dotfiles.plan().is_empty
@@ -0,0 +1,181 @@
+import os
+
+import pytest
+
+import pydotfiles.models.sync
+from pydotfiles.models import parse_action_configs
+from pydotfiles.models.discovery import discover_modules
+from pydotfiles.models.enums import FileActionType
+from pydotfiles.models.journal import journal_session, get_run_to_roll_back, roll_back_run
+from pydotfiles.models.primitives import FileAction
+from pydotfiles.models.sync import get_sync_changes
+from pydotfiles.utils import is_copied, stat_cache_session
+
+
+"""
+Helper functions
+"""
+
+
+def create_origin_tree(tmpdir):
+    origin = tmpdir.mkdir("origin")
+    origin.join("init.vim").write("set number")
+    origin.mkdir("plugin").join("settings.vim").write("set hidden")
+    origin.join("plugin").mkdir("nested").join("keys.vim").write("map Q <nop>")
+    return origin
+
+
+def list_files(directory):
+    return sorted(os.path.relpath(os.path.join(current_directory, file_name), directory) for current_directory, _, file_names in os.walk(directory) for file_name in file_names)
+
+
+"""
+Sync tests
+"""
+
+
+def test_sync_mirrors_directory_tree(tmpdir):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.join("config", "nvim")
+    sync_action = FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False)
+
+    # System under test
+    sync_action.do()
+
+    # Verification
+    assert list_files(destination.strpath) == list_files(origin.strpath)
+    assert all(is_copied(origin.join(file).strpath, destination.join(file).strpath) for file in list_files(origin.strpath))
+    assert sync_action.is_completed
+
+
+def test_sync_only_transfers_changed_files(tmpdir, spy):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.join("destination")
+    sync_action = FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False)
+    sync_action.do()
+
+    origin.join("init.vim").write("set relativenumber")
+    os.utime(origin.join("plugin", "settings.vim").strpath, (0, 0))
+    copied_files = spy(pydotfiles.models.sync, "copy_file", lambda origin, destination, *args, **kwargs: os.path.relpath(destination))
+    tmpdir.chdir()
+
+    # System under test
+    with stat_cache_session():
+        changes = get_sync_changes(origin.strpath, destination.strpath)
+        sync_action.do()
+
+    # Verification
+    assert [os.path.relpath(destination_file) for _, destination_file in changes.updated_files] == [os.path.join("destination", "init.vim")]
+    assert [os.path.relpath(destination_file) for _, destination_file in changes.restamped_files] == [os.path.join("destination", "plugin", "settings.vim")]
+    assert copied_files == [os.path.join("destination", "init.vim")]
+    assert destination.join("init.vim").read() == "set relativenumber"
+    assert os.stat(destination.join("plugin", "settings.vim").strpath).st_mtime == 0
+    assert sync_action.is_completed
+
+
+@pytest.mark.parametrize("delete_extras", [True, False])
+def test_sync_deletes_extras_only_when_asked(tmpdir, delete_extras):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.mkdir("destination")
+    destination.mkdir("extra-directory").join("extra-file").write("extra")
+    destination.join("init.vim").write("an older version")
+    sync_action = FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False, delete_extras=delete_extras)
+
+    # System under test
+    sync_action.do()
+
+    # Verification
+    assert os.path.lexists(destination.join("extra-directory").strpath) != delete_extras
+    assert destination.join("init.vim").read() == "set number"
+    assert sync_action.is_completed
+
+
+def test_sync_replaces_files_in_place_of_directories(tmpdir):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.mkdir("destination")
+    destination.join("plugin").write("not a directory")
+    destination.mkdir("init.vim")
+
+    # System under test
+    FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False).do()
+
+    # Verification
+    assert list_files(destination.strpath) == list_files(origin.strpath)
+
+
+def test_sync_destination_file_is_a_conflict(tmpdir):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.join("destination")
+    destination.write("not a directory")
+    sync_action = FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False)
+
+    # System under test / Verification
+    assert not sync_action.is_completed
+    with pytest.raises(FileExistsError):
+        sync_action.do()
+
+    sync_action.overwrite()
+    assert list_files(destination.strpath) == list_files(origin.strpath)
+
+
+def test_unsync_removes_only_synced_files(tmpdir):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.join("destination")
+    sync_action = FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False)
+    sync_action.do()
+    destination.join("plugin").join("user-file").write("not synced")
+
+    # System under test
+    sync_action.undo()
+
+    # Verification
+    assert list_files(destination.strpath) == [os.path.join("plugin", "user-file")]
+    assert not os.path.exists(destination.join("plugin", "nested").strpath)
+
+
+def test_sync_rolled_back_per_file(tmpdir):
+    # Setup
+    origin = create_origin_tree(tmpdir)
+    destination = tmpdir.mkdir("destination")
+    destination.join("init.vim").write("an older version")
+    destination.join("extra-file").write("extra")
+    journal_file = tmpdir.join("cache", "install-journal").strpath
+
+    with journal_session(journal_file, tmpdir.join("cache", "journal-stash").strpath):
+        FileAction(FileActionType.SYNC, origin.strpath, destination.strpath, False, delete_extras=True).do()
+
+    # System under test
+    roll_back_run(journal_file, get_run_to_roll_back(journal_file))
+
+    # Verification
+    assert list_files(destination.strpath) == ["extra-file", "init.vim"]
+    assert destination.join("init.vim").read() == "an older version"
+    assert not os.path.exists(destination.join("plugin").strpath)
+
+
+def test_sync_actions_parsed_with_expansion(tmpdir):
+    # Setup
+    module_directory = tmpdir.mkdir("module")
+    module_directory.mkdir("nvim")
+    module_directory.mkdir("kitty")
+    module_directory.mkdir(".hidden")
+    module_files = discover_modules(tmpdir.strpath, ["module"])["module"]
+    action_configs = [{"action": "sync", "files": {"*": "~/.config", "vim": "~/.vim"}, "delete": True}]
+
+    # System under test
+    actions, is_sudo_used = parse_action_configs(action_configs, module_directory.strpath, module_files.symlinks, module_files.other_files, module_files.directories)
+
+    # Verification
+    assert sorted((action.origin, action.destination) for action in actions) == sorted([
+        (module_directory.join("kitty").strpath, os.path.expanduser("~/.config/kitty")),
+        (module_directory.join("nvim").strpath, os.path.expanduser("~/.config/nvim")),
+        (module_directory.join("vim").strpath, os.path.expanduser("~/.vim")),
+    ])
+    assert all(action.action == FileActionType.SYNC and action.delete_extras for action in actions)
+    assert not is_sudo_used
@@ -0,0 +1,110 @@
+import pytest
+
+import pydotfiles.models.validator
+from pydotfiles.common import OS
+from pydotfiles.models import load_active_modules
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.exceptions import ValidationError, ValidationErrorReason
+from pydotfiles.models.primitives import CacheDirectory
+
+
+"""
+Helper functions
+"""
+
+
+def create_repo(tmpdir, number_of_modules):
+    config_repo = tmpdir.mkdir("repo")
+    config_repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+
+    for module_index in range(number_of_modules):
+        module_directory = config_repo.mkdir(f"module-{module_index}")
+        module_directory.join(f"file-{module_index}.symlink").write("")
+        module_directory.join("settings.json").write(f"{{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {{\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}, \"actions\": [{{\"action\": \"symlink\", \"files\": {{\"file-{module_index}\": \"~/file-{module_index}\"}}}}]}}")
+
+    return config_repo
+
+
+"""
+Validated module loading tests
+"""
+
+
+def test_validated_loading_parses_each_file_once(tmpdir, spy):
+    # Setup
+    config_repo = create_repo(tmpdir, 3)
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+    parsed_files = spy(pydotfiles.models.validator, "parse_config_data", lambda raw_data, config_file: str(config_file))
+
+    # System under test
+    modules, _ = load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, use_manifest_cache=False, validator=Validator())
+
+    # Verification
+    assert len(modules) == 3
+    assert len(parsed_files) == len(set(parsed_files)) == 4
+    assert all(module.operating_system.settings == [] for module in modules.values())
+
+
+def test_validated_loading_rejects_invalid_settings(tmpdir):
+    # Setup
+    config_repo = create_repo(tmpdir, 2)
+    config_repo.join("module-1").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"some-invalid-os\"}}")
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, use_manifest_cache=False, validator=Validator())
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.INVALID_SCHEMA
+
+
+def test_validated_loading_rejects_missing_origins(tmpdir):
+    # Setup
+    config_repo = create_repo(tmpdir, 2)
+    config_repo.join("module-0").join("file-0.symlink").remove()
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, use_manifest_cache=False, validator=Validator())
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.MISSING_REFERENCE
+
+
+def test_unvalidated_manifest_not_reused_for_validated_loading(tmpdir):
+    # Setup
+    config_repo = create_repo(tmpdir, 2)
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory)
+
+    # System under test
+    first_validator = Validator()
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, validator=first_validator)
+
+    second_validator = Validator()
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, validator=second_validator)
+
+    # Verification
+    assert len(first_validator.loaded_files) == 3
+    assert len(second_validator.loaded_files) == 0
+
+
+def test_validated_manifest_invalidated_on_missing_nested_origin(tmpdir):
+    # Setup
+    config_repo = create_repo(tmpdir, 1)
+    nested_directory = config_repo.join("module-0").mkdir("nvim")
+    nested_directory.join("init.vim").write("set number")
+    config_repo.join("module-0").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"actions\": [{\"action\": \"copy\", \"files\": {\"nvim/init.vim\": \"~/.config/nvim/init.vim\"}}]}")
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+    load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, validator=Validator())
+
+    nested_directory.join("init.vim").remove()
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        load_active_modules(config_repo.strpath, None, OS.MACOS, cache_directory, validator=Validator())
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.MISSING_REFERENCE
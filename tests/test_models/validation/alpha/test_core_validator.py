@@ -1,3 +1,4 @@
+import json
 import pytest
 
 from pydotfiles.models.validator import Validator, ConfigMapper
@@ -33,6 +34,25 @@ def test_successful_loading_schema_alpha_core():
     assert schema.get("allOf")[1].get("properties").get("environments") is not None
 
 
+def test_successful_inlining_schema_alpha_core():
+    # System under test
+    schema = ConfigMapper.get_inlined_schema("alpha", "core")
+
+    # Verification
+    assert "$ref" not in json.dumps(schema)
+    assert schema.get("allOf")[0].get("required") == ["version", "schema"]
+    assert schema.get("allOf")[1].get("properties").get("actions").get("items").get("properties") is not None
+
+
+def test_compiled_validator_is_reused_alpha_core():
+    # System under test
+    first_validator = ConfigMapper.get_validator("alpha", "core")
+    second_validator = ConfigMapper.get_validator("alpha", "core")
+
+    # Verification
+    assert first_validator is second_validator
+
+
 """
 Validator tests
 """
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+from git import Repo
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.revisions import get_changed_files
+from pydotfiles.models.exceptions import ValidationError, ValidationErrorReason
+
+
+"""
+Helper functions
+"""
+
+
+def create_repo(tmpdir):
+    repo_directory = tmpdir.mkdir("repo")
+    repo_directory.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+    repo_directory.mkdir("module-0").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}")
+    repo_directory.mkdir("module-1").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    repo_directory.mkdir("module-2").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+
+    repo = Repo.init(repo_directory.strpath)
+    with repo.config_writer() as config_writer:
+        config_writer.set_value("user", "name", "pydotfiles")
+        config_writer.set_value("user", "email", "pydotfiles@example.com")
+    repo.index.add(["defaults.json", "module-0/settings.json", "module-1/settings.json", "module-2/settings.json"])
+    repo.index.commit("Initial commit")
+
+    return repo_directory
+
+
+"""
+Changed file detection tests
+"""
+
+
+def test_changed_files_include_uncommitted_and_untracked(tmpdir):
+    # Setup
+    repo_directory = create_repo(tmpdir)
+
+    # System under test
+    repo_directory.join("module-1").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"linux\"}}")
+    repo_directory.mkdir("module-3").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    repo_directory.join("module-2").join("settings.json").remove()
+    changed_files = get_changed_files(repo_directory.strpath, "HEAD")
+
+    # Verification
+    assert changed_files == {
+        repo_directory.join("module-1").join("settings.json").strpath,
+        repo_directory.join("module-2").join("settings.json").strpath,
+        repo_directory.join("module-3").join("settings.json").strpath,
+    }
+
+
+def test_changed_files_unknown_revision(tmpdir):
+    # Setup
+    repo_directory = create_repo(tmpdir)
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        get_changed_files(repo_directory.strpath, "some-unknown-revision")
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.INVALID_TARGET
+
+
+"""
+Scoped validation tests
+"""
+
+
+def test_scoped_validation_includes_referencing_files(tmpdir, spy):
+    # Setup
+    repo_directory = create_repo(tmpdir)
+    repo_directory.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": [{\"name\": \"a\", \"command\": \"b\"}]}")
+    validated_files = spy(Validator, "__validate_file__", lambda validator, file: os.path.relpath(os.path.normpath(str(file)), repo_directory.strpath))
+
+    # System under test
+    Validator().validate_directory(repo_directory.strpath, changed_files=get_changed_files(repo_directory.strpath, "HEAD"))
+
+    # Verification
+    assert sorted(validated_files) == ["defaults.json", "module-0/settings.json"]
+
+
+def test_scoped_validation_reports_errors_in_changed_files(tmpdir):
+    # Setup
+    repo_directory = create_repo(tmpdir)
+    repo_directory.join("defaults.json").write("{\"version\": \"alpha\",")
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        Validator().validate_directory(repo_directory.strpath, changed_files=get_changed_files(repo_directory.strpath, "HEAD"))
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.INVALID_SYNTAX
+
+
+def test_scoped_validation_without_changes(tmpdir, spy):
+    # Setup
+    repo_directory = create_repo(tmpdir)
+    validated_files = spy(Validator, "__validate_file__", lambda validator, file: os.path.relpath(os.path.normpath(str(file)), repo_directory.strpath))
+
+    # System under test
+    Validator().validate_directory(repo_directory.strpath, changed_files=get_changed_files(repo_directory.strpath, "HEAD"))
+
+    # Verification
+    assert validated_files == []
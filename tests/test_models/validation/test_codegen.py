@@ -0,0 +1,89 @@
+import pytest
+
+from pydotfiles.models.codegen import generate_validator_source, compile_validator, get_generated_validator
+from pydotfiles.models.validator import ConfigMapper, Validator
+from pydotfiles.models.exceptions import ValidationError, ValidationErrorReason
+
+
+"""
+Helper functions
+"""
+
+
+DOCUMENTS = [
+    # Valid documents
+    {"version": "alpha", "schema": "core"},
+    {"version": "alpha", "schema": "core", "os": {"name": "macos", "shell": "zsh", "packages": ["git"], "default_dock": []}},
+    {"version": "alpha", "schema": "core", "actions": [{"action": "symlink", "files": {"bashrc": "~/.bashrc"}, "hidden": True}]},
+    {"version": "alpha", "schema": "default_settings", "default_settings": [{"name": "a", "command": "b", "start": "sierra", "sudo": False}]},
+    {"version": "alpha", "schema": "developer_environments", "environments": [{"language": "python", "versions": ["3.7.0"], "environment_manager": {"name": "pyenv", "plugins": [{"name": "pyenv-virtualenv", "virtual_environments": [{"version": "3.7.0", "name": "a"}]}]}}]},
+
+    # Invalid documents
+    {"version": "beta", "schema": "core"},
+    {"schema": "core"},
+    [],
+    {"version": "alpha", "schema": "core", "os": {"shell": "zsh"}},
+    {"version": "alpha", "schema": "core", "os": {"name": "windows"}},
+    {"version": "alpha", "schema": "core", "os": {"name": "macos", "packages": "git"}},
+    {"version": "alpha", "schema": "core", "os": {"name": "macos", "packages": [1]}},
+    {"version": "alpha", "schema": "core", "actions": [{"action": "move", "files": {}}]},
+    {"version": "alpha", "schema": "core", "actions": [{"action": "copy", "files": {}, "hidden": "yes"}]},
+    {"version": "alpha", "schema": "default_settings", "default_settings": [{"name": "a"}]},
+    {"version": "alpha", "schema": "default_settings", "default_settings": [{"name": "a", "command": "b", "end": "catalina"}]},
+    {"version": "alpha", "schema": "default_settings", "default_settings": [{"name": "a", "command": "b", "sudo": 1}]},
+    {"version": "alpha", "schema": "developer_environments", "environments": [{"language": "python"}]},
+    {"version": "alpha", "schema": "developer_environments", "environments": [{"language": "python", "versions": ["3.7.0"], "environment_manager": {"plugins": []}}]},
+]
+
+
+"""
+Generated validator tests
+"""
+
+
+@pytest.mark.parametrize("schema_type", ["core", "default_settings", "developer_environments"])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_generated_validator_matches_jsonschema(schema_type, document):
+    # Setup
+    generated_validator = ConfigMapper.get_generated_validator("alpha", schema_type)
+    schema_validator = ConfigMapper.get_validator("alpha", schema_type)
+
+    # System under test/Verification
+    assert generated_validator is not None
+    assert generated_validator(document) == schema_validator.is_valid(document)
+
+
+def test_generated_validator_types():
+    # Setup
+    validate = compile_validator(generate_validator_source({"type": ["integer", "null"]}))
+
+    # System under test/Verification
+    assert validate(1) and validate(1.0) and validate(None)
+    assert not validate(True) and not validate(1.5) and not validate("1")
+
+
+def test_unsupported_keyword_falls_back():
+    # System under test
+    generated_validator = get_generated_validator({"type": "string", "pattern": "^a"})
+
+    # Verification
+    assert generated_validator is None
+
+
+def test_generated_validator_reused_for_same_schema():
+    # System under test
+    first_validator = get_generated_validator({"type": "object", "required": ["a"]})
+    second_validator = get_generated_validator({"required": ["a"], "type": "object"})
+
+    # Verification
+    assert first_validator is second_validator
+
+
+def test_invalid_data_still_reports_schema_errors():
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        Validator.validate_data({"version": "alpha", "schema": "core", "os": {"name": "windows"}})
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.INVALID_SCHEMA
+    assert [schema_error["path"] for schema_error in validation_error.value.schema_errors] == ["$.os.name"]
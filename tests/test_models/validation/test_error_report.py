@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.exceptions import ValidationError, ValidationErrorReason
+
+
+"""
+Helper functions
+"""
+
+
+def read_records(error_stream):
+    return [json.loads(line) for line in error_stream.getvalue().splitlines()]
+
+
+"""
+Collect-all error tests
+"""
+
+
+def test_all_schema_errors_collected_in_one_pass():
+    # Setup
+    data = {
+        "version": "alpha",
+        "schema": "core",
+        "os": {"name": "some-invalid-os", "shell": "some-invalid-shell"},
+    }
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        Validator.validate_data(data)
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.INVALID_SCHEMA
+    assert sorted(schema_error["path"] for schema_error in validation_error.value.schema_errors) == ["$.os.name", "$.os.shell"]
+    assert all(schema_error["schema_pointer"].startswith("/") for schema_error in validation_error.value.schema_errors)
+    assert "all_errors" in validation_error.value.context_map
+
+
+def test_ndjson_records_streamed_for_every_error(tmpdir):
+    # Setup
+    repo = tmpdir.mkdir("repo")
+    repo.mkdir("module-0").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"some-invalid-os\", \"shell\": \"some-invalid-shell\"}}")
+    repo.mkdir("module-1").join("settings.json").write("{\"version\": \"alpha\",")
+    error_stream = io.StringIO()
+
+    # System under test
+    with pytest.raises(ValidationError):
+        Validator(error_stream=error_stream).validate_directory(repo.strpath)
+
+    # Verification
+    records = read_records(error_stream)
+    assert len(records) == 3
+    assert {record["error"] for record in records} == {"INVALID_SCHEMA", "INVALID_SYNTAX"}
+    assert {record["path"] for record in records if record["error"] == "INVALID_SCHEMA"} == {"$.os.name", "$.os.shell"}
+    assert all(record["file"].endswith("settings.json") for record in records)
+
+
+def test_ndjson_records_streamed_from_parallel_validation(tmpdir):
+    # Setup
+    repo = tmpdir.mkdir("repo")
+    for module_index in range(4):
+        repo.mkdir(f"module-{module_index}").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"some-invalid-os\"}}")
+    error_stream = io.StringIO()
+
+    # System under test
+    with pytest.raises(ValidationError):
+        Validator(error_stream=error_stream).validate_directory(repo.strpath, max_workers=2)
+
+    # Verification
+    records = read_records(error_stream)
+    assert len(records) == 4
+    assert {record["path"] for record in records} == {"$.os.name"}
@@ -115,3 +115,21 @@ def test_invalid_data_none():
     # System under test
     with pytest.raises(ValidationError):
         validator.validate_data(None)
+
+
+def test_invalid_data_unsupported_schema_version():
+    # Setup
+    validator = Validator()
+
+    # System under test
+    with pytest.raises(ValidationError):
+        validator.validate_data({"version": "some-unknown-version", "schema": "core"})
+
+
+def test_invalid_data_unsupported_schema_type():
+    # Setup
+    validator = Validator()
+
+    # System under test
+    with pytest.raises(ValidationError):
+        validator.validate_data({"version": "alpha", "schema": "some-unknown-schema"})
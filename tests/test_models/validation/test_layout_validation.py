@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.exceptions import ValidationError
+
+
+"""
+Helper functions
+"""
+
+
+def create_repo(tmpdir):
+    repo = tmpdir.mkdir("repo")
+    repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+
+    module = repo.mkdir("module-0")
+    module.join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}")
+
+    # Files that aren't pydotfiles configuration at all
+    module.join("tool-config.json").write("{\"some\": \"other tool\"}")
+    module.mkdir("node_modules").join("package.json").write("{\"name\": \"vendored\"}")
+    repo.mkdir(".git").join("config.json").write("not even json")
+    repo.mkdir("vendored").join("settings.yaml").write("not: [valid")
+
+    return repo
+
+
+def get_relative_files(repo, files):
+    return [os.path.relpath(file, repo.strpath) for file in files]
+
+
+"""
+Layout-aware validation tests
+"""
+
+
+def test_full_walk_prunes_ignored_trees(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+
+    # System under test
+    files_to_validate = Validator().get_files_to_validate(repo.strpath)
+
+    # Verification
+    assert get_relative_files(repo, files_to_validate) == ["defaults.json", "module-0/settings.json", "module-0/tool-config.json", "vendored/settings.yaml"]
+
+
+def test_layout_aware_discovers_module_settings_only(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+
+    # System under test
+    files_to_validate = Validator(is_layout_aware=True, ignore_patterns=[".git", "vendored"]).get_files_to_validate(repo.strpath)
+
+    # Verification
+    assert get_relative_files(repo, files_to_validate) == ["module-0/settings.json"]
+
+
+def test_layout_aware_validation_succeeds_where_full_walk_fails(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+
+    # System under test
+    with pytest.raises(ValidationError):
+        Validator().validate_directory(repo.strpath)
+
+    Validator(is_layout_aware=True, ignore_patterns=["vendored"]).validate_directory(repo.strpath)
+
+
+def test_layout_aware_still_validates_referenced_default_settings(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.join("defaults.json").write("{\"version\": \"alpha\",")
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        Validator(is_layout_aware=True, ignore_patterns=["vendored"]).validate_directory(repo.strpath)
+
+    # Verification
+    assert "defaults.json" in str(validation_error.value.context_map.get('file'))
+
+
+def test_validation_target_matches_discovery(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    validator = Validator(is_layout_aware=True)
+
+    # System under test/Verification
+    assert validator.is_validation_target(repo.join("module-0").join("settings.json").strpath, repo.strpath)
+    assert not validator.is_validation_target(repo.join("module-0").join("tool-config.json").strpath, repo.strpath)
+    assert not validator.is_validation_target(repo.join(".git").join("config.json").strpath, repo.strpath)
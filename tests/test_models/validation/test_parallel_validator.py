@@ -0,0 +1,114 @@
+import pytest
+
+import pydotfiles.models.validator
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.exceptions import ValidationError
+
+
+"""
+Helper functions
+"""
+
+
+def create_repo(tmpdir, number_of_modules, invalid_module_indices):
+    repo = tmpdir.mkdir("repo")
+    repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+
+    for module_index in range(number_of_modules):
+        schema_type = "\"some-invalid-schema\"" if module_index in invalid_module_indices else "\"core\""
+        repo.mkdir(f"module-{module_index}").join("settings.json").write(f"{{\"version\": \"alpha\", \"schema\": {schema_type}, \"os\": {{\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}}}")
+
+    return repo
+
+
+class InProcessExecutor:
+    """
+    Stand-in for a process pool that runs every
+    chunk in this process, in order
+    """
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        if initializer is not None:
+            initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, function, *iterables):
+        return map(function, *iterables)
+
+
+"""
+Parallel validation tests
+"""
+
+
+def test_parallel_validation_success(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir, 8, [])
+
+    # System under test
+    Validator().validate_directory(repo.strpath, max_workers=2)
+
+
+def test_parallel_validation_matches_serial_report(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir, 8, [6, 1, 3])
+
+    # System under test
+    with pytest.raises(ValidationError) as serial_error:
+        Validator().validate_directory(repo.strpath)
+
+    with pytest.raises(ValidationError) as parallel_error:
+        Validator().validate_directory(repo.strpath, max_workers=3)
+
+    # Verification
+    assert parallel_error.value.help_message == serial_error.value.help_message
+    assert "module-1" in str(parallel_error.value.context_map.get('file_name'))
+
+
+def test_shared_default_settings_file_validated_once(tmpdir, spy):
+    # Setup
+    repo = create_repo(tmpdir, 4, [])
+    validated_schemas = spy(Validator, "validate_data", lambda data: data.get("schema"))
+
+    # System under test
+    Validator().validate_directory(repo.strpath)
+
+    # Verification
+    assert validated_schemas.count("default_settings") == 1
+    assert validated_schemas.count("core") == 4
+
+
+def test_shared_default_settings_file_validated_once_across_chunks(tmpdir, monkeypatch, spy):
+    # Setup
+    repo = create_repo(tmpdir, 8, [])
+    repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": \"not-a-list\"}")
+    monkeypatch.setattr(pydotfiles.models.validator, "ProcessPoolExecutor", InProcessExecutor)
+    validated_schemas = spy(Validator, "validate_data", lambda data: data.get("schema"))
+
+    # System under test
+    validation_exceptions = Validator().validate_files_in_parallel(Validator().get_files_to_validate(repo.strpath), max_workers=4)
+
+    # Verification
+    assert validated_schemas.count("default_settings") == 1
+    assert validated_schemas.count("core") == 8
+    assert len(validation_exceptions) == 1
+
+
+def test_validator_sent_once_per_worker(tmpdir, spy):
+    # Setup
+    repo = create_repo(tmpdir, 16, [])
+    validator = Validator()
+    pickled_validators = spy(Validator, "__getstate__")
+
+    # System under test
+    validation_exceptions = validator.validate_files_in_parallel(validator.get_files_to_validate(repo.strpath), max_workers=2)
+
+    # Verification
+    assert validation_exceptions == []
+    assert len(pickled_validators) <= 2
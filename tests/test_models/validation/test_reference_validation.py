@@ -0,0 +1,168 @@
+import json
+import os
+
+import pytest
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.exceptions import ValidationError, ValidationErrorReason
+from pydotfiles.models.primitives import CacheDirectory
+from pydotfiles.models.references import RepoFileIndex, get_required_references
+from pydotfiles.models.watcher import ValidationWatcher
+
+
+"""
+Helper functions
+"""
+
+
+class FakeFileWatcher:
+
+    def wait_for_changes(self, timeout=None):
+        return set()
+
+    def close(self):
+        pass
+
+
+def create_repo(tmpdir):
+    repo = tmpdir.mkdir("repo")
+    repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+
+    module = repo.mkdir("module-0")
+    module.join("bashrc.symlink").write("")
+    module.join("gitconfig").write("")
+    module.join("settings.json").write(json.dumps({
+        "version": "alpha",
+        "schema": "core",
+        "os": {"name": "macos", "default_settings_file": "../defaults.json"},
+        "actions": [
+            {"action": "symlink", "files": {"bashrc": "~/.bashrc", "*": "~"}},
+            {"action": "copy", "files": {"gitconfig": "~/.gitconfig"}},
+            {"action": "copy", "absolute": True, "files": {"/some/machine/specific/file": "~/file"}},
+        ]
+    }))
+
+    return repo
+
+
+"""
+Index tests
+"""
+
+
+def test_repo_file_index_lookups(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.mkdir(".git").join("config").write("")
+
+    # System under test
+    file_index = RepoFileIndex(repo.strpath)
+
+    # Verification
+    assert repo.join("module-0").join("bashrc.symlink").strpath in file_index
+    assert repo.join("module-0").join("..").join("defaults.json").strpath in file_index
+    assert repo.join("module-0").join("missing").strpath not in file_index
+    assert repo.join(".git").join("config").strpath not in file_index
+
+
+def test_repo_file_index_follows_symlinked_directories(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    shared_directory = tmpdir.mkdir("shared")
+    shared_directory.mkdir("nvim").join("init.vim").write("set number")
+    os.symlink(shared_directory.strpath, repo.join("module-0").join("shared").strpath)
+    os.symlink(repo.strpath, shared_directory.join("nvim").join("loop").strpath)
+
+    # System under test
+    file_index = RepoFileIndex(repo.strpath)
+
+    # Verification
+    assert repo.join("module-0").join("shared").join("nvim").join("init.vim").strpath in file_index
+    assert repo.join("module-0").join("shared").join("nvim").join("loop").strpath in file_index
+    assert repo.join("module-0").join("shared").join("nvim").join("loop").join("module-0").strpath not in file_index
+
+
+def test_required_references_skip_expansions_and_absolute_origins():
+    # Setup
+    data = {
+        "version": "alpha",
+        "schema": "core",
+        "actions": [
+            {"action": "symlink", "files": {"bashrc": "~/.bashrc", "*": "~"}},
+            {"action": "copy", "absolute": True, "files": {"/etc/hosts": "~/hosts"}},
+        ]
+    }
+
+    # System under test
+    required_references = get_required_references(data)
+
+    # Verification
+    assert required_references == [("$.actions[0].files.bashrc", "bashrc.symlink", "symlink origin")]
+
+
+"""
+Cross-reference validation tests
+"""
+
+
+def test_valid_references(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+
+    # System under test
+    Validator().validate_directory(repo.strpath)
+
+
+def test_missing_references_reported_together(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.join("module-0").join("bashrc.symlink").remove()
+    repo.join("module-0").join("gitconfig").remove()
+
+    # System under test
+    with pytest.raises(ValidationError) as validation_error:
+        Validator().validate_directory(repo.strpath)
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.MISSING_REFERENCE
+    assert [schema_error["path"] for schema_error in validation_error.value.schema_errors] == ["$.actions[0].files.bashrc", "$.actions[1].files.gitconfig"]
+
+
+def test_missing_references_ignored_when_disabled(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.join("module-0").join("bashrc.symlink").remove()
+
+    # System under test
+    Validator(check_references=False).validate_directory(repo.strpath)
+
+
+def test_missing_reference_detected_for_cached_file(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    cache_directory = CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+    Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+
+    # System under test
+    repo.join("module-0").join("gitconfig").remove()
+    with pytest.raises(ValidationError) as validation_error:
+        Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+
+    # Verification
+    assert validation_error.value.reason == ValidationErrorReason.MISSING_REFERENCE
+
+
+def test_watcher_revalidates_when_origin_is_deleted(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    watcher = ValidationWatcher(Validator(), repo.strpath, FakeFileWatcher())
+    assert watcher.validate_all() == []
+
+    # System under test
+    origin = repo.join("module-0").join("bashrc.symlink")
+    origin.remove()
+    validation_exceptions = watcher.revalidate({origin.strpath})
+
+    # Verification
+    assert len(validation_exceptions) == 1
+    assert validation_exceptions[0].reason == ValidationErrorReason.MISSING_REFERENCE
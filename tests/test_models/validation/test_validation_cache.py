@@ -0,0 +1,95 @@
+import pytest
+
+import pydotfiles.models.primitives
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.primitives import CacheDirectory
+from pydotfiles.models.exceptions import ValidationError
+
+
+"""
+Helper functions
+"""
+
+
+@pytest.fixture
+def cache_directory(tmpdir):
+    return CacheDirectory(cache_directory=tmpdir.join("cache").strpath)
+
+
+"""
+Validation cache tests
+"""
+
+
+def test_unchanged_files_are_skipped(tmpdir, cache_directory, spy):
+    # Setup
+    repo = tmpdir.mkdir("repo")
+    repo.mkdir("shell").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+    validated_data = spy(Validator, "validate_data", lambda data: data)
+
+    # System under test
+    Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+
+    # Verification
+    assert validated_data == []
+
+
+def test_changed_files_are_revalidated(tmpdir, cache_directory):
+    # Setup
+    repo = tmpdir.mkdir("repo")
+    settings_file = repo.mkdir("shell").join("settings.json")
+    settings_file.write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+    settings_file.write("{\"version\": \"alpha\"}")
+
+    # System under test
+    with pytest.raises(ValidationError):
+        Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+
+
+def test_cached_file_still_follows_references(tmpdir, cache_directory):
+    # Setup
+    module_directory = tmpdir.mkdir("repo").mkdir("macos")
+    settings_file = module_directory.join("settings.json")
+    settings_file.write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}")
+    defaults_file = tmpdir.join("repo").join("defaults.json")
+    defaults_file.write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+    Validator(cache_directory=cache_directory).validate_directory(module_directory.strpath)
+    defaults_file.remove()
+
+    # System under test
+    with pytest.raises(ValidationError):
+        Validator(cache_directory=cache_directory).validate_directory(module_directory.strpath)
+
+
+def test_no_cache_revalidates_everything(tmpdir, cache_directory, spy):
+    # Setup
+    repo = tmpdir.mkdir("repo")
+    repo.mkdir("shell").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    Validator(cache_directory=cache_directory).validate_directory(repo.strpath)
+    validated_data = spy(Validator, "validate_data", lambda data: data)
+
+    # System under test
+    Validator().validate_directory(repo.strpath)
+
+    # Verification
+    assert len(validated_data) == 1
+
+
+def test_interrupted_cache_write_keeps_previous_cache(cache_directory, monkeypatch):
+    # Setup
+    cache_directory.write_validation_cache({"some-hash": {"referenced_files": []}})
+
+    def crash(source, destination):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(pydotfiles.models.primitives.os, "replace", crash)
+
+    # System under test
+    with pytest.raises(KeyboardInterrupt):
+        cache_directory.write_validation_cache({"another-hash": {"referenced_files": []}})
+
+    # Verification
+    assert cache_directory.read_validation_cache() == {"some-hash": {"referenced_files": []}}
@@ -0,0 +1,182 @@
+import os
+import sys
+
+import pytest
+
+from pydotfiles.models.validator import Validator
+from pydotfiles.models.references import DependencyGraph
+from pydotfiles.models.watcher import ValidationWatcher, PollingFileWatcher, InotifyFileWatcher
+
+
+"""
+Helper functions
+"""
+
+
+class FakeFileWatcher:
+
+    def wait_for_changes(self, timeout=None):
+        return set()
+
+    def close(self):
+        pass
+
+
+def create_repo(tmpdir):
+    repo = tmpdir.mkdir("repo")
+    repo.join("defaults.json").write("{\"version\": \"alpha\", \"schema\": \"default_settings\", \"default_settings\": []}")
+    repo.mkdir("module-0").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"macos\", \"default_settings_file\": \"../defaults.json\"}}")
+    repo.mkdir("module-1").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+    return repo
+
+
+"""
+Dependency graph tests
+"""
+
+
+def test_dependency_graph_affected_files():
+    # Setup
+    dependency_graph = DependencyGraph()
+    dependency_graph.set_references("a", ["shared"])
+    dependency_graph.set_references("b", ["shared"])
+    dependency_graph.set_references("c", [])
+
+    # System under test
+    affected_files = dependency_graph.get_affected_files({"shared"})
+
+    # Verification
+    assert affected_files == {"shared", "a", "b"}
+
+
+def test_dependency_graph_references_replaced():
+    # Setup
+    dependency_graph = DependencyGraph()
+    dependency_graph.set_references("a", ["shared"])
+
+    # System under test
+    dependency_graph.set_references("a", ["other"])
+
+    # Verification
+    assert dependency_graph.get_affected_files({"shared"}) == {"shared"}
+    assert dependency_graph.get_affected_files({"other"}) == {"other", "a"}
+
+
+"""
+Incremental revalidation tests
+"""
+
+
+def test_revalidates_dependents_of_changed_file(tmpdir, spy):
+    # Setup
+    repo = create_repo(tmpdir)
+    watcher = ValidationWatcher(Validator(), repo.strpath, FakeFileWatcher())
+    assert watcher.validate_all() == []
+    validated_files = spy(Validator, "__validate_file__", lambda validator, file: os.path.basename(os.path.dirname(str(file))) + "/" + os.path.basename(str(file)))
+
+    # System under test
+    validation_exceptions = watcher.revalidate({repo.join("defaults.json").strpath})
+
+    # Verification
+    assert validation_exceptions == []
+    assert sorted(validated_files) == ["module-0/settings.json", "repo/defaults.json"]
+
+
+def test_revalidation_reports_broken_dependency(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    watcher = ValidationWatcher(Validator(), repo.strpath, FakeFileWatcher())
+    watcher.validate_all()
+
+    # System under test
+    repo.join("defaults.json").write("{\"version\": \"alpha\",")
+    validation_exceptions = watcher.revalidate({repo.join("defaults.json").strpath})
+
+    # Verification
+    assert len(validation_exceptions) == 1
+    assert "defaults.json" in str(validation_exceptions[0].context_map.get('file'))
+
+
+def test_revalidation_of_deleted_dependency(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    watcher = ValidationWatcher(Validator(), repo.strpath, FakeFileWatcher())
+    watcher.validate_all()
+
+    # System under test
+    repo.join("defaults.json").remove()
+    validation_exceptions = watcher.revalidate({repo.join("defaults.json").strpath})
+
+    # Verification
+    assert len(validation_exceptions) == 1
+
+
+"""
+File watcher tests
+"""
+
+
+def test_polling_watcher_detects_changes(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    file_watcher = PollingFileWatcher(repo.strpath, poll_interval=0)
+    settings_file = repo.join("module-1").join("settings.json")
+
+    # System under test
+    settings_file.write("{\"version\": \"alpha\", \"schema\": \"core\", \"os\": {\"name\": \"linux\"}}")
+    changed_files = file_watcher.wait_for_changes()
+
+    # Verification
+    assert changed_files == {settings_file.strpath}
+
+
+def test_polling_watcher_skips_ignored_directories(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.mkdir("node_modules").join("package.json").write("{}")
+    repo.mkdir("vendor").join("settings.json").write("{}")
+
+    # System under test
+    file_watcher = PollingFileWatcher(repo.strpath, poll_interval=0, ignore_patterns=["node_modules", "vend*"])
+
+    # Verification
+    assert sorted(os.path.relpath(file_path, repo.strpath) for file_path in file_watcher.snapshot) == ["defaults.json", os.path.join("module-0", "settings.json"), os.path.join("module-1", "settings.json")]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+def test_inotify_watcher_detects_changes(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    file_watcher = InotifyFileWatcher(repo.strpath, settle_interval=0.05)
+    settings_file = repo.join("module-1").join("settings.json")
+
+    # System under test
+    try:
+        settings_file.write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+        repo.mkdir("module-2").join("settings.json").write("{\"version\": \"alpha\", \"schema\": \"core\"}")
+        changed_files = file_watcher.wait_for_changes(timeout=5)
+    finally:
+        file_watcher.close()
+
+    # Verification
+    assert settings_file.strpath in changed_files
+    assert repo.join("module-2").join("settings.json").strpath in changed_files
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+def test_inotify_watcher_skips_ignored_directories(tmpdir):
+    # Setup
+    repo = create_repo(tmpdir)
+    repo.mkdir("node_modules").mkdir("some-package")
+
+    # System under test
+    file_watcher = InotifyFileWatcher(repo.strpath, settle_interval=0.05, ignore_patterns=["node_modules"])
+    try:
+        repo.join("node_modules").mkdir("another-package").join("package.json").write("{}")
+        changed_files = file_watcher.wait_for_changes(timeout=0.2)
+    finally:
+        file_watcher.close()
+
+    # Verification
+    assert sorted(os.path.relpath(directory, repo.strpath) for directory in file_watcher.watched_directories.values()) == [".", "module-0", "module-1"]
+    assert changed_files == set()
@@ -0,0 +1,119 @@
+import errno
+import filecmp
+import os
+import sys
+
+import pytest
+
+import pydotfiles.utils.copying
+from pydotfiles.utils import fast_copy_file, is_copied, COPY_METHOD_SENDFILE, COPY_METHOD_BUFFERED
+
+
+"""
+Helper functions
+"""
+
+
+only_on_linux = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="The kernel copy methods are only used on Linux")
+
+
+def create_origin_file(tmpdir, size):
+    origin = tmpdir.join("origin")
+    origin.write_binary(os.urandom(size))
+    os.chmod(origin.strpath, 0o640)
+    os.utime(origin.strpath, ns=(1500000000123456789, 1500000000123456789))
+    return origin
+
+
+def raise_unsupported(*args, **kwargs):
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+
+"""
+Fast copy tests
+"""
+
+
+def test_fast_copy_preserves_contents_and_metadata(tmpdir):
+    # Setup
+    origin = create_origin_file(tmpdir, 3 * 1024 * 1024 + 17)
+    destination = tmpdir.join("destination")
+
+    # System under test
+    fast_copy_file(origin.strpath, destination.strpath)
+
+    # Verification
+    assert filecmp.cmp(origin.strpath, destination.strpath, shallow=False)
+    assert os.stat(destination.strpath).st_mode == os.stat(origin.strpath).st_mode
+    assert os.stat(destination.strpath).st_mtime_ns == os.stat(origin.strpath).st_mtime_ns
+    assert is_copied(origin.strpath, destination.strpath)
+
+
+def test_fast_copy_empty_file(tmpdir):
+    # Setup
+    origin = tmpdir.join("origin")
+    origin.write("")
+    destination = tmpdir.join("destination")
+
+    # System under test
+    fast_copy_file(origin.strpath, destination.strpath)
+
+    # Verification
+    assert destination.read() == ""
+
+
+@only_on_linux
+def test_fast_copy_falls_back_to_sendfile(tmpdir, monkeypatch):
+    # Setup
+    origin = create_origin_file(tmpdir, 1024 * 1024)
+    destination = tmpdir.join("destination")
+    monkeypatch.setattr(pydotfiles.utils.copying, "copy_with_reflink", lambda origin_fd, destination_fd: False)
+    monkeypatch.setattr(pydotfiles.utils.copying, "copy_chunk_with_copy_file_range", raise_unsupported)
+
+    # System under test
+    copy_method = fast_copy_file(origin.strpath, destination.strpath)
+
+    # Verification
+    assert copy_method == COPY_METHOD_SENDFILE
+    assert filecmp.cmp(origin.strpath, destination.strpath, shallow=False)
+
+
+@only_on_linux
+def test_fast_copy_resumes_partial_copy_with_buffered_copy(tmpdir, monkeypatch):
+    # Setup
+    origin = create_origin_file(tmpdir, 2 * 1024 * 1024 + 5)
+    destination = tmpdir.join("destination")
+    copied_chunks = []
+
+    def copy_one_chunk_then_fail(origin_fd, destination_fd, offset):
+        if len(copied_chunks) > 0:
+            raise_unsupported()
+        copied_chunks.append(offset)
+        return pydotfiles.utils.copying.copy_chunk_buffered(origin_fd, destination_fd, offset)
+
+    monkeypatch.setattr(pydotfiles.utils.copying, "copy_with_reflink", lambda origin_fd, destination_fd: False)
+    monkeypatch.setattr(pydotfiles.utils.copying, "get_kernel_copy_methods", lambda: [("partial", copy_one_chunk_then_fail)])
+
+    # System under test
+    copy_method = fast_copy_file(origin.strpath, destination.strpath)
+
+    # Verification
+    assert copy_method == COPY_METHOD_BUFFERED
+    assert copied_chunks == [0]
+    assert filecmp.cmp(origin.strpath, destination.strpath, shallow=False)
+
+
+@only_on_linux
+def test_fast_copy_raises_real_errors(tmpdir, monkeypatch):
+    # Setup
+    origin = create_origin_file(tmpdir, 1024)
+
+    def raise_no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+    monkeypatch.setattr(pydotfiles.utils.copying, "copy_with_reflink", lambda origin_fd, destination_fd: False)
+    monkeypatch.setattr(pydotfiles.utils.copying, "copy_chunk_with_copy_file_range", raise_no_space)
+
+    # System under test / Verification
+    with pytest.raises(OSError):
+        fast_copy_file(origin.strpath, tmpdir.join("destination").strpath)
@@ -0,0 +1,218 @@
+import hashlib
+import os
+
+import pytest
+
+import pydotfiles.utils.general
+import pydotfiles.utils.hashes
+from pydotfiles.utils import hash_file, hash_files, get_file_hash, get_file_hashes, hash_database_session, get_hash_database, copy_file, is_copied
+
+
+"""
+Helper functions
+"""
+
+
+def trust_recent_changes(monkeypatch):
+    # Stands in for a file system with nanosecond timestamps, so files written by the test itself aren't racy
+    monkeypatch.setattr(pydotfiles.utils.hashes, "RACY_INTERVAL_NS", 0)
+
+
+"""
+Hashing engine tests
+"""
+
+
+@pytest.mark.parametrize("algorithm", ["sha256", "blake2b"])
+def test_hash_file_algorithms(tmpdir, algorithm):
+    # Setup
+    some_file = tmpdir.join("some-file")
+    some_file.write_binary(os.urandom(200000))
+
+    # System under test
+    file_hash = hash_file(some_file.strpath, block_size=4096, algorithm=algorithm)
+
+    # Verification
+    assert file_hash == hashlib.new(algorithm, some_file.read_binary()).hexdigest()
+
+
+def test_hash_file_memory_maps_large_files(tmpdir, monkeypatch):
+    # Setup
+    monkeypatch.setattr(pydotfiles.utils.general, "MMAP_HASH_THRESHOLD", 1024)
+    large_file = tmpdir.join("large-file")
+    large_file.write_binary(os.urandom(5000))
+    empty_file = tmpdir.join("empty-file")
+    empty_file.write_binary(b"")
+
+    # System under test
+    large_file_hash = hash_file(large_file.strpath)
+    empty_file_hash = hash_file(empty_file.strpath)
+
+    # Verification
+    assert large_file_hash == hashlib.sha256(large_file.read_binary()).hexdigest()
+    assert empty_file_hash == hashlib.sha256(b"").hexdigest()
+
+
+def test_hash_files_in_parallel(tmpdir):
+    # Setup
+    file_paths = []
+    for file_number in range(10):
+        some_file = tmpdir.join(f"file-{file_number}")
+        some_file.write(f"content {file_number}")
+        file_paths.append(some_file.strpath)
+
+    # System under test
+    file_hashes = hash_files(file_paths, algorithm="blake2b")
+
+    # Verification
+    assert file_hashes == {file_path: hash_file(file_path, algorithm="blake2b") for file_path in file_paths}
+
+
+"""
+Hash database tests
+"""
+
+
+def test_hash_without_session_reads_file(tmpdir, spy):
+    # Setup
+    hashed_files = spy(pydotfiles.utils.hashes, "hash_file", lambda file_path, *args, **kwargs: str(file_path))
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    # System under test
+    file_hashes = [get_file_hash(some_file.strpath) for _ in range(2)]
+
+    # Verification
+    assert file_hashes == [hash_file(some_file.strpath)] * 2
+    assert len(hashed_files) == 2
+
+
+def test_session_algorithm_used_without_database(tmpdir):
+    # Setup
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    # System under test
+    with hash_database_session(None, "blake2b"):
+        session_hash = get_file_hash(some_file.strpath)
+
+    # Verification
+    assert session_hash == hash_file(some_file.strpath, algorithm="blake2b")
+    assert get_file_hash(some_file.strpath) == hash_file(some_file.strpath)
+
+
+def test_unchanged_file_hashed_once_across_sessions(tmpdir, monkeypatch, spy):
+    # Setup
+    trust_recent_changes(monkeypatch)
+    hashed_files = spy(pydotfiles.utils.hashes, "hash_file", lambda file_path, *args, **kwargs: str(file_path))
+    database_file = tmpdir.join("cache", "hash-cache.sqlite3").strpath
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    # System under test
+    with hash_database_session(database_file):
+        first_hash = get_file_hash(some_file.strpath)
+
+    with hash_database_session(database_file):
+        second_hash = get_file_hash(some_file.strpath)
+
+    # Verification
+    assert first_hash == second_hash == hash_file(some_file.strpath)
+    assert hashed_files == [some_file.strpath]
+    assert get_hash_database() is None
+
+
+def test_changed_file_rehashed(tmpdir, spy):
+    # Setup
+    hashed_files = spy(pydotfiles.utils.hashes, "hash_file", lambda file_path, *args, **kwargs: str(file_path))
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    with hash_database_session(tmpdir.join("cache", "hash-cache.sqlite3").strpath):
+        get_file_hash(some_file.strpath)
+        some_file.write("some other content")
+
+        # System under test
+        changed_hash = get_file_hash(some_file.strpath)
+
+    # Verification
+    assert changed_hash == hash_file(some_file.strpath)
+    assert len(hashed_files) == 2
+
+
+def test_recently_changed_file_rehashed(tmpdir, spy):
+    # Setup
+    hashed_files = spy(pydotfiles.utils.hashes, "hash_file", lambda file_path, *args, **kwargs: str(file_path))
+    database_file = tmpdir.join("cache", "hash-cache.sqlite3").strpath
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    # System under test
+    with hash_database_session(database_file):
+        get_file_hash(some_file.strpath)
+
+    # An edit within the same timestamp tick (e.g. on FAT or some network mounts) wouldn't change the stats
+    with hash_database_session(database_file):
+        get_file_hash(some_file.strpath)
+
+    # Verification
+    assert hashed_files == [some_file.strpath] * 2
+
+
+def test_copied_origin_recorded(tmpdir, monkeypatch, spy):
+    # Setup
+    trust_recent_changes(monkeypatch)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    destination = tmpdir.join("destination")
+    database_file = tmpdir.join("cache", "hash-cache.sqlite3").strpath
+
+    with hash_database_session(database_file):
+        copy_file(origin.strpath, destination.strpath)
+
+    hashed_files = spy(pydotfiles.utils.hashes, "hash_file", lambda file_path, *args, **kwargs: str(file_path))
+
+    # System under test
+    with hash_database_session(database_file):
+        is_destination_copied = is_copied(origin.strpath, destination.strpath)
+
+    # Verification
+    assert is_destination_copied
+    assert hashed_files == [destination.strpath]
+
+
+def test_corrupt_database_rebuilt(tmpdir):
+    # Setup
+    database_file = tmpdir.join("cache", "hash-cache.sqlite3")
+    database_file.write("this is not a database", ensure=True)
+    some_file = tmpdir.join("some-file")
+    some_file.write("some content")
+
+    # System under test
+    with hash_database_session(database_file.strpath) as hash_database:
+        file_hash = get_file_hash(some_file.strpath)
+
+    # Verification
+    assert hash_database is not None
+    assert file_hash == hash_file(some_file.strpath)
+    assert os.path.isfile(database_file.strpath)
+
+
+def test_database_hashes_batch_with_session_algorithm(tmpdir, monkeypatch):
+    # Setup
+    monkeypatch.setattr(pydotfiles.utils.hashes, "PARALLEL_HASH_THRESHOLD", 0)
+    database_file = tmpdir.join("cache", "hash-cache.sqlite3").strpath
+    first_file = tmpdir.join("first-file")
+    first_file.write("first content")
+    second_file = tmpdir.join("second-file")
+    second_file.write("second content")
+
+    with hash_database_session(database_file):
+        get_file_hash(first_file.strpath)
+
+    # System under test
+    with hash_database_session(database_file, "blake2b"):
+        file_hashes = get_file_hashes([first_file.strpath, second_file.strpath])
+
+    # Verification
+    assert file_hashes == [hash_file(first_file.strpath, algorithm="blake2b"), hash_file(second_file.strpath, algorithm="blake2b")]
@@ -0,0 +1,129 @@
+import json
+import pytest
+import yaml
+
+from pydotfiles.utils import load_config_file, get_loader_backends, set_loader_backends
+from pydotfiles.utils.loaders import JSON_BACKENDS, YAML_BACKENDS, resolve_json_backend, resolve_yaml_backend
+
+
+"""
+Helper functions
+"""
+
+
+def get_available_backends(backend_names, resolver):
+    available_backends = []
+    for backend_name in backend_names:
+        try:
+            available_backends.append(resolver([backend_name])[0])
+        except ImportError:
+            continue
+    return available_backends
+
+
+@pytest.fixture(autouse=True)
+def reset_loader_backends():
+    yield
+    set_loader_backends()
+
+
+"""
+Loading tests
+"""
+
+
+@pytest.mark.parametrize("json_backend", get_available_backends(JSON_BACKENDS, resolve_json_backend))
+def test_load_json_file_success(tmpdir, json_backend):
+    # Setup
+    set_loader_backends(json_backend=json_backend)
+    config_file = tmpdir.join("settings.json")
+    config_file.write("{\"version\": \"alpha\", \"schema\": \"core\", \"actions\": [{\"action\": \"copy\"}]}")
+
+    # System under test
+    data, backend = load_config_file(config_file.strpath)
+
+    # Verification
+    assert backend == json_backend
+    assert data == {"version": "alpha", "schema": "core", "actions": [{"action": "copy"}]}
+
+
+@pytest.mark.parametrize("json_backend", get_available_backends(JSON_BACKENDS, resolve_json_backend))
+def test_load_json_file_invalid_syntax(tmpdir, json_backend):
+    # Setup
+    set_loader_backends(json_backend=json_backend)
+    config_file = tmpdir.join("settings.json")
+    config_file.write("{\"version\": ")
+
+    # System under test
+    with pytest.raises(json.JSONDecodeError):
+        load_config_file(config_file.strpath)
+
+
+@pytest.mark.parametrize("yaml_backend", get_available_backends(YAML_BACKENDS, resolve_yaml_backend))
+def test_load_yaml_file_success(tmpdir, yaml_backend):
+    # Setup
+    set_loader_backends(yaml_backend=yaml_backend)
+    config_file = tmpdir.join("settings.yml")
+    config_file.write("version: alpha\nschema: core\nactions:\n  - action: copy\n")
+
+    # System under test
+    data, backend = load_config_file(config_file.strpath)
+
+    # Verification
+    assert backend == yaml_backend
+    assert data == {"version": "alpha", "schema": "core", "actions": [{"action": "copy"}]}
+
+
+@pytest.mark.parametrize("yaml_backend", get_available_backends(YAML_BACKENDS, resolve_yaml_backend))
+def test_load_yaml_file_rejects_unsafe_tags(tmpdir, yaml_backend):
+    # Setup
+    set_loader_backends(yaml_backend=yaml_backend)
+    config_file = tmpdir.join("settings.yaml")
+    config_file.write("version: !!python/object/apply:os.getcwd []\n")
+
+    # System under test
+    with pytest.raises(yaml.YAMLError):
+        load_config_file(config_file.strpath)
+
+
+def test_load_unsupported_file_type(tmpdir):
+    # Setup
+    config_file = tmpdir.join("settings.toml")
+    config_file.write("")
+
+    # System under test
+    with pytest.raises(RuntimeError):
+        load_config_file(config_file.strpath)
+
+
+"""
+Backend resolution tests
+"""
+
+
+def test_get_loader_backends_prefers_fastest_available():
+    # System under test
+    backends = get_loader_backends()
+
+    # Verification
+    assert backends["json"] == get_available_backends(JSON_BACKENDS, resolve_json_backend)[0]
+    assert backends["yaml"] == get_available_backends(YAML_BACKENDS, resolve_yaml_backend)[0]
+
+
+def test_forced_backend_from_environment(monkeypatch):
+    # Setup
+    monkeypatch.setenv("PYDOTFILES_JSON_BACKEND", "json")
+    monkeypatch.setenv("PYDOTFILES_YAML_BACKEND", "pyyaml")
+    set_loader_backends()
+
+    # System under test
+    backends = get_loader_backends()
+
+    # Verification
+    assert backends == {"json": "json", "yaml": "pyyaml"}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        # System under test
+        set_loader_backends(json_backend="some-unknown-backend")
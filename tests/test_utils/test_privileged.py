@@ -0,0 +1,134 @@
+import os
+import pytest
+
+import pydotfiles.utils.io
+from pydotfiles.utils import PrivilegedHelper, privileged_session, get_privileged_helper
+from pydotfiles.utils import copy_file, symlink_file, rm_file, is_linked, make_directories
+
+
+"""
+Helper functions
+"""
+
+
+# Runs the helper directly (as the current user) instead of through sudo
+NO_SUDO_COMMAND_PREFIX = []
+
+
+def fail_on_sudo_spawn(*args, **kwargs):
+    raise AssertionError("A sudo process was spawned instead of using the privileged helper")
+
+
+"""
+Privileged helper tests
+"""
+
+
+def test_helper_runs_batched_operations(tmpdir):
+    # Setup
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    privileged_helper = PrivilegedHelper(NO_SUDO_COMMAND_PREFIX)
+    privileged_helper.start("some-password")
+
+    # System under test
+    try:
+        results = privileged_helper.execute_batch([
+            {"operation": "mkdir", "directory": tmpdir.join("nested").join("directory").strpath},
+            {"operation": "copy", "origin": origin.strpath, "destination": tmpdir.join("nested").join("directory").join("copy").strpath},
+            {"operation": "symlink", "origin": origin.strpath, "destination": tmpdir.join("link").strpath},
+            {"operation": "symlink", "origin": origin.strpath, "destination": tmpdir.join("link").strpath},
+            {"operation": "some-unknown-operation"},
+        ])
+    finally:
+        privileged_helper.stop()
+
+    # Verification
+    assert [result["ok"] for result in results] == [True, True, True, False, False]
+    assert results[3]["error"] == "FileExistsError"
+    assert tmpdir.join("nested").join("directory").join("copy").read() == "some content"
+    assert is_linked(origin.strpath, tmpdir.join("link").strpath)
+    assert not privileged_helper.is_running
+
+
+def test_helper_execute_raises_operation_error(tmpdir):
+    # Setup
+    privileged_helper = PrivilegedHelper(NO_SUDO_COMMAND_PREFIX)
+    privileged_helper.start("some-password")
+
+    # System under test
+    try:
+        with pytest.raises(RuntimeError):
+            privileged_helper.execute("remove", file=tmpdir.join("missing").strpath)
+    finally:
+        privileged_helper.stop()
+
+
+def test_helper_fails_to_authenticate():
+    # Setup
+    privileged_helper = PrivilegedHelper(["false"])
+
+    # System under test
+    with pytest.raises(RuntimeError):
+        privileged_helper.start("some-password")
+
+    # Verification
+    assert not privileged_helper.is_running
+
+
+"""
+Privileged session tests
+"""
+
+
+def test_sudo_file_operations_use_session_helper(tmpdir, monkeypatch):
+    # Setup
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+
+    # System under test
+    with privileged_session("some-password", NO_SUDO_COMMAND_PREFIX) as privileged_helper:
+        # The helper is already running, so nothing else should spawn a process from here on
+        monkeypatch.setattr(pydotfiles.utils.io.subprocess, "Popen", fail_on_sudo_spawn)
+
+        copy_file(origin, tmpdir.join("copy"), use_sudo=True)
+        symlink_file(origin, tmpdir.join("link"), use_sudo=True)
+        rm_file(tmpdir.join("copy"), use_sudo=True)
+
+    # Verification
+    assert privileged_helper is not None
+    assert get_privileged_helper() is None
+    assert not os.path.exists(tmpdir.join("copy").strpath)
+    assert is_linked(origin.strpath, tmpdir.join("link").strpath)
+
+
+def test_sudo_directories_created_in_one_batch(tmpdir, monkeypatch):
+    # Setup
+    directories = [tmpdir.join("first", "nested"), tmpdir.join("second")]
+
+    with privileged_session("some-password", NO_SUDO_COMMAND_PREFIX) as privileged_helper:
+        monkeypatch.setattr(pydotfiles.utils.io.subprocess, "Popen", fail_on_sudo_spawn)
+        first_request_id = privileged_helper.next_request_id
+
+        # System under test
+        make_directories(directories, use_sudo=True)
+
+        # Verification
+        assert privileged_helper.next_request_id == first_request_id + 1
+
+    assert all(os.path.isdir(directory.strpath) for directory in directories)
+
+
+def test_session_without_password_starts_nothing():
+    # System under test
+    with privileged_session(None) as privileged_helper:
+        # Verification
+        assert privileged_helper is None
+        assert get_privileged_helper() is None
+
+
+def test_session_falls_back_when_helper_fails():
+    # System under test
+    with privileged_session("some-password", ["false"]) as privileged_helper:
+        # Verification
+        assert privileged_helper is None
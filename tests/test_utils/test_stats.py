@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+import pydotfiles.utils.stats
+from pydotfiles.utils import stat_cache_session, get_stat_cache, invalidate_paths
+from pydotfiles.utils import cached_exists, cached_lexists, cached_isfile, cached_isdir, cached_islink, cached_stat, cached_realpath
+from pydotfiles.utils import copy_file, symlink_file, rm_file, make_directories, is_copied, is_linked, is_broken_link
+
+
+"""
+Helper functions
+"""
+
+
+def create_files(tmpdir):
+    tmpdir.join("some-file").write("some content")
+    tmpdir.mkdir("some-directory").join("inner-file").write("some content")
+    os.symlink(tmpdir.join("some-file").strpath, tmpdir.join("some-link").strpath)
+    os.symlink("some-directory", tmpdir.join("relative-directory-link").strpath)
+    os.symlink("relative-directory-link/../some-file", tmpdir.join("parent-link").strpath)
+    os.symlink(tmpdir.join("missing-file").strpath, tmpdir.join("broken-link").strpath)
+
+
+"""
+Stat cache tests
+"""
+
+
+@pytest.mark.parametrize("name", ["some-file", "some-directory", "some-link", "broken-link", "relative-directory-link/inner-file", "parent-link", "missing-file", "missing-directory/missing-file", "some-file/not-a-directory"])
+def test_cached_checks_match_os_path(tmpdir, name):
+    # Setup
+    create_files(tmpdir)
+    path = tmpdir.join(name).strpath
+
+    # System under test
+    with stat_cache_session():
+        cached_results = (cached_exists(path), cached_lexists(path), cached_isfile(path), cached_isdir(path), cached_islink(path), cached_realpath(path))
+
+    # Verification
+    assert cached_results == (os.path.exists(path), os.path.lexists(path), os.path.isfile(path), os.path.isdir(path), os.path.islink(path), os.path.realpath(path))
+    assert get_stat_cache() is None
+
+
+def test_cached_stat(tmpdir):
+    # Setup
+    create_files(tmpdir)
+
+    # System under test / Verification
+    with stat_cache_session():
+        assert cached_stat(tmpdir.join("some-link").strpath) == os.stat(tmpdir.join("some-link").strpath)
+        assert cached_stat(tmpdir.join("some-link").strpath, follow_symlinks=False) == os.lstat(tmpdir.join("some-link").strpath)
+
+        with pytest.raises(FileNotFoundError):
+            cached_stat(tmpdir.join("missing-file").strpath)
+
+
+def test_directory_scanned_once_per_run(tmpdir, spy):
+    # Setup
+    scanned_directories = spy(pydotfiles.utils.stats, "scan_directory", lambda directory: directory)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    destination_directory = tmpdir.mkdir("destination")
+    for file_number in range(10):
+        destination_directory.join(f"file-{file_number}").write("some content")
+
+    # System under test
+    with stat_cache_session():
+        for file_number in range(10):
+            is_linked(origin.strpath, destination_directory.join(f"file-{file_number}").strpath)
+            is_copied(origin.strpath, destination_directory.join(f"file-{file_number}").strpath)
+            is_broken_link(destination_directory.join(f"file-{file_number}").strpath)
+
+    # Verification
+    assert sorted(scanned_directories) == sorted([tmpdir.strpath, destination_directory.strpath])
+
+
+def test_own_writes_invalidate_only_the_written_files(tmpdir, spy):
+    # Setup
+    scanned_directories = spy(pydotfiles.utils.stats, "scan_directory", lambda directory: directory)
+    origin = tmpdir.join("origin")
+    origin.write("some content")
+    symlink_destination = tmpdir.join("symlink-destination").strpath
+    copy_destination = tmpdir.join("copy-destination").strpath
+
+    # System under test / Verification
+    with stat_cache_session():
+        assert not is_linked(origin.strpath, symlink_destination)
+        assert not is_copied(origin.strpath, copy_destination)
+
+        symlink_file(origin.strpath, symlink_destination)
+        copy_file(origin.strpath, copy_destination)
+        assert is_linked(origin.strpath, symlink_destination)
+        assert is_copied(origin.strpath, copy_destination)
+
+        rm_file(copy_destination)
+        assert not cached_lexists(copy_destination)
+
+    assert scanned_directories.count(tmpdir.strpath) == 1
+    assert len(scanned_directories) == len(set(scanned_directories))
+
+
+def test_created_directories_invalidated(tmpdir):
+    # Setup
+    nested_directory = tmpdir.join("first", "second", "third").strpath
+
+    # System under test / Verification
+    with stat_cache_session():
+        assert not cached_isdir(nested_directory)
+
+        make_directories([nested_directory])
+        assert cached_isdir(nested_directory)
+        assert cached_isdir(tmpdir.join("first").strpath)
+
+
+def test_outside_writes_seen_once_invalidated(tmpdir):
+    # Setup
+    some_file = tmpdir.join("some-file")
+
+    # System under test / Verification
+    with stat_cache_session():
+        assert not cached_isfile(some_file.strpath)
+
+        some_file.write("some content")
+        assert not cached_isfile(some_file.strpath)
+
+        invalidate_paths(some_file.strpath)
+        assert cached_isfile(some_file.strpath)